@@ -0,0 +1,138 @@
+"""Persistent cache of LFN analysis results.
+
+Each analysed file is recorded with its size, modification time and the
+analysis parameters, so a later run over the same directory only analyses
+new or changed recordings. Optionally the content hash is recorded too;
+files that were merely touched or copied are then still served from the
+cache.
+"""
+
+import hashlib
+import json
+import os
+
+CACHE_VERSION = 1
+HASH_BLOCK_SIZE = 1 << 20
+# Row columns naming files written by the analysis; rows whose files have
+# gone missing are analysed again
+OUTPUT_COLUMNS = ("Spectrogram", "Timeline")
+
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of the file at ``path``."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_atomic(path, write):
+    """Write ``path`` through ``write(tmp_path)`` and a final rename.
+
+    Readers never see a partially written file, and an interrupted run
+    leaves the previous version in place.
+    """
+
+    tmp_path = f"{path}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class AnalysisCache:
+    """Result rows of previously analysed files, stored as JSON.
+
+    Parameters
+    ----------
+    path : str
+        Location of the cache file. It is created on :meth:`save`.
+    hash_files : bool, optional
+        Also key entries by content hash. A file whose size or modification
+        time changed is hashed and still counts as unchanged when its
+        content is.
+    """
+
+    def __init__(self, path, hash_files=False):
+        self.path = path
+        self.hash_files = hash_files
+        self.hits = 0
+        self._entries = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except ValueError:
+                data = {}
+            if data.get("version") == CACHE_VERSION:
+                self._entries = data["files"]
+
+    @staticmethod
+    def _params_key(params):
+        return json.dumps(list(params))
+
+    def lookup(self, input_file, params):
+        """Return the cached row of ``input_file``, or ``None``.
+
+        Parameters
+        ----------
+        input_file : str
+            Audio file about to be analysed.
+        params : tuple
+            JSON-serialisable parameters that affect the row.
+        """
+
+        key = os.path.abspath(input_file)
+        entry = self._entries.get(key)
+        if entry is None or entry["params"] != self._params_key(params):
+            return None
+        st = os.stat(key)
+        if (entry["size"], entry["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+            if not (
+                self.hash_files
+                and entry.get("sha256")
+                and entry["sha256"] == file_digest(key)
+            ):
+                return None
+            entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+        elif self.hash_files and not entry.get("sha256"):
+            # Recorded without hashing; hash now for later runs
+            entry["sha256"] = file_digest(key)
+        for column in OUTPUT_COLUMNS:
+            output = entry["row"].get(column)
+            if output and not os.path.isfile(output):
+                return None
+        self.hits += 1
+        return entry["row"]
+
+    def record(self, input_file, params, row):
+        """Remember ``row`` as the result of analysing ``input_file``."""
+
+        key = os.path.abspath(input_file)
+        st = os.stat(key)
+        self._entries[key] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": file_digest(key) if self.hash_files else None,
+            "params": self._params_key(params),
+            "row": row,
+        }
+
+    def save(self):
+        """Write the cache atomically, dropping files that were deleted."""
+
+        entries = {
+            key: entry
+            for key, entry in self._entries.items()
+            if os.path.exists(key)
+        }
+
+        def write(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "files": entries}, f)
+
+        write_atomic(self.path, write)
@@ -0,0 +1,362 @@
+"""Band-targeted LFN and ultrasonic analysis.
+
+A full-band spectrogram spends almost all of its FFT work on frequencies
+that are masked out afterwards, and at 44.1 kHz its bins are ~10 Hz wide.
+:class:`BandAnalyzer` analyses only the bands of interest:
+
+* The low band (LFN and the 0-500 Hz spectrogram image) is decimated in
+  polyphase FIR stages to a rate just above twice its width, where a short
+  FFT gives bins of about 1.5 Hz.
+* The ultrasonic band is isolated by a complex band-pass filter and
+  decimated (a zoom FFT), so each FFT only covers the band itself.
+  Decimation folds the band to a known alias frequency, so no mixing with a
+  local oscillator is needed.
+
+Both paths keep their filter and framing state between blocks, so a
+recording analysed block by block yields the same frames as analysed whole.
+Power spectral densities are scaled like ``scipy.signal.spectrogram``.
+"""
+
+import functools
+import math
+
+import numpy as np
+from scipy import signal
+
+LF_RANGE = (20, 100)
+HF_RANGE = (20000, 24000)
+# Highest frequency of the low-band spectrogram image
+IMAGE_MAX_FREQ = 500
+# Largest FFT bin width of each band in Hz; segments overlap by half
+LF_RESOLUTION = 1.5
+HF_RESOLUTION = 12.0
+# Decimated rate relative to the bandwidth of each path
+OVERSAMPLING = 1.25
+# Largest decimation factor of a single filter stage
+MAX_STAGE_FACTOR = 8
+# Attenuation of everything that aliases into a band
+STOPBAND_DB = 60
+# dB floor added to the power, as in the full-band analysis
+POWER_FLOOR = 1e-10
+
+
+@functools.lru_cache(maxsize=None)
+def lowpass_taps(fs, passband, stopband):
+    """Design a Kaiser-window FIR low-pass filter for rate ``fs``."""
+
+    numtaps, beta = signal.kaiserord(
+        STOPBAND_DB, (stopband - passband) / (fs / 2)
+    )
+    return signal.firwin(
+        numtaps | 1, (passband + stopband) / 2, window=("kaiser", beta), fs=fs
+    )
+
+
+def decimation_stages(fs, bandwidth):
+    """Return the stage factors that decimate ``fs`` for a ``bandwidth``.
+
+    The final rate stays above ``OVERSAMPLING * bandwidth``. Several short
+    stages need far fewer filter taps per input sample than one long one.
+    """
+
+    factors = []
+    rate = fs
+    while True:
+        factor = min(MAX_STAGE_FACTOR, int(rate // (bandwidth * OVERSAMPLING)))
+        if factor < 2:
+            return factors or [1]
+        factors.append(factor)
+        rate /= factor
+
+
+def _alias(freq, rate):
+    # Frequency that ``freq`` folds to at ``rate``, in [-rate / 2, rate / 2)
+    return (freq + rate / 2) % rate - rate / 2
+
+
+class Decimator:
+    """Polyphase FIR decimator for a real signal delivered block by block.
+
+    Output sample ``m`` is ``sum(taps[k] * x[m * factor - k])``, the
+    filtered input at index ``m * factor``. The input is viewed as rows of
+    ``factor`` samples, so filtering becomes one matrix product with the
+    polyphase components of the taps followed by a few shifted sums. The
+    products that the next block still needs are carried over.
+
+    Parameters
+    ----------
+    taps : numpy.ndarray
+        Anti-aliasing filter. Complex (band-pass) taps give a complex
+        output.
+    factor : int
+        Decimation factor.
+    """
+
+    def __init__(self, taps, factor):
+        self.taps = taps
+        self.factor = factor
+        phases = -(-len(taps) // factor)
+        padded = np.concatenate((taps, np.zeros(phases * factor - len(taps))))
+        # Row p holds the taps applied to the input row p rows back, in the
+        # order of that row (input row j is x[j * factor - factor + 1:
+        # j * factor + 1]). Complex taps are split into real and imaginary
+        # rows so the product stays real.
+        matrix = padded.reshape(phases, factor)[:, ::-1]
+        if np.iscomplexobj(matrix):
+            matrix = np.concatenate((matrix.real, matrix.imag))
+        self._matrix = np.ascontiguousarray(matrix)
+        self._phases = phases
+        self._parts = len(matrix) // phases
+        self._pending = np.zeros(factor - 1)
+        self._history = np.zeros((self._parts, phases, phases - 1))
+
+    def process(self, x):
+        """Return the decimated samples that ``x`` completes."""
+
+        q = self.factor
+        # Complete the row started by the previous block, then view the
+        # rest of ``x`` as rows without copying it
+        head = min(len(x), -len(self._pending) % q)
+        first = np.concatenate((self._pending, x[:head]))
+        rows = (len(x) - head) // q
+        body = x[head:head + rows * q].reshape(rows, q)
+        y = []
+        if len(first) == q:
+            y.append(self._accumulate(first[np.newaxis]))
+            first = first[:0]
+        y.append(self._accumulate(body))
+        self._pending = np.concatenate((first, x[head + rows * q:]))
+        y = np.concatenate(y, axis=1)
+        return y[0] if self._parts == 1 else y[0] + 1j * y[1]
+
+    def _accumulate(self, rows):
+        products = self._matrix @ rows.T
+        products = products.reshape(self._parts, self._phases, len(rows))
+        # Output m sums phase p of input row m - p; rows before this call
+        # come from the history
+        history = self._history
+        phases, n = products.shape[1:]
+        y = products[:, 0].copy()
+        for p in range(1, phases):
+            if n > p:
+                y[:, p:] += products[:, p, :n - p]
+            k = min(p, n)
+            y[:, :k] += history[:, p, phases - 1 - p:phases - 1 - p + k]
+        if n < phases - 1:
+            products = np.concatenate((history, products), axis=2)
+        self._history = products[:, :, products.shape[2] - (phases - 1):]
+        return y
+
+
+class BandSpectrogram:
+    """Spectrogram of one frequency band of a block-wise signal.
+
+    Parameters
+    ----------
+    fs : float
+        Input sample rate in Hz.
+    band : tuple of float
+        Lowest and highest frequency to analyse; clipped to the Nyquist
+        frequency.
+    resolution : float
+        Largest FFT bin width in Hz.
+    baseband : bool, optional
+        Analyse ``0`` to ``band[1]`` as a real signal instead of isolating
+        the band with a band-pass filter. Suited to bands near 0 Hz.
+    """
+
+    def __init__(self, fs, band, resolution, baseband=False):
+        low, high = band[0], min(band[1], fs / 2)
+        self.empty = high <= low
+        if self.empty:
+            self.freqs = np.zeros(0)
+            return
+        if baseband:
+            center = 0.0
+            bandwidth = 2 * high
+            factors = decimation_stages(fs, bandwidth)
+        else:
+            center = (low + high) / 2
+            bandwidth = high - low
+            # Later stages would filter complex samples, which costs more
+            # than the longer FFT they save
+            factors = decimation_stages(fs, bandwidth)[:1]
+        self.complex = not baseband
+
+        self._stages = []
+        rate = fs
+        for factor in factors:
+            # Anything above rate / factor - bandwidth / 2 from the centre
+            # aliases outside the band
+            taps = lowpass_taps(
+                rate,
+                bandwidth / 2,
+                min(rate / 2, rate / factor - bandwidth / 2),
+            )
+            if center:
+                # Band-pass: the low-pass shifted to the band centre
+                taps = taps * np.exp(
+                    2j * np.pi * center / rate * np.arange(len(taps))
+                )
+            self._stages.append(Decimator(taps, factor))
+            rate /= factor
+            center = _alias(center, rate)
+        self.rate = rate
+        self.nperseg = 2 ** math.ceil(math.log2(rate / resolution))
+        self.hop = self.nperseg // 2
+
+        if baseband:
+            freqs = np.fft.rfftfreq(self.nperseg, 1 / rate)
+        else:
+            # Map the bins around the band's alias back to the band
+            bins = np.fft.fftshift(np.fft.fftfreq(self.nperseg, 1 / rate))
+            freqs = (low + high) / 2 + _alias(bins - center, rate)
+        self._rows = np.flatnonzero((freqs >= low) & (freqs <= high))
+        self._rows = self._rows[np.argsort(freqs[self._rows])]
+        self.freqs = freqs[self._rows]
+        self._pending = np.zeros(0, dtype=complex if self.complex else float)
+
+    def columns(self, frames):
+        """Return the number of STFT frames for ``frames`` input samples."""
+
+        if self.empty:
+            return 0
+        samples = frames
+        for decimator in self._stages:
+            samples = -(-samples // decimator.factor)
+        if samples < self.nperseg:
+            return 0
+        return (samples - self.nperseg) // self.hop + 1
+
+    def process(self, x):
+        """Return the dB spectrogram frames completed by block ``x``.
+
+        Returns
+        -------
+        numpy.ndarray
+            ``(len(freqs), frames)`` array.
+        """
+
+        if self.empty:
+            return np.zeros((0, 0))
+        for decimator in self._stages:
+            x = decimator.process(x)
+        pending = np.concatenate((self._pending, x))
+        frames = 0
+        if len(pending) >= self.nperseg:
+            frames = (len(pending) - self.nperseg) // self.hop + 1
+        if not frames:
+            self._pending = pending
+            return np.zeros((len(self.freqs), 0))
+
+        used = (frames - 1) * self.hop + self.nperseg
+        # Single precision is ample for dB levels and halves the FFT time
+        segment = pending[:used].astype(
+            np.complex64 if self.complex else np.float32
+        )
+        _, _, Sxx = signal.spectrogram(
+            segment,
+            fs=self.rate,
+            nperseg=self.nperseg,
+            noverlap=self.nperseg - self.hop,
+            return_onesided=not self.complex,
+        )
+        if self.complex:
+            # Two-sided density of the complex band, doubled to match the
+            # one-sided density of the real input
+            Sxx = 2 * np.fft.fftshift(Sxx, axes=0)
+        self._pending = pending[frames * self.hop:]
+        return 10 * np.log10(Sxx[self._rows] + POWER_FLOOR)
+
+
+class BandAnalyzer:
+    """Track LFN and ultrasonic peaks of a mono signal block by block.
+
+    Parameters
+    ----------
+    fs : float
+        Sample rate in Hz.
+    lf_range, hf_range : tuple of float, optional
+        LFN and ultrasonic bands in Hz.
+    image_max_freq : float, optional
+        Highest frequency of the low-band image returned by :meth:`feed`.
+
+    Attributes
+    ----------
+    lf_peak, lf_db, hf_peak, hf_db : float
+        Frequency and level of the loudest bin seen so far in each band;
+        ``0`` and ``-inf`` until a full frame has been analysed.
+    lf_frames, hf_frames : numpy.ndarray
+        ``(len(lf_freqs), frames)`` and ``(len(hf_freqs), frames)`` dB
+        frames of each band completed by the last :meth:`feed`.
+    """
+
+    # Power added to every bin before the frames are converted to dB
+    power_floor = POWER_FLOOR
+
+    def __init__(
+        self,
+        fs,
+        lf_range=LF_RANGE,
+        hf_range=HF_RANGE,
+        image_max_freq=IMAGE_MAX_FREQ,
+    ):
+        self.low = BandSpectrogram(
+            fs,
+            (0, max(lf_range[1], image_max_freq)),
+            LF_RESOLUTION,
+            baseband=True,
+        )
+        self.high = BandSpectrogram(fs, hf_range, HF_RESOLUTION)
+        self._lf_rows = (self.low.freqs >= lf_range[0]) & (
+            self.low.freqs <= lf_range[1]
+        )
+        self._image_rows = self.low.freqs <= image_max_freq
+        self.image_freqs = self.low.freqs[self._image_rows]
+        self.image_rate = self.low.rate / self.low.hop
+        self.lf_freqs = self.low.freqs[self._lf_rows]
+        self.hf_freqs = self.high.freqs
+        self.hf_frame_rate = 0.0
+        if not self.high.empty:
+            self.hf_frame_rate = self.high.rate / self.high.hop
+        self.lf_frames = np.zeros((len(self.lf_freqs), 0))
+        self.hf_frames = np.zeros((len(self.hf_freqs), 0))
+        self.lf_peak = self.hf_peak = 0.0
+        self.lf_db = self.hf_db = -math.inf
+
+    def image_columns(self, frames):
+        """Return the number of image columns for ``frames`` input samples."""
+
+        return self.low.columns(frames)
+
+    def feed(self, x):
+        """Analyse the next block of mono samples.
+
+        Returns
+        -------
+        numpy.ndarray
+            ``(len(image_freqs), frames)`` dB image columns completed by
+            ``x``.
+        """
+
+        x = np.asarray(x, dtype=np.float64)
+        low = self.low.process(x)
+        self.lf_frames = low[self._lf_rows]
+        self.lf_peak, self.lf_db = self._peak(
+            self.lf_frames, self.lf_freqs, self.lf_peak, self.lf_db
+        )
+        if not self.high.empty:
+            self.hf_frames = self.high.process(x)
+        self.hf_peak, self.hf_db = self._peak(
+            self.hf_frames, self.hf_freqs, self.hf_peak, self.hf_db
+        )
+        return low[self._image_rows]
+
+    @staticmethod
+    def _peak(db, freqs, peak, peak_db):
+        if db.size:
+            idx = np.argmax(db)
+            if db.flat[idx] > peak_db:
+                row = np.unravel_index(idx, db.shape)[0]
+                return float(freqs[row]), float(db.flat[idx])
+        return peak, peak_db
@@ -1,66 +1,239 @@
+import collections
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
 import os
 import subprocess
+import tempfile
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from scipy.signal import spectrogram
 import soundfile as sf
 from tqdm import tqdm
 import math
 
+from analysis_cache import AnalysisCache, write_atomic
+from lfn_statistics import EXCEEDED_PERCENTS, TIMELINE_INTERVAL, LfnStatistics
+from spectrogram_renderer import SpectrogramRenderer, render_png
+
 LF_RANGE = (20, 100)
 HF_RANGE = (20000, 24000)
 OUTPUT_CSV = "lfn_analysis_results.csv"
+CACHE_FILE = "lfn_analysis_cache.json"
+# Bump when a change alters the result rows; cached rows are then discarded
+ANALYSIS_VERSION = 3
 SPECTROGRAM_FOLDER = "spectrograms"
+TIMELINE_FOLDER = "timelines"
+
+# Highest frequency kept for the spectrogram image
+SPECTROGRAM_MAX_FREQ = 500
+# Width of the rendered image; longer recordings are max-pooled in time
+SPECTROGRAM_MAX_COLUMNS = 4096
+# Spectrograms larger than this are accumulated in a temporary file
+SPECTROGRAM_MEMMAP_BYTES = 256 * 2**20
+# Containers libsndfile cannot read; they are decoded through an ffmpeg pipe
+FFMPEG_EXTENSIONS = ("mp3", "mp4", "m4a")
+AUDIO_EXTENSIONS = ("wav", "flac", "ogg") + FFMPEG_EXTENSIONS
+FFMPEG = "ffmpeg"
+FFPROBE = "ffprobe"
+# Environment variables that cap the BLAS and OpenMP thread pools
+THREAD_LIMIT_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+# Per-block progress bars; batch workers turn them off
+SHOW_PROGRESS = True
 
 os.makedirs(SPECTROGRAM_FOLDER, exist_ok=True)
-results = []
-
-
-def convert_to_wav(input_path, output_path):
-    command = [
-        "ffmpeg",
-        "-y",
-        "-i",
-        input_path,
-        "-ar",
-        "44100",
-        "-ac",
-        "1",
-        output_path,
-    ]
-    subprocess.run(
-        command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+
+
+class FFmpegAudio:
+    """Read the audio track of a container through an ffmpeg pipe.
+
+    Mirrors the parts of ``soundfile.SoundFile`` used by
+    :func:`analyze_audio`. Samples are decoded at the native rate and
+    channel count, so nothing above 22.05 kHz is lost, and streamed without
+    writing a converted copy to disk. ``frames`` is estimated from the
+    container duration.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        command = [
+            FFPROBE, "-v", "error", "-select_streams", "a:0",
+            "-show_entries", "stream=sample_rate,channels:format=duration",
+            "-of", "json", path,
+        ]
+        probe = subprocess.run(command, capture_output=True, text=True)
+        info = json.loads(probe.stdout or "{}")
+        if probe.returncode or not info.get("streams"):
+            raise RuntimeError(f"ffprobe found no audio stream in {path}")
+        stream = info["streams"][0]
+        self.samplerate = int(stream["sample_rate"])
+        self.channels = int(stream["channels"])
+        duration = float(info.get("format", {}).get("duration", 0))
+        self.frames = math.ceil(duration * self.samplerate)
+
+    def blocks(self, blocksize, dtype="float32"):
+        """Yield blocks of ``blocksize`` frames as ``dtype`` samples.
+
+        Mono blocks are one-dimensional, as with ``soundfile``.
+        """
+
+        command = [
+            FFMPEG, "-nostdin", "-v", "error", "-i", self.path,
+            "-map", "0:a:0", "-f", "f32le", "-acodec", "pcm_f32le", "-",
+        ]
+        block_bytes = blocksize * self.channels * 4
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE)
+        try:
+            while True:
+                data = proc.stdout.read(block_bytes)
+                if not data:
+                    break
+                block = np.frombuffer(data, dtype=np.float32)
+                if self.channels > 1:
+                    block = block.reshape(-1, self.channels)
+                yield block.astype(dtype, copy=False)
+        finally:
+            proc.stdout.close()
+            returncode = proc.wait()
+        if returncode:
+            raise RuntimeError(
+                f"ffmpeg could not decode {self.path} ({returncode})"
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+def open_audio(path):
+    """Open ``path`` with soundfile, or through ffmpeg for containers."""
+
+    if path.lower().split(".")[-1] in FFMPEG_EXTENSIONS:
+        return FFmpegAudio(path)
+    return sf.SoundFile(path)
+
+
+def allocate_spectrogram(rows, columns):
+    """Return a ``(columns, rows)`` float32 buffer for the spectrogram.
+
+    The buffer is time-major so each block writes one contiguous slab. Large
+    spectrograms are backed by an anonymous temporary file instead of RAM.
+    """
+
+    if rows * columns * 4 <= SPECTROGRAM_MEMMAP_BYTES:
+        return np.empty((columns, rows), dtype=np.float32)
+    with tempfile.TemporaryFile() as f:
+        return np.memmap(
+            f, dtype=np.float32, mode="w+", shape=(columns, rows)
+        )
+
+
+def grow_spectrogram(spec, columns):
+    """Return a copy of ``spec`` with room for at least ``columns`` frames."""
+
+    grown = allocate_spectrogram(
+        spec.shape[1], max(columns, len(spec) + len(spec) // 8)
     )
+    grown[:len(spec)] = spec
+    return grown
+
+
+def display_spectrogram(spec, max_columns=SPECTROGRAM_MAX_COLUMNS):
+    """Reduce a time-major spectrogram to at most ``max_columns`` frames.
+
+    Consecutive frames are max-pooled, so short LFN events stay visible.
+    The input is read in slabs, which keeps memory-mapped buffers on disk.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(rows, frames)`` float32 array as expected by :func:`render_png`.
+    """
+
+    factor = max(1, math.ceil(len(spec) / max_columns))
+    columns = math.ceil(len(spec) / factor)
+    display = np.empty((columns, spec.shape[1]), dtype=np.float32)
+    slab = factor * 256
+    for start in range(0, len(spec), slab):
+        chunk = np.asarray(spec[start:start + slab])
+        pad = -len(chunk) % factor
+        if pad:
+            chunk = np.concatenate(
+                (chunk, np.repeat(chunk[-1:], pad, axis=0))
+            )
+        pooled = chunk.reshape(-1, factor, spec.shape[1]).max(axis=1)
+        first = start // factor
+        display[first:first + len(pooled)] = pooled
+    return display.T
 
 
-def analyze_audio(filepath, label, block_duration=None):
+def analyze_audio(
+    filepath,
+    label,
+    block_duration=None,
+    spectrogram_image=True,
+    renderer=None,
+    timeline=True,
+    interval=TIMELINE_INTERVAL,
+    output_name=None,
+):
     """Analyze a single audio file.
 
     Parameters
     ----------
     filepath : str
-        Path to the audio file.
+        Path to the audio file, read by :func:`open_audio`.
     label : str
         Name used in results.
     block_duration : float, optional
         Duration of the blocks in seconds. When provided, the file is processed
         chunk by chunk which avoids loading the entire recording into memory.
+    spectrogram_image : bool, optional
+        Render the 0-500 Hz spectrogram to ``SPECTROGRAM_FOLDER``. When
+        ``False`` the spectrogram is not accumulated at all.
+    renderer : SpectrogramRenderer, optional
+        Background renderer used for the image. The image is written
+        synchronously when omitted.
+    timeline : bool, optional
+        Write per-interval statistics to ``TIMELINE_FOLDER/<name>.npz``
+        (see :meth:`lfn_statistics.LfnStatistics.save_timeline`).
+    interval : float, optional
+        Timeline interval in seconds.
+    output_name : str, optional
+        Name of the image and timeline files without extension. Defaults
+        to ``label`` without its extension; see :func:`output_names`.
+
+    Only the LFN, ultrasonic and image bands are analysed (see
+    :class:`band_analysis.BandAnalyzer`), with the filter state carried
+    across blocks, so the results do not depend on ``block_duration``. The
+    spectrogram is written into a buffer sized from the file length up
+    front (see :func:`allocate_spectrogram`), so analysis time and memory
+    grow linearly with the recording; only a decimated copy is rendered.
+    Leq and percentile levels of both bands are gathered in the same pass
+    in constant memory (see :mod:`lfn_statistics`).
     """
 
-    with sf.SoundFile(filepath) as f:
-        sr = f.samplerate
-        block_frames = int(sr * block_duration) if block_duration else f.frames
+    # Imported here so ``--help`` does not wait for SciPy to load
+    from band_analysis import BandAnalyzer
 
-        # Variables for tracking peaks across blocks
-        max_lfn_db = -np.inf
-        max_lfn_peak = 0
-        max_hf_db = -np.inf
-        max_hf_peak = 0
+    with open_audio(filepath) as f:
+        sr = f.samplerate
+        block_frames = f.frames or sr
+        if block_duration:
+            block_frames = int(sr * block_duration)
+        bands = BandAnalyzer(sr, LF_RANGE, HF_RANGE, SPECTROGRAM_MAX_FREQ)
+        stats = LfnStatistics(bands, interval)
 
         spec_accum = None
-        time_accum = []
-        current_time = 0.0
+        if spectrogram_image:
+            spec_accum = allocate_spectrogram(
+                len(bands.image_freqs), bands.image_columns(f.frames)
+            )
+        column = 0
 
         total_blocks = math.ceil(f.frames / block_frames)
         for block in tqdm(
@@ -68,77 +241,278 @@ def analyze_audio(filepath, label, block_duration=None):
             total=total_blocks,
             desc=f"{label}",
             unit="block",
+            disable=not SHOW_PROGRESS,
         ):
             if block.ndim > 1:
                 block = block.mean(axis=1)
 
-            freqs, times, Sxx = spectrogram(
-                block, fs=sr, nperseg=4096, noverlap=2048
-            )
-            Sxx_db = 10 * np.log10(Sxx + 1e-10)
-
-            # LFN peak for this block
-            lfn_mask = (freqs >= LF_RANGE[0]) & (freqs <= LF_RANGE[1])
-            lfn_freqs = freqs[lfn_mask]
-            lfn_spec = Sxx_db[lfn_mask, :]
-            if lfn_spec.size:
-                idx = np.argmax(lfn_spec)
-                lfn_db_block = lfn_spec.flat[idx]
-                lfn_peak_block = lfn_freqs[
-                    np.unravel_index(idx, lfn_spec.shape)[0]
-                ]
-                if lfn_db_block > max_lfn_db:
-                    max_lfn_db = lfn_db_block
-                    max_lfn_peak = lfn_peak_block
-
-            # Ultrasonic peak for this block
-            hf_mask = (freqs >= HF_RANGE[0]) & (freqs <= HF_RANGE[1])
-            hf_freqs = freqs[hf_mask]
-            hf_spec = Sxx_db[hf_mask, :]
-            if hf_freqs.size:
-                idx = np.argmax(hf_spec)
-                hf_db_block = hf_spec.flat[idx]
-                hf_peak_block = hf_freqs[
-                    np.unravel_index(idx, hf_spec.shape)[0]
-                ]
-                if hf_db_block > max_hf_db:
-                    max_hf_db = hf_db_block
-                    max_hf_peak = hf_peak_block
+            image = bands.feed(block)
+            stats.update(bands)
+            if not spectrogram_image:
+                continue
 
             # Accumulate spectrogram data up to 500 Hz
-            freq_mask_500 = freqs <= 500
-            spec_slice = Sxx_db[freq_mask_500, :]
-            if spec_accum is None:
-                spec_freqs = freqs[freq_mask_500]
-                spec_accum = spec_slice
-            else:
-                spec_accum = np.hstack((spec_accum, spec_slice))
-
-            time_accum.extend(times + current_time)
-            current_time += len(block) / sr
-
-    # Plot accumulated spectrogram
-    plt.figure(figsize=(12, 6))
-    plt.pcolormesh(time_accum, spec_freqs, spec_accum, shading="gouraud")
-    plt.title(f"Spectrogram: {label}")
-    plt.ylabel("Frequency (Hz)")
-    plt.xlabel("Time (s)")
-    plt.colorbar(label="Intensity (dB)")
-    out_img = os.path.join(
-        SPECTROGRAM_FOLDER, f"{os.path.splitext(label)[0]}.png"
-    )
-    plt.tight_layout()
-    plt.savefig(out_img)
-    plt.close()
+            if column + image.shape[1] > len(spec_accum):
+                # The duration of a container was underestimated
+                spec_accum = grow_spectrogram(
+                    spec_accum, column + image.shape[1]
+                )
+            spec_accum[column:column + image.shape[1]] = image.T
+            column += image.shape[1]
+
+    stats.finish()
+    if output_name is None:
+        output_name = os.path.splitext(label)[0]
+    out_timeline = ""
+    if timeline:
+        os.makedirs(TIMELINE_FOLDER, exist_ok=True)
+        out_timeline = os.path.join(TIMELINE_FOLDER, f"{output_name}.npz")
+        stats.save_timeline(out_timeline)
 
-    return {
+    # Render a decimated copy of the accumulated spectrogram
+    out_img = ""
+    if spectrogram_image and column:
+        out_img = os.path.join(SPECTROGRAM_FOLDER, f"{output_name}.png")
+        display = display_spectrogram(spec_accum[:column])
+        if renderer is not None:
+            out_img = renderer.submit(display, out_img)
+        else:
+            render_png(display, out_img, cmap="viridis")
+
+    # A band without a single full FFT segment (a file shorter than about
+    # 0.75 s for LFN, or a rate without the ultrasonic band) has no peak
+    lf_peak, lf_db = bands.lf_peak, bands.lf_db
+    if bands.lf_db == -math.inf:
+        lf_peak = lf_db = np.nan
+    hf_peak, hf_db = bands.hf_peak, bands.hf_db
+    if bands.hf_db == -math.inf:
+        hf_peak = hf_db = np.nan
+    row = {
         "Filename": label,
-        "LFN Peak (Hz)": round(float(max_lfn_peak), 2),
-        "LFN dB": round(float(max_lfn_db), 2),
-        "Ultrasonic Peak (Hz)": round(float(max_hf_peak), 2),
-        "Ultrasonic dB": round(float(max_hf_db), 2),
-        "Spectrogram": out_img,
+        "LFN Peak (Hz)": round(lf_peak, 2),
+        "LFN dB": round(lf_db, 2),
+        "Ultrasonic Peak (Hz)": round(hf_peak, 2),
+        "Ultrasonic dB": round(hf_db, 2),
+    }
+    for name, band in (("LFN", stats.lf), ("Ultrasonic", stats.hf)):
+        summary = band.summary() if band is not None else {}
+        row[f"{name} Leq (dB)"] = round(summary.get("leq_db", np.nan), 2)
+        for percent in EXCEEDED_PERCENTS:
+            level = summary.get(f"l{percent}_db", np.nan)
+            row[f"{name} L{percent} (dB)"] = round(level, 2)
+    row["Spectrogram"] = out_img
+    row["Timeline"] = out_timeline
+    return row
+
+
+def _init_worker():
+    """Prepare a pool worker once, before it takes any file."""
+
+    global SHOW_PROGRESS
+
+    SHOW_PROGRESS = False
+    # The pool already uses every core; one BLAS thread per worker avoids
+    # oversubscription. The environment variables cover spawned workers,
+    # threadpoolctl the pools inherited by forked ones.
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(1)
+
+
+def output_names(paths):
+    """Return the name of each file's image and timeline, keyed by path.
+
+    Outputs are named after the file's stem. Files sharing a stem, such as
+    ``a.wav`` and ``a.mp3``, keep their extension in the name instead
+    (``a_mp3``), so no two files write the same image or timeline.
+
+    Raises
+    ------
+    ValueError
+        If files still share an output name, e.g. files of the same name
+        in different directories.
+    """
+
+    stems = collections.defaultdict(list)
+    for path in paths:
+        stems[os.path.splitext(os.path.basename(path))[0]].append(path)
+    names = {}
+    for stem, group in stems.items():
+        for path in group:
+            name = stem
+            if len(group) > 1:
+                name = os.path.basename(path).replace(".", "_")
+            names[path] = name
+
+    files = collections.defaultdict(list)
+    for path, name in names.items():
+        files[name].append(path)
+    clashes = [group for group in files.values() if len(group) > 1]
+    if clashes:
+        raise ValueError(
+            "Files would overwrite each other's outputs: "
+            + "; ".join(", ".join(group) for group in clashes)
+        )
+    return names
+
+
+def _named_after(row, name):
+    # Whether the outputs of a cached row carry the expected name
+    return all(
+        os.path.splitext(os.path.basename(row[column]))[0] == name
+        for column in ("Spectrogram", "Timeline")
+        if row.get(column)
+    )
+
+
+def _analyze_file_safe(full_path, output_name, kwargs, renderer=None):
+    """Run :func:`analyze_audio` without raising; return ``(row, error)``."""
+
+    try:
+        row = analyze_audio(
+            full_path,
+            os.path.basename(full_path),
+            renderer=renderer,
+            output_name=output_name,
+            **kwargs,
+        )
+        return row, None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def analysis_params(
+    spectrograms=True, timelines=True, interval=TIMELINE_INTERVAL
+):
+    """Return the cache parameters of an :func:`analyze_audio` run.
+
+    The block duration is not among them: it does not change the results.
+    """
+
+    return (
+        ANALYSIS_VERSION,
+        LF_RANGE,
+        HF_RANGE,
+        SPECTROGRAM_MAX_FREQ,
+        bool(spectrograms),
+        bool(timelines),
+        float(interval),
+    )
+
+
+def analyze_files(
+    paths,
+    block_duration=None,
+    spectrograms=True,
+    jobs=1,
+    cache=None,
+    timelines=True,
+    interval=TIMELINE_INTERVAL,
+):
+    """Analyze audio files, in parallel when ``jobs`` is above one.
+
+    Parameters
+    ----------
+    paths : list of str
+        Files to analyze.
+    block_duration : float, optional
+        See :func:`analyze_audio`.
+    spectrograms : bool, optional
+        Render a spectrogram image of each file.
+    jobs : int, optional
+        Number of worker processes. With ``1`` the files are analyzed in
+        this process and images are rendered in the background; a file
+        whose image fails is reported like a file that fails to analyze.
+    cache : AnalysisCache, optional
+        Files with a cached row are not analyzed again; the rows of newly
+        analyzed files are recorded in it.
+    timelines : bool, optional
+        Write the per-interval statistics of each file.
+    interval : float, optional
+        Timeline interval in seconds.
+
+    Returns
+    -------
+    list of dict
+        Rows of the files that were analyzed or cached, in the order of
+        ``paths``. Failures are reported and left out.
+
+    Raises
+    ------
+    ValueError
+        If two files would write the same image or timeline (see
+        :func:`output_names`). Nothing is analyzed then.
+    """
+
+    names = output_names(paths)
+    params = analysis_params(spectrograms, timelines, interval)
+    kwargs = {
+        "block_duration": block_duration,
+        "spectrogram_image": spectrograms,
+        "timeline": timelines,
+        "interval": interval,
     }
+    outcomes = {}
+    if cache is not None:
+        for path in paths:
+            row = cache.lookup(path, params)
+            # A file added with the same stem renames the outputs
+            if row is not None and _named_after(row, names[path]):
+                outcomes[path] = row, None
+    pending = [path for path in paths if path not in outcomes]
+
+    if jobs == 1:
+        renderer = SpectrogramRenderer(cmap="viridis", enabled=spectrograms)
+        renders = {}
+        with renderer:
+            for path in tqdm(pending, desc="Files", unit="file"):
+                outcomes[path] = _analyze_file_safe(
+                    path, names[path], kwargs, renderer
+                )
+                renders[path] = renderer.take_pending()
+        # A failed image fails its file, as it does when rendered in a
+        # worker, instead of the whole run
+        for path, futures in renders.items():
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    outcomes[path] = None, f"{type(e).__name__}: {e}"
+    else:
+        for var in THREAD_LIMIT_VARS:
+            os.environ.setdefault(var, "1")
+        with ProcessPoolExecutor(jobs, initializer=_init_worker) as pool:
+            futures = {
+                pool.submit(
+                    _analyze_file_safe, path, names[path], kwargs
+                ): path
+                for path in pending
+            }
+            for future in tqdm(
+                as_completed(futures), total=len(futures), desc="Files",
+                unit="file",
+            ):
+                try:
+                    outcomes[futures[future]] = future.result()
+                except Exception as e:  # worker process died
+                    outcomes[futures[future]] = None, str(e)
+
+    if cache is not None:
+        for path in pending:
+            row, error = outcomes[path]
+            if error is None:
+                cache.record(path, params, row)
+
+    results = []
+    for path in paths:
+        row, error = outcomes[path]
+        if error is not None:
+            print(f"Error analyzing {os.path.basename(path)}: {error}")
+        else:
+            results.append(row)
+    return results
 
 
 def main():
@@ -154,37 +528,78 @@ def main():
         default=None,
         help="Chunk size in seconds for processing large files",
     )
+    parser.add_argument(
+        "--no-spectrograms",
+        dest="spectrograms",
+        action="store_false",
+        help="Skip accumulating and rendering spectrogram images",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes analyzing files in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--no-timelines",
+        dest="timelines",
+        action="store_false",
+        help=f"Skip writing per-interval statistics to {TIMELINE_FOLDER}/",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=TIMELINE_INTERVAL,
+        help=f"Timeline interval in seconds (default: {TIMELINE_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help=f"Analyze every file again instead of reusing {CACHE_FILE}",
+    )
+    parser.add_argument(
+        "--hash-files",
+        action="store_true",
+        help="Also compare file contents, so touched files are not redone",
+    )
     args = parser.parse_args()
 
     input_dir = args.directory
-    block_duration = args.block_duration
-    files = [
+    files = sorted(
         f
         for f in os.listdir(input_dir)
-        if f.lower().split(".")[-1] in ["wav", "mp3", "mp4", "m4a"]
-    ]
-    for file in tqdm(files, desc="Files", unit="file"):
-        ext = file.lower().split(".")[-1]
-        full_path = os.path.join(input_dir, file)
-        label = os.path.splitext(file)[0]
-        wav_path = full_path
-        if ext != "wav":
-            wav_path = os.path.join(input_dir, f"{label}_converted.wav")
-            convert_to_wav(full_path, wav_path)
-        try:
-            result = analyze_audio(
-                wav_path, file, block_duration=block_duration
-            )
-            results.append(result)
-        except Exception as e:
-            print(f"Error analyzing {file}: {e}")
+        if f.lower().split(".")[-1] in AUDIO_EXTENSIONS
+    )
+    cache = None
+    if args.cache:
+        cache = AnalysisCache(
+            os.path.join(input_dir, CACHE_FILE), hash_files=args.hash_files
+        )
+    try:
+        results = analyze_files(
+            [os.path.join(input_dir, f) for f in files],
+            block_duration=args.block_duration,
+            spectrograms=args.spectrograms,
+            jobs=max(1, args.jobs),
+            cache=cache,
+            timelines=args.timelines,
+            interval=args.interval,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    if cache is not None:
+        cache.save()
+        print(f"Reused {cache.hits} cached results")
+
+    import pandas as pd
 
     df = pd.DataFrame(results)
     out_csv = os.path.join(input_dir, OUTPUT_CSV)
-    df.to_csv(out_csv, index=False)
+    write_atomic(out_csv, lambda tmp_path: df.to_csv(tmp_path, index=False))
     print(
         "\n✅ Analysis complete. Results saved to "
-        f"{out_csv} and {SPECTROGRAM_FOLDER}/"
+        f"{out_csv}, {SPECTROGRAM_FOLDER}/ and {TIMELINE_FOLDER}/"
     )
 
 
@@ -1,90 +1,38 @@
 import sounddevice as sd
 import numpy as np
+import math
 import queue
+import signal
 import threading
-import sqlite3
-import matplotlib.pyplot as plt
-from scipy.signal import spectrogram
-from datetime import datetime
 import time
 
+from live_analysis import LiveAnalyzer
+from live_log_store import DB_PATH, LiveLogWriter
+from live_metrics import HOST, PORT, MetricsPublisher, serve
+
 SAMPLE_RATE = 44100
+# Seconds between two measurements written to the live log
 DURATION_SEC = 5
 LF_RANGE = (20, 100)
 HF_RANGE = (20000, 24000)
-DB_PATH = "lfn_live_log.db"
+# Redraws of the live spectrogram per second
+RENDER_FPS = 10
+# Levels shown below the loudest bin of the displayed history
+DISPLAY_RANGE_DB = 80
 
 monitoring = False
 audio_queue = queue.Queue()
+log_writer = None
+analyzer = None
+# MetricsPublisher of the headless mode, None with the window
+metrics = None
 
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """CREATE TABLE IF NOT EXISTS live_logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        timestamp TEXT,
-        lfn_peak REAL,
-        lfn_db REAL,
-        hf_peak REAL,
-        hf_db REAL
-    )"""
-    )
-    conn.commit()
-    conn.close()
+    """Start the background writer of the live log database."""
 
-
-def analyze_and_plot(audio_data):
-    audio_data = audio_data.flatten()
-    f, t, Sxx = spectrogram(
-        audio_data, fs=SAMPLE_RATE, nperseg=2048, noverlap=1024
-    )
-    Sxx_db = 10 * np.log10(Sxx + 1e-10)
-
-    # LFN
-    lfn_mask = (f >= LF_RANGE[0]) & (f <= LF_RANGE[1])
-    lfn_freqs = f[lfn_mask]
-    lfn_spec = Sxx_db[lfn_mask, :]
-    lfn_peak = lfn_freqs[
-        np.unravel_index(np.argmax(lfn_spec), lfn_spec.shape)[0]
-    ]
-    lfn_db = np.max(lfn_spec)
-
-    # Ultrasonic
-    hf_mask = (f >= HF_RANGE[0]) & (f <= HF_RANGE[1])
-    hf_freqs = f[hf_mask]
-    hf_spec = Sxx_db[hf_mask, :]
-    if hf_freqs.size > 0:
-        hf_peak = hf_freqs[
-            np.unravel_index(np.argmax(hf_spec), hf_spec.shape)[0]
-        ]
-        hf_db = np.max(hf_spec)
-    else:
-        hf_peak, hf_db = 0, -100
-
-    # DB logging
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO live_logs (timestamp, lfn_peak, lfn_db, hf_peak, hf_db)"
-        " VALUES (?, ?, ?, ?, ?)",
-        (datetime.now().isoformat(), lfn_peak, lfn_db, hf_peak, hf_db),
-    )
-    conn.commit()
-    conn.close()
-
-    # Plot
-    plt.clf()
-    plt.pcolormesh(t, f[f <= 500], Sxx_db[f <= 500, :], shading="gouraud")
-    plt.title(
-        "Live Spectrogram - LFN: "
-        f"{lfn_peak:.1f} Hz @ {lfn_db:.1f} dB | "
-        f"HF: {hf_peak:.1f} Hz @ {hf_db:.1f} dB"
-    )
-    plt.ylabel("Frequency (Hz)")
-    plt.xlabel("Time (s)")
-    plt.pause(0.01)
+    global log_writer
+    log_writer = LiveLogWriter(DB_PATH)
 
 
 def audio_callback(indata, frames, time_info, status):
@@ -92,31 +40,58 @@ def audio_callback(indata, frames, time_info, status):
         audio_queue.put(indata.copy())
 
 
+def analysis_loop():
+    """Analyse captured blocks as they arrive and log their peaks."""
+
+    next_log = time.monotonic() + DURATION_SEC
+    frames = analyzer.frames
+    while monitoring:
+        try:
+            blocks = [audio_queue.get(timeout=0.1)]
+        except queue.Empty:
+            continue
+        # Catch up in one call if the analysis fell behind the capture
+        while not audio_queue.empty():
+            blocks.append(audio_queue.get())
+        analyzer.feed(np.concatenate(blocks)[:, 0])
+        if metrics is not None and analyzer.frames != frames:
+            frames = analyzer.frames
+            metrics.publish(analyzer.current, frames)
+
+        if time.monotonic() >= next_log:
+            next_log += DURATION_SEC
+            lfn_peak, lfn_db, hf_peak, hf_db = analyzer.take_peaks()
+            if lfn_db == -math.inf:
+                continue
+            if hf_db == -math.inf:
+                hf_peak, hf_db = 0, -100
+            # Written in batches by the writer thread
+            log_writer.log(lfn_peak, lfn_db, hf_peak, hf_db)
+            if metrics is not None:
+                metrics.record((lfn_peak, lfn_db, hf_peak, hf_db))
+
+
 def record_loop(device=None):
+    global analyzer
+    # Start from a clean stream; the display keeps the previous history
+    # until new frames arrive
+    analyzer = LiveAnalyzer(SAMPLE_RATE, LF_RANGE, HF_RANGE)
+    while not audio_queue.empty():
+        audio_queue.get()
     with sd.InputStream(
         samplerate=SAMPLE_RATE,
         device=device,
         channels=1,
         callback=audio_callback,
     ):
-        print("🎙️  Monitoring started (Press ENTER to stop)...")
-        plt.ion()
-        while monitoring:
-            time.sleep(DURATION_SEC)
-            buffer = []
-            while not audio_queue.empty():
-                buffer.append(audio_queue.get())
-            if buffer:
-                audio_data = np.concatenate(buffer, axis=0)
-                analyze_and_plot(audio_data)
-        plt.ioff()
-        plt.close()
+        analysis_loop()
 
 
 def toggle_monitoring(device=None):
     global monitoring
     if not monitoring:
         monitoring = True
+        print("🎙️  Monitoring started (Press ENTER to stop)...")
         threading.Thread(
             target=record_loop, args=(device,), daemon=True
         ).start()
@@ -125,19 +100,150 @@ def toggle_monitoring(device=None):
         print("🛑 Monitoring stopped.")
 
 
-if __name__ == "__main__":
-    init_db()
-    print("Available audio input devices:")
-    print(sd.query_devices())
-    selected_device = input("Enter device index or press ENTER for default: ")
-    selected_device = (
-        int(selected_device) if selected_device.strip().isdigit() else None
-    )
-    print("Press ENTER to start/stop real-time monitoring. Ctrl+C to exit.")
+def keyboard_loop(device=None):
+    """Toggle monitoring on every ENTER."""
+
     try:
         while True:
             input()
-            toggle_monitoring(device=selected_device)
+            toggle_monitoring(device=device)
+    except EOFError:
+        pass
+
+
+def render_loop():
+    """Redraw the live spectrogram at ``RENDER_FPS`` until it is closed.
+
+    Only the image data and the title of one preallocated image are
+    updated, so drawing never waits for the analysis and vice versa.
+    """
+
+    import matplotlib.pyplot as plt
+
+    plt.ion()
+    fig, ax = plt.subplots()
+    image = analyzer.snapshot()
+    history = image.shape[1] / analyzer.frame_rate
+    freqs = analyzer.freqs
+    artist = ax.imshow(
+        image,
+        origin="lower",
+        aspect="auto",
+        interpolation="bilinear",
+        extent=(-history, 0, freqs[0], freqs[-1]),
+    )
+    ax.set_ylabel("Frequency (Hz)")
+    ax.set_xlabel("Time (s)")
+    while plt.fignum_exists(fig.number):
+        live = analyzer
+        live.snapshot(out=image)
+        if np.isfinite(image).any():
+            top = float(np.nanmax(image))
+            artist.set_clim(top - DISPLAY_RANGE_DB, top)
+        artist.set_data(image)
+        lfn_peak, lfn_db, hf_peak, hf_db = live.current
+        ax.set_title(
+            "Live Spectrogram - LFN: "
+            f"{lfn_peak:.1f} Hz @ {lfn_db:.1f} dB | "
+            f"HF: {hf_peak:.1f} Hz @ {hf_db:.1f} dB"
+        )
+        plt.pause(1 / RENDER_FPS)
+    plt.ioff()
+
+
+def stop_monitoring(signum=None, frame=None):
+    """Stop the analysis loop; also the SIGTERM handler of headless mode."""
+
+    global monitoring
+    monitoring = False
+
+
+def run_headless(device=None, host=HOST, port=PORT):
+    """Monitor without a window, serving the levels over HTTP.
+
+    Runs until interrupted or sent SIGTERM (``docker stop``).
+    """
+
+    global metrics, monitoring
+    metrics = MetricsPublisher()
+    server = serve(metrics, host, port)
+    signal.signal(signal.SIGTERM, stop_monitoring)
+    print(
+        f"Serving metrics on http://{host}:{server.server_port}/metrics "
+        "(JSON at /metrics.json)"
+    )
+    monitoring = True
+    try:
+        record_loop(device)
+    finally:
+        server.shutdown()
+
+
+def run_interactive(device=None):
+    """Toggle monitoring with ENTER and show the live spectrogram."""
+
+    global analyzer
+    print(
+        "Press ENTER to start/stop real-time monitoring. "
+        "Close the window or press Ctrl+C to exit."
+    )
+    analyzer = LiveAnalyzer(SAMPLE_RATE, LF_RANGE, HF_RANGE)
+    threading.Thread(
+        target=keyboard_loop, args=(device,), daemon=True
+    ).start()
+    # GUI calls stay on the main thread
+    render_loop()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Monitor an audio input for LFN and ultrasonic peaks"
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run without a window and serve the levels over HTTP",
+    )
+    parser.add_argument(
+        "--device",
+        type=int,
+        default=None,
+        help="Input device index (prompted for when omitted with a window)",
+    )
+    parser.add_argument(
+        "--host",
+        default=HOST,
+        help="Address of the metrics endpoint; 0.0.0.0 inside Docker",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=PORT,
+        help="Port of the metrics endpoint",
+    )
+    args = parser.parse_args()
+
+    init_db()
+    device = args.device
+    if device is None and not args.headless:
+        print("Available audio input devices:")
+        print(sd.query_devices())
+        selected = input("Enter device index or press ENTER for default: ")
+        device = int(selected) if selected.strip().isdigit() else None
+    try:
+        if args.headless:
+            run_headless(device, args.host, args.port)
+        else:
+            run_interactive(device)
     except KeyboardInterrupt:
-        monitoring = False
+        pass
+    finally:
+        stop_monitoring()
         print("\n[EXIT] Monitoring session ended.")
+        log_writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Time-resolved LFN and ultrasonic statistics computed in one pass.
+
+The level of a band in each STFT frame is the power summed over its bins,
+in dB relative to full scale. :class:`LevelHistogram` keeps the energy sum
+for the equivalent continuous level (Leq) and a fixed 0.1 dB histogram for
+the percentile levels: ``L10`` is the level exceeded 10 % of the time,
+``L90`` the background level exceeded 90 % of the time. Memory does not grow
+with the recording, apart from one timeline row per interval.
+"""
+
+import math
+
+import numpy as np
+
+# Range and resolution of the level histograms in dB
+LEVEL_MIN_DB = -160.0
+LEVEL_MAX_DB = 20.0
+LEVEL_STEP_DB = 0.1
+# Percentile levels reported, as the percentage of time they are exceeded
+EXCEEDED_PERCENTS = (10, 50, 90)
+# Length of one timeline interval in seconds
+TIMELINE_INTERVAL = 60.0
+
+
+def band_levels(db, bin_width, floor=0.0):
+    """Return the level of each frame of a band in dB.
+
+    Parameters
+    ----------
+    db : numpy.ndarray
+        ``(freqs, frames)`` power spectral density in dB.
+    bin_width : float
+        Width of the frequency bins in Hz.
+    floor : float, optional
+        Power that was added to every bin before taking the logarithm; it
+        is removed again so it does not accumulate over the bins.
+    """
+
+    power = np.maximum(10 ** (db / 10) - floor, 0).sum(axis=0) * bin_width
+    with np.errstate(divide="ignore"):
+        return 10 * np.log10(power)
+
+
+class LevelHistogram:
+    """Running Leq and percentile levels of a stream of dB values."""
+
+    def __init__(self):
+        bins = round((LEVEL_MAX_DB - LEVEL_MIN_DB) / LEVEL_STEP_DB)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.energy = 0.0
+        self.frames = 0
+
+    def add(self, levels):
+        """Add the levels of consecutive frames."""
+
+        if not len(levels):
+            return
+        idx = np.floor((levels - LEVEL_MIN_DB) / LEVEL_STEP_DB)
+        idx = np.clip(idx, 0, len(self.counts) - 1).astype(np.intp)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        self.energy += float(np.sum(10 ** (levels / 10)))
+        self.frames += len(levels)
+
+    def leq(self):
+        """Return the equivalent continuous level, NaN before any frame."""
+
+        if not self.frames:
+            return math.nan
+        if not self.energy:
+            return -math.inf
+        return 10 * math.log10(self.energy / self.frames)
+
+    def exceeded(self, percent):
+        """Return the level exceeded ``percent`` % of the time.
+
+        The result is the centre of a histogram bin, so it is accurate to
+        half of ``LEVEL_STEP_DB``; NaN before any frame.
+        """
+
+        if not self.frames:
+            return math.nan
+        below = max(1.0, self.frames * (1 - percent / 100))
+        idx = int(np.searchsorted(np.cumsum(self.counts), below))
+        return LEVEL_MIN_DB + (idx + 0.5) * LEVEL_STEP_DB
+
+
+class BandStatistics:
+    """Whole-recording and per-interval statistics of one band.
+
+    Parameters
+    ----------
+    freqs : numpy.ndarray
+        Centre frequencies of the band's bins.
+    frame_rate : float
+        STFT frames per second. Frame ``j`` is centred at
+        ``(j + 1) / frame_rate`` seconds (half-overlapping segments).
+    interval : float, optional
+        Timeline interval in seconds.
+    floor : float, optional
+        Power floor of the dB frames (see :func:`band_levels`).
+    """
+
+    def __init__(
+        self, freqs, frame_rate, interval=TIMELINE_INTERVAL, floor=0.0
+    ):
+        self.freqs = freqs
+        self.frame_rate = frame_rate
+        self.interval = interval
+        self.floor = floor
+        self.bin_width = freqs[1] - freqs[0] if len(freqs) > 1 else 1.0
+        self.total = LevelHistogram()
+        self.timeline = {
+            name: [] for name in ("peak_hz", "peak_db", "leq_db")
+        }
+        for percent in EXCEEDED_PERCENTS:
+            self.timeline[f"l{percent}_db"] = []
+        self._frames = 0
+        self._index = 0
+        self._new_interval()
+
+    def add(self, db):
+        """Add ``(freqs, frames)`` dB frames that follow the previous ones."""
+
+        n = db.shape[1]
+        if not n:
+            return
+        levels = band_levels(db, self.bin_width, self.floor)
+        self.total.add(levels)
+        peak_db = db.max(axis=0)
+        peak_hz = self.freqs[db.argmax(axis=0)]
+
+        times = (self._frames + np.arange(1, n + 1)) / self.frame_rate
+        index = (times // self.interval).astype(np.int64)
+        self._frames += n
+        # Frames are in time order, so each interval is one run of frames
+        bounds = np.flatnonzero(np.diff(index)) + 1
+        for start, end in zip(np.r_[0, bounds], np.r_[bounds, n]):
+            while self._index < index[start]:
+                self._close()
+            self._levels.add(levels[start:end])
+            best = start + int(np.argmax(peak_db[start:end]))
+            if peak_db[best] > self._peak_db:
+                self._peak_hz, self._peak_db = peak_hz[best], peak_db[best]
+
+    def _new_interval(self):
+        self._levels = LevelHistogram()
+        self._peak_hz, self._peak_db = math.nan, -math.inf
+
+    def _close(self):
+        # Intervals without frames become rows of NaN
+        empty = not self._levels.frames
+        self.timeline["peak_hz"].append(float(self._peak_hz))
+        self.timeline["peak_db"].append(
+            math.nan if empty else float(self._peak_db)
+        )
+        self.timeline["leq_db"].append(self._levels.leq())
+        for percent in EXCEEDED_PERCENTS:
+            self.timeline[f"l{percent}_db"].append(
+                self._levels.exceeded(percent)
+            )
+        self._index += 1
+        self._new_interval()
+
+    def finish(self):
+        """Close the last interval, if any frame fell into it."""
+
+        if self._levels.frames:
+            self._close()
+
+    def summary(self):
+        """Return Leq and the percentile levels of the whole recording."""
+
+        summary = {"leq_db": self.total.leq()}
+        for percent in EXCEEDED_PERCENTS:
+            summary[f"l{percent}_db"] = self.total.exceeded(percent)
+        return summary
+
+
+class LfnStatistics:
+    """Statistics of the LFN and ultrasonic bands of a :class:`BandAnalyzer`.
+
+    Call :meth:`update` after every ``feed`` of the analyzer.
+    """
+
+    def __init__(self, bands, interval=TIMELINE_INTERVAL):
+        self.interval = interval
+        floor = bands.power_floor
+        self.lf = BandStatistics(
+            bands.lf_freqs, bands.image_rate, interval, floor
+        )
+        self.hf = None
+        if len(bands.hf_freqs):
+            self.hf = BandStatistics(
+                bands.hf_freqs, bands.hf_frame_rate, interval, floor
+            )
+
+    def update(self, bands):
+        """Add the frames of the analyzer's last block."""
+
+        self.lf.add(bands.lf_frames)
+        if self.hf is not None:
+            self.hf.add(bands.hf_frames)
+
+    def finish(self):
+        """Close the last timeline interval."""
+
+        self.lf.finish()
+        if self.hf is not None:
+            self.hf.finish()
+
+    def timeline(self):
+        """Return the timeline as a dict of equally long columns.
+
+        ``start_s`` holds the start of each interval; LFN columns are
+        prefixed ``lf_`` and ultrasonic ones ``hf_`` (NaN without an
+        ultrasonic band).
+        """
+
+        lf = self.lf.timeline
+        hf = self.hf.timeline if self.hf is not None else {}
+        rows = max(len(band["leq_db"]) for band in (lf, hf) if band)
+        columns = {"start_s": np.arange(rows) * self.interval}
+        for prefix, band in (("lf_", lf), ("hf_", hf)):
+            for name in lf:
+                column = np.full(rows, np.nan)
+                values = band.get(name, [])
+                column[:len(values)] = values
+                columns[prefix + name] = column
+        return columns
+
+    def save_timeline(self, path):
+        """Write :meth:`timeline` to a compressed ``.npz`` file.
+
+        Load it with ``pandas.DataFrame(dict(numpy.load(path)))``.
+        """
+
+        np.savez_compressed(path, **self.timeline())
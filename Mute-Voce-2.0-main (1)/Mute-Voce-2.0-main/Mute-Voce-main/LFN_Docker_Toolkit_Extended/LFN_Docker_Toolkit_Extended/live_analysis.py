@@ -0,0 +1,153 @@
+"""Incremental analysis of a live audio stream.
+
+:class:`LiveAnalyzer` is fed audio as it is captured. The underlying
+:class:`band_analysis.BandAnalyzer` keeps its filter and framing state, so
+each block only costs the STFT hops it completes and a new frame is ready
+one hop after its last sample arrives. The most recent frames are kept in a
+preallocated ring buffer for display, and the LFN and ultrasonic peaks are
+updated from the new frames alone.
+
+Feeding and reading may happen on different threads; nothing here imports
+matplotlib.
+"""
+
+import math
+import threading
+
+import numpy as np
+
+from band_analysis import HF_RANGE, IMAGE_MAX_FREQ, LF_RANGE, BandAnalyzer
+
+# Seconds of spectrogram kept for display
+HISTORY_SECONDS = 10.0
+
+
+def frame_peak(db, freqs):
+    """Return ``(frequency, level)`` of the loudest bin of ``db`` frames.
+
+    ``(0.0, -inf)`` when there are no frames or bins.
+    """
+
+    if not db.size:
+        return 0.0, -math.inf
+    idx = np.argmax(db)
+    return float(freqs[idx // db.shape[1]]), float(db.flat[idx])
+
+
+class LiveAnalyzer:
+    """Sliding spectrogram and peak tracker of a mono stream.
+
+    Parameters
+    ----------
+    sample_rate : int
+        Sample rate of the stream in Hz.
+    lf_range, hf_range : tuple of float, optional
+        LFN and ultrasonic bands in Hz.
+    history : float, optional
+        Seconds of image frames kept in the ring buffer.
+
+    Attributes
+    ----------
+    freqs : numpy.ndarray
+        Frequencies of the image rows.
+    frame_rate : float
+        Image frames per second.
+    frames : int
+        Number of image frames analysed so far.
+    current : tuple
+        ``(lfn_peak, lfn_db, hf_peak, hf_db)`` of the frames completed by
+        the last block that completed any.
+    """
+
+    def __init__(
+        self,
+        sample_rate,
+        lf_range=LF_RANGE,
+        hf_range=HF_RANGE,
+        history=HISTORY_SECONDS,
+    ):
+        self.bands = BandAnalyzer(
+            sample_rate, lf_range, hf_range, IMAGE_MAX_FREQ
+        )
+        self.freqs = self.bands.image_freqs
+        self.frame_rate = self.bands.image_rate
+        columns = max(1, round(history * self.frame_rate))
+        self._ring = np.full((len(self.freqs), columns), np.nan, np.float32)
+        self.frames = 0
+        self.current = (0.0, -math.inf, 0.0, -math.inf)
+        self._window = self.current
+        self._lock = threading.Lock()
+
+    @property
+    def columns(self):
+        """Number of frames held in the ring buffer."""
+
+        return self._ring.shape[1]
+
+    def feed(self, x):
+        """Analyse the next block of samples as soon as it is captured."""
+
+        image = self.bands.feed(x)
+        lf = frame_peak(self.bands.lf_frames, self.bands.lf_freqs)
+        hf = frame_peak(self.bands.hf_frames, self.bands.hf_freqs)
+
+        with self._lock:
+            n = image.shape[1]
+            # Only the newest frames fit once a block spans the ring
+            image = image[:, max(0, n - self.columns):]
+            m = image.shape[1]
+            first = (self.frames + n - m) % self.columns
+            head = min(m, self.columns - first)
+            self._ring[:, first:first + head] = image[:, :head]
+            self._ring[:, :m - head] = image[:, head:]
+            self.frames += n
+
+            self._window = self._max_peaks(self._window, lf + hf)
+            lf = lf if lf[1] > -math.inf else self.current[:2]
+            hf = hf if hf[1] > -math.inf else self.current[2:]
+            self.current = lf + hf
+
+    @staticmethod
+    def _max_peaks(a, b):
+        lf = a[:2] if a[1] >= b[1] else b[:2]
+        hf = a[2:] if a[3] >= b[3] else b[2:]
+        return lf + hf
+
+    def take_peaks(self):
+        """Return the loudest peaks since the previous call and reset them.
+
+        Returns
+        -------
+        tuple
+            ``(lfn_peak, lfn_db, hf_peak, hf_db)``; levels are ``-inf``
+            while no frame of a band has completed.
+        """
+
+        with self._lock:
+            peaks = self._window
+            self._window = (0.0, -math.inf, 0.0, -math.inf)
+        return peaks
+
+    def snapshot(self, out=None):
+        """Copy the ring buffer in time order, oldest frame first.
+
+        Parameters
+        ----------
+        out : numpy.ndarray, optional
+            Preallocated ``(len(freqs), columns)`` float32 array to fill;
+            frames not analysed yet are NaN.
+
+        Returns
+        -------
+        numpy.ndarray
+            ``out``, or a new array.
+        """
+
+        if out is None:
+            out = np.empty_like(self._ring)
+        with self._lock:
+            split = self.frames % self.columns
+            tail = self.columns - split
+            out[:, :tail] = self._ring[:, split:]
+            out[:, tail:] = self._ring[:, :split]
+        return out
@@ -0,0 +1,277 @@
+"""Batched SQLite logging of live LFN measurements.
+
+:class:`LiveLogWriter` owns one long-lived connection in WAL mode on a
+background thread. Measurements are queued without blocking the analysis
+and written in batches, one transaction per batch. Each batch also updates
+per-minute and per-hour rollup tables, and old rows are pruned
+periodically, so insert latency and range queries stay fast however long
+the monitor runs. A rollup table added to an existing database is first
+filled from the raw rows already there, so pruning them loses no history.
+
+Rollups keep the number of measurements, the loudest level with its
+frequency and the summed linear power of each band; the equivalent level
+of a bucket is ``10 * log10(lfn_energy / samples)``.
+"""
+
+from datetime import datetime, timedelta
+import queue
+import sqlite3
+import threading
+import time
+
+DB_PATH = "lfn_live_log.db"
+# Seconds a writer waits for another process holding the write lock
+BUSY_TIMEOUT = 60
+# Largest number of measurements written in one transaction
+BATCH_SIZE = 256
+# Seconds a measurement may wait in the queue before it is written
+FLUSH_INTERVAL = 1.0
+# Seconds between two retention passes
+PRUNE_INTERVAL = 3600.0
+# Days of raw measurements and rollups kept; None keeps everything
+RETENTION_DAYS = {
+    "live_logs": 7,
+    "live_logs_minute": 90,
+    "live_logs_hour": None,
+}
+# Rollup table -> length of its ISO bucket prefix ("YYYY-MM-DDTHH:MM")
+ROLLUPS = {"live_logs_minute": 16, "live_logs_hour": 13}
+# Raw rows read at a time when filling a new rollup table
+BACKFILL_BATCH_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS live_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    lfn_peak REAL,
+    lfn_db REAL,
+    hf_peak REAL,
+    hf_db REAL
+);
+CREATE INDEX IF NOT EXISTS idx_live_logs_timestamp ON live_logs(timestamp);
+"""
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    -- ISO timestamp truncated to the bucket
+    bucket TEXT PRIMARY KEY,
+    samples INTEGER NOT NULL,
+    lfn_peak REAL,
+    lfn_db_max REAL,
+    lfn_energy REAL,
+    hf_peak REAL,
+    hf_db_max REAL,
+    hf_energy REAL
+);
+"""
+
+ROLLUP_UPSERT = """
+INSERT INTO {table} (bucket, samples, lfn_peak, lfn_db_max, lfn_energy,
+                     hf_peak, hf_db_max, hf_energy)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(bucket) DO UPDATE SET
+    samples = samples + excluded.samples,
+    lfn_peak = CASE WHEN excluded.lfn_db_max > lfn_db_max
+                    THEN excluded.lfn_peak ELSE lfn_peak END,
+    lfn_db_max = max(lfn_db_max, excluded.lfn_db_max),
+    lfn_energy = lfn_energy + excluded.lfn_energy,
+    hf_peak = CASE WHEN excluded.hf_db_max > hf_db_max
+                   THEN excluded.hf_peak ELSE hf_peak END,
+    hf_db_max = max(hf_db_max, excluded.hf_db_max),
+    hf_energy = hf_energy + excluded.hf_energy
+"""
+
+
+def connect(path=DB_PATH):
+    """Open the live log database, creating the schema if needed."""
+
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    # Creating and filling a rollup table is one transaction, so a
+    # concurrent writer neither prunes the raw rows in between nor fills
+    # the table twice
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for table in ROLLUPS:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                "AND name = ?",
+                (table,),
+            ).fetchone()
+            if not exists:
+                conn.execute(ROLLUP_SCHEMA.format(table=table))
+                _backfill(conn, table)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return conn
+
+
+def _rollup(rows, prefix):
+    # Aggregate (timestamp, lfn_peak, lfn_db, hf_peak, hf_db) rows by bucket
+    buckets = {}
+    for timestamp, lfn_peak, lfn_db, hf_peak, hf_db in rows:
+        bucket = buckets.setdefault(
+            timestamp[:prefix],
+            [0, None, -float("inf"), 0.0, None, -float("inf"), 0.0],
+        )
+        bucket[0] += 1
+        if lfn_db > bucket[2]:
+            bucket[1], bucket[2] = lfn_peak, lfn_db
+        bucket[3] += 10 ** (lfn_db / 10)
+        if hf_db > bucket[5]:
+            bucket[4], bucket[5] = hf_peak, hf_db
+        bucket[6] += 10 ** (hf_db / 10)
+    return [(key, *values) for key, values in buckets.items()]
+
+
+def _backfill(conn, table):
+    # Roll up the raw rows logged before ``table`` existed
+    cursor = conn.execute(
+        "SELECT timestamp, lfn_peak, lfn_db, hf_peak, hf_db FROM live_logs "
+        "WHERE timestamp IS NOT NULL AND lfn_db IS NOT NULL "
+        "AND hf_db IS NOT NULL"
+    )
+    while True:
+        rows = cursor.fetchmany(BACKFILL_BATCH_SIZE)
+        if not rows:
+            break
+        conn.executemany(
+            ROLLUP_UPSERT.format(table=table), _rollup(rows, ROLLUPS[table])
+        )
+
+
+def write_batch(conn, rows):
+    """Insert measurements and update the rollups in one transaction.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Connection from :func:`connect`.
+    rows : list of tuple
+        ``(timestamp, lfn_peak, lfn_db, hf_peak, hf_db)`` with ISO
+        timestamps.
+    """
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO live_logs (timestamp, lfn_peak, lfn_db, hf_peak, "
+            "hf_db) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        for table, prefix in ROLLUPS.items():
+            conn.executemany(
+                ROLLUP_UPSERT.format(table=table), _rollup(rows, prefix)
+            )
+
+
+def prune(conn, now):
+    """Delete rows older than :data:`RETENTION_DAYS` before ``now``."""
+
+    with conn:
+        for table, days in RETENTION_DAYS.items():
+            if days is None:
+                continue
+            cutoff = (now - timedelta(days=days)).isoformat()
+            column = "timestamp" if table == "live_logs" else "bucket"
+            conn.execute(f"DELETE FROM {table} WHERE {column} < ?", (cutoff,))
+
+
+class LiveLogWriter:
+    """Write measurements to the live log from a background thread.
+
+    Use as a context manager, or call :meth:`close` to write what is still
+    queued and stop the thread.
+
+    Parameters
+    ----------
+    path : str, optional
+        SQLite database file.
+    batch_size : int, optional
+        Largest number of measurements per transaction.
+    flush_interval : float, optional
+        Seconds a measurement may wait before it is written.
+    """
+
+    def __init__(
+        self,
+        path=DB_PATH,
+        batch_size=BATCH_SIZE,
+        flush_interval=FLUSH_INTERVAL,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Create the schema before returning, so readers can query at once
+        connect(path).close()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def log(self, lfn_peak, lfn_db, hf_peak, hf_db, timestamp=None):
+        """Queue one measurement; ``timestamp`` defaults to now."""
+
+        if timestamp is None:
+            timestamp = datetime.now()
+        self._queue.put(
+            (
+                timestamp.isoformat(),
+                float(lfn_peak),
+                float(lfn_db),
+                float(hf_peak),
+                float(hf_db),
+            )
+        )
+
+    def close(self):
+        """Write the queued measurements and stop the writer thread."""
+
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _next_batch(self):
+        # Wait for a measurement, then collect what arrives within the
+        # flush interval. None in the queue asks the writer to stop.
+        batch = []
+        item = self._queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        while item is not None:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                item = self._queue.get(
+                    timeout=max(0.0, deadline - time.monotonic())
+                )
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _run(self):
+        conn = connect(self.path)
+        last_prune = None
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if not batch:
+                    continue
+                write_batch(conn, batch)
+                newest = datetime.fromisoformat(max(row[0] for row in batch))
+                if last_prune is None or newest - last_prune >= timedelta(
+                    seconds=PRUNE_INTERVAL
+                ):
+                    prune(conn, newest)
+                    last_prune = newest
+        finally:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,212 @@
+"""Live LFN levels served over HTTP for headless monitoring.
+
+:class:`MetricsPublisher` turns the analyzer's levels into finished
+response bodies on the analysis thread. The HTTP threads started by
+:func:`serve` only hand out the latest bodies, so a scrape never takes the
+analyzer's lock or delays the analysis, however often it comes.
+
+``/metrics`` answers in the Prometheus text format and ``/metrics.json``
+(or ``/``) with a JSON document holding the current levels and the recent
+logged measurements. Nothing here imports matplotlib.
+"""
+
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import threading
+
+HOST = "127.0.0.1"
+PORT = 9108
+# Logged measurements listed under "recent" in the JSON document
+RECENT_MEASUREMENTS = 60
+
+JSON_TYPE = "application/json"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Order of the values in a peaks tuple, as returned by LiveAnalyzer
+PEAK_FIELDS = ("lfn_peak_hz", "lfn_db", "hf_peak_hz", "hf_db")
+
+
+def _json_value(value):
+    # JSON has no infinities; a band without frames yet is null
+    return value if math.isfinite(value) else None
+
+
+def _prometheus_value(value):
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class MetricsPublisher:
+    """Latest JSON and Prometheus bodies of the live levels.
+
+    Parameters
+    ----------
+    recent : int, optional
+        Number of logged measurements kept for the JSON document.
+
+    Attributes
+    ----------
+    bodies : tuple of bytes
+        ``(json_body, prometheus_body)``, replaced as a whole on every
+        update so readers never see a half-built pair.
+    """
+
+    def __init__(self, recent=RECENT_MEASUREMENTS):
+        self._recent = deque(maxlen=recent)
+        self._current = (0.0, -math.inf, 0.0, -math.inf)
+        self._frames = 0
+        self._updated = None
+        self._measurements = 0
+        self.bodies = self._render()
+
+    def publish(self, current, frames, timestamp=None):
+        """Publish the levels of the latest frames.
+
+        Parameters
+        ----------
+        current : tuple
+            ``(lfn_peak, lfn_db, hf_peak, hf_db)`` of the latest frames.
+        frames : int
+            Number of frames analysed so far.
+        timestamp : datetime.datetime, optional
+            Time of the update; defaults to now.
+        """
+
+        self._current = tuple(float(v) for v in current)
+        self._frames = int(frames)
+        self._updated = timestamp or datetime.now()
+        self.bodies = self._render()
+
+    def record(self, peaks, timestamp=None):
+        """Add a logged measurement, the loudest peaks of one window."""
+
+        timestamp = timestamp or datetime.now()
+        self._recent.append((timestamp, tuple(float(v) for v in peaks)))
+        self._measurements += 1
+        self.bodies = self._render()
+
+    def _render(self):
+        document = {
+            "updated": self._updated and self._updated.isoformat(),
+            "frames": self._frames,
+            "current": {
+                name: _json_value(value)
+                for name, value in zip(PEAK_FIELDS, self._current)
+            },
+            "recent": [
+                {
+                    "timestamp": timestamp.isoformat(),
+                    **{
+                        name: _json_value(value)
+                        for name, value in zip(PEAK_FIELDS, peaks)
+                    },
+                }
+                for timestamp, peaks in self._recent
+            ],
+        }
+        json_body = json.dumps(document).encode()
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {_prometheus_value(value)}")
+
+        def bands(peaks, index):
+            return [
+                ('{band="lfn"}', peaks[index]),
+                ('{band="hf"}', peaks[index + 2]),
+            ]
+
+        metric(
+            "lfn_peak_frequency_hz",
+            "gauge",
+            "Frequency of the loudest bin of the latest frames.",
+            bands(self._current, 0),
+        )
+        metric(
+            "lfn_peak_level_db",
+            "gauge",
+            "Level of the loudest bin of the latest frames in dB.",
+            bands(self._current, 1),
+        )
+        if self._recent:
+            window = self._recent[-1][1]
+            metric(
+                "lfn_window_peak_frequency_hz",
+                "gauge",
+                "Frequency of the loudest bin of the last logged window.",
+                bands(window, 0),
+            )
+            metric(
+                "lfn_window_peak_level_db",
+                "gauge",
+                "Level of the loudest bin of the last logged window in dB.",
+                bands(window, 1),
+            )
+        metric(
+            "lfn_frames_total",
+            "counter",
+            "Spectrogram frames analysed.",
+            [("", self._frames)],
+        )
+        metric(
+            "lfn_measurements_total",
+            "counter",
+            "Measurements written to the live log.",
+            [("", self._measurements)],
+        )
+        if self._updated is not None:
+            metric(
+                "lfn_last_update_timestamp_seconds",
+                "gauge",
+                "Unix time of the latest frames.",
+                [("", self._updated.timestamp())],
+            )
+        prometheus_body = ("\n".join(lines) + "\n").encode()
+        return json_body, prometheus_body
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        json_body, prometheus_body = self.server.publisher.bodies
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body, content_type = prometheus_body, PROMETHEUS_TYPE
+        elif path in ("/", "/metrics.json"):
+            body, content_type = json_body, JSON_TYPE
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the console
+        pass
+
+
+def serve(publisher, host=HOST, port=PORT):
+    """Serve ``publisher`` over HTTP from a background thread.
+
+    Port 0 picks a free port, available as ``server.server_port``. Call
+    ``shutdown()`` on the returned server to stop it.
+    """
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.publisher = publisher
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -3,7 +3,6 @@ import time
 import numpy as np
 import sounddevice as sd
 import soundfile as sf
-from resemblyzer import VoiceEncoder, preprocess_wav
 from vad_enhancer import detect_voiced
 import argparse
 
@@ -141,6 +140,8 @@ def enhance_audio(input_file, output_file):
 
 
 def fingerprint_audio(file_path):
+    from resemblyzer import VoiceEncoder, preprocess_wav
+
     wav = preprocess_wav(file_path)
     encoder = VoiceEncoder()
     embed = encoder.embed_utterance(wav)
@@ -1,15 +1,13 @@
 
 """Voice activity detection utilities for incoming audio."""
 
+import math
+
 import numpy as np
 import webrtcvad
-import librosa
-
 
-SAMPLE_RATE = 48000
 
 SAMPLE_RATE = 48000
-main
 FRAME_DURATION = 30  # ms
 VAD_MODE = 2  # 0-3: higher = more aggressive
 
@@ -24,14 +22,16 @@ def frame_generator(audio, sample_rate, frame_duration_ms):
 
 def detect_voiced(audio, sample_rate=SAMPLE_RATE):
     if sample_rate not in (8000, 16000, 32000, 48000):
-        audio = librosa.resample(
-            audio.astype(np.float32),
-            orig_sr=sample_rate,
-            target_sr=48000,
-        )
-        sample_rate = 48000
+        from scipy.signal import resample_poly
+
+        if audio.dtype == np.int16:
+            audio = audio.astype(np.float32) / 32768
+        # Rational polyphase resampling; 192 kHz -> 48 kHz is a 1:4 decimation
+        g = math.gcd(sample_rate, SAMPLE_RATE)
+        audio = resample_poly(audio, SAMPLE_RATE // g, sample_rate // g)
+        sample_rate = SAMPLE_RATE
     if audio.dtype != np.int16:
-        audio = (audio * 32767).astype(np.int16)
+        audio = np.clip(audio * 32767, -32768, 32767).astype(np.int16)
     frames = frame_generator(audio, sample_rate, FRAME_DURATION)
     voiced = []
     for frame in frames:
@@ -1,19 +1,26 @@
+import functools
 import os
 import numpy as np
-from resemblyzer import VoiceEncoder, preprocess_wav
-from sklearn.cluster import KMeans
-from scipy.spatial.distance import cosine
 
-encoder = VoiceEncoder()
 SPEAKER_DB_PATH = (
     "scripts/speakers"  # Folder to store known speaker embeddings
 )
 os.makedirs(SPEAKER_DB_PATH, exist_ok=True)
 
 
+@functools.lru_cache(maxsize=None)
+def get_encoder():
+    # Loading the model takes seconds, so it is deferred to the first use
+    from resemblyzer import VoiceEncoder
+
+    return VoiceEncoder()
+
+
 def extract_embedding(wav_path):
+    from resemblyzer import preprocess_wav
+
     wav = preprocess_wav(wav_path)
-    return encoder.embed_utterance(wav)
+    return get_encoder().embed_utterance(wav)
 
 
 def save_speaker(name, embedding):
@@ -31,6 +38,8 @@ def load_known_speakers():
 
 
 def recognize_speaker(embedding, known_speakers, threshold=0.3):
+    from scipy.spatial.distance import cosine
+
     for name, ref_embedding in known_speakers.items():
         if cosine(embedding, ref_embedding) < threshold:
             return name
@@ -38,6 +47,8 @@ def recognize_speaker(embedding, known_speakers, threshold=0.3):
 
 
 def cluster_unknown_embeddings(embeddings, n_clusters=2):
+    from sklearn.cluster import KMeans
+
     kmeans = KMeans(n_clusters=n_clusters, random_state=42)
     labels = kmeans.fit_predict(embeddings)
     return labels
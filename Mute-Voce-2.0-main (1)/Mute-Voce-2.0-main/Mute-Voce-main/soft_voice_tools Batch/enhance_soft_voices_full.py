@@ -1,3 +1,4 @@
+import math
 import os
 import sys
 import subprocess
@@ -67,9 +68,16 @@ if ext == ".mp4":
 try:
     print("📝 Transcribing using Whisper (if installed)...")
     import whisper
+    from scipy.signal import resample_poly
 
+    # Hand Whisper the enhanced signal at its 16 kHz input rate instead of
+    # having it decode and resample the WAV again through ffmpeg
+    g = math.gcd(sr, whisper.audio.SAMPLE_RATE)
+    audio_16k = resample_poly(
+        y_enhanced, whisper.audio.SAMPLE_RATE // g, sr // g
+    ).astype(np.float32)
     model = whisper.load_model("base")
-    result = model.transcribe(wav_output)
+    result = model.transcribe(audio_16k)
     with open(f"transcript_{base_name}.txt", "w", encoding="utf-8") as f:
         f.write(result["text"])
     print(f"✅ Transcript saved: transcript_{base_name}.txt")
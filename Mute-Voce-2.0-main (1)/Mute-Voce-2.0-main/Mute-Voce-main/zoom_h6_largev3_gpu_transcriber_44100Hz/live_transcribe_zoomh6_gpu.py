@@ -1,3 +1,4 @@
+import math
 import os
 import sounddevice as sd
 import numpy as np
@@ -6,12 +7,15 @@ import threading
 import time
 import traceback
 from faster_whisper import WhisperModel
+from scipy.signal import resample_poly
 
 # Allow execution when multiple OpenMP runtimes are present on Windows.
 os.environ.setdefault("KMP_DUPLICATE_LIB_OK", "TRUE")
 
 # ------------------ CONFIGURATION ------------------
 SAMPLERATE = 44100
+# Whisper models take 16 kHz input; chunks are resampled before transcription
+WHISPER_SAMPLERATE = 16000
 CHANNELS = 1
 CHUNK_DURATION = 5
 DEVICE_NAME_FILTER = "zoom"
@@ -55,8 +59,12 @@ def transcribe_audio(audio_data):
             print("[INFO] Skipped silent audio chunk")
             return
         print("[INFO] Transcribing...")
+        g = math.gcd(SAMPLERATE, WHISPER_SAMPLERATE)
+        audio_16k = resample_poly(
+            audio_data, WHISPER_SAMPLERATE // g, SAMPLERATE // g
+        ).astype(np.float32)
         segments, _ = model.transcribe(
-            audio_data,
+            audio_16k,
             language="en",
             beam_size=5,
             vad_filter=True,
@@ -0,0 +1,417 @@
+"""End-to-end benchmarks of the audio pipelines with stored baselines.
+
+Deterministic synthetic recordings (speech-like bursts, mains hum and an
+ultrasonic tone over a noise floor) are generated at several lengths and
+sample rates. Each pipeline is timed on them and reported with its real-time
+factor (processing time divided by audio duration; lower is faster).
+
+Run the suite and store a baseline::
+
+    python benchmarks/run_benchmarks.py run --output baseline.json
+
+The run also times the cold start of the command-line entry points, each
+in a fresh interpreter. Compare a later run against the baseline; the
+command exits with status 1 when a benchmark got slower than the tolerance
+allows::
+
+    python benchmarks/run_benchmarks.py run --output current.json
+    python benchmarks/run_benchmarks.py compare baseline.json current.json
+"""
+
+import argparse
+from datetime import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import scipy.signal as signal
+import soundfile as sf
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TOOLKIT_DIR = os.path.join(
+    ROOT, "Mute-Voce-2.0-main (1)", "Mute-Voce-2.0-main", "Mute-Voce-main"
+)
+LFN_DIR = os.path.join(
+    TOOLKIT_DIR, "LFN_Docker_Toolkit_Extended", "LFN_Docker_Toolkit_Extended"
+)
+ZOOM_DIR = os.path.join(
+    TOOLKIT_DIR, "LiveVoiceAutoZoom", "LiveVoiceAutoZoom", "scripts"
+)
+for path in (ROOT, LFN_DIR, ZOOM_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+DEFAULT_DURATIONS = (10, 60)
+DEFAULT_RATES = (16000, 48000, 96000)
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.15
+
+
+def synth_recording(duration, sr, seed=0):
+    """Return a deterministic field-recording-like test signal.
+
+    The signal contains voiced bursts (a 110-220 Hz sawtooth source through
+    two formant resonances), 50 Hz hum with harmonics, a 21 kHz tone when
+    the sample rate allows it, and a low noise floor.
+
+    Parameters
+    ----------
+    duration : float
+        Length in seconds.
+    sr : int
+        Sample rate in Hz.
+    seed : int, optional
+        Seed of the random generator.
+
+    Returns
+    -------
+    numpy.ndarray
+        Mono float32 samples in ``[-1, 1]``.
+    """
+
+    rng = np.random.default_rng(seed)
+    n = int(duration * sr)
+    t = np.arange(n) / sr
+
+    # Speech-like bursts: alternating voiced and silent stretches
+    envelope = np.zeros(n)
+    pos = 0
+    while pos < n:
+        length = int(rng.uniform(0.3, 1.5) * sr)
+        envelope[pos:pos + length] = np.hanning(min(length, n - pos))
+        pos += length + int(rng.uniform(0.2, 1.0) * sr)
+    f0 = rng.uniform(110, 220) * (1 + 0.05 * np.sin(2 * np.pi * 0.5 * t))
+    source = signal.sawtooth(2 * np.pi * np.cumsum(f0) / sr)
+    voice = np.zeros(n)
+    for formant in (700, 1200):
+        sos = signal.butter(
+            2, [formant * 0.8, formant * 1.2], btype="band", fs=sr,
+            output="sos",
+        )
+        voice += signal.sosfilt(sos, source)
+    voice *= envelope / (np.max(np.abs(voice)) or 1)
+
+    hum = sum(0.05 / k * np.sin(2 * np.pi * 50 * k * t) for k in (1, 2, 3))
+    ultrasonic = 0.02 * np.sin(2 * np.pi * 21000 * t) if sr > 42000 else 0
+    noise = rng.normal(0, 0.005, n)
+    y = 0.6 * voice + hum + ultrasonic + noise
+    return (y / np.max(np.abs(y)) * 0.9).astype(np.float32)
+
+
+def _enhance_audio(path, workdir):
+    from enhance_audio_files.enhance_audio import enhance_audio
+
+    out = os.path.join(workdir, "enhanced.wav")
+    db = os.path.join(workdir, "results.db")
+    return lambda: enhance_audio(path, out, 3000, "mid", results_db=db)
+
+
+def _detect_voice_segments(path, workdir):
+    import pydub
+    from enhance_audio_files.enhance_audio import detect_voice_segments
+
+    audio = pydub.AudioSegment.from_file(path)
+    return lambda: detect_voice_segments(audio)
+
+
+def _analyze_voice_features(path, workdir):
+    import pydub
+    from enhance_audio_files.enhance_audio import (
+        analyze_voice_features,
+        detect_voice_segments,
+    )
+
+    audio = pydub.AudioSegment.from_file(path)
+    segments = detect_voice_segments(audio)
+    return lambda: analyze_voice_features(audio, segments, path)
+
+
+def _lfn_analyze_audio(path, workdir):
+    import lfn_batch_file_analyzer
+
+    return lambda: lfn_batch_file_analyzer.analyze_audio(
+        path, os.path.basename(path), block_duration=60
+    )
+
+
+def _vad_detect_voiced(path, workdir):
+    import vad_enhancer
+
+    data, sr = sf.read(path, dtype="int16")
+    return lambda: vad_enhancer.detect_voiced(data, sample_rate=sr)
+
+
+# name -> setup(path, workdir) returning the callable to time
+BENCHMARKS = {
+    "enhance_audio": _enhance_audio,
+    "detect_voice_segments": _detect_voice_segments,
+    "analyze_voice_features": _analyze_voice_features,
+    "lfn_batch_file_analyzer.analyze_audio": _lfn_analyze_audio,
+    "vad_enhancer.detect_voiced": _vad_detect_voiced,
+}
+
+ENHANCE_SCRIPT = os.path.join(ROOT, "enhance_audio_files", "enhance_audio.py")
+# name -> interpreter arguments; {input} is a one-second 16 kHz WAV file
+STARTUP_COMMANDS = {
+    "enhance_audio --help": [ENHANCE_SCRIPT, "--help"],
+    "enhance_audio filter-only": [
+        ENHANCE_SCRIPT, "{input}", "enhanced.wav", "3000", "mid",
+    ],
+    "lfn_batch_file_analyzer --help": [
+        os.path.join(LFN_DIR, "lfn_batch_file_analyzer.py"), "--help",
+    ],
+    "import speaker_recognition": [
+        "-c",
+        f"import sys; sys.path.insert(0, {ZOOM_DIR!r}); "
+        "import speaker_recognition",
+    ],
+}
+
+
+def run_suite(
+    durations=DEFAULT_DURATIONS,
+    rates=DEFAULT_RATES,
+    repeat=DEFAULT_REPEAT,
+    names=None,
+):
+    """Time every benchmark on every synthetic recording.
+
+    Each benchmark runs ``repeat`` times and the fastest run is reported.
+    Scripts that write logs or images do so inside a temporary directory.
+
+    Returns
+    -------
+    dict
+        ``{"meta": {...}, "results": [...]}`` ready to be saved as JSON.
+    """
+
+    names = list(BENCHMARKS if names is None else names)
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for sr in rates:
+                for duration in durations:
+                    path = os.path.join(workdir, f"synth_{sr}_{duration}.wav")
+                    sf.write(
+                        path, synth_recording(duration, sr), sr,
+                        subtype="PCM_16",
+                    )
+                    for name in names:
+                        fn = BENCHMARKS[name](path, workdir)
+                        times = []
+                        for _ in range(repeat):
+                            start = time.perf_counter()
+                            fn()
+                            times.append(time.perf_counter() - start)
+                        best = min(times)
+                        results.append(
+                            {
+                                "name": name,
+                                "duration": duration,
+                                "sample_rate": sr,
+                                "seconds": round(best, 6),
+                                "rtf": round(best / duration, 6),
+                            }
+                        )
+                        print(
+                            f"{name:40s} {sr:6d} Hz {duration:6g} s  "
+                            f"{best:8.3f} s  RTF {best / duration:.4f}"
+                        )
+        finally:
+            os.chdir(cwd)
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def run_startup(repeat=DEFAULT_REPEAT, names=None):
+    """Time the cold start of the command-line entry points.
+
+    Every command runs ``repeat`` times in a new interpreter inside a
+    temporary directory and the fastest run is reported.
+
+    Returns
+    -------
+    list of dict
+        One row per command of :data:`STARTUP_COMMANDS`, in the layout of
+        the ``results`` of :func:`run_suite` with ``duration`` and
+        ``sample_rate`` set to ``None``.
+    """
+
+    names = list(STARTUP_COMMANDS if names is None else names)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "startup.wav")
+        sf.write(path, synth_recording(1, 16000), 16000, subtype="PCM_16")
+        for name in names:
+            argv = [
+                arg.format(input=path) for arg in STARTUP_COMMANDS[name]
+            ]
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                subprocess.run(
+                    [sys.executable, *argv],
+                    cwd=workdir,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=True,
+                )
+                times.append(time.perf_counter() - start)
+            best = min(times)
+            results.append(
+                {
+                    "name": name,
+                    "duration": None,
+                    "sample_rate": None,
+                    "seconds": round(best, 6),
+                }
+            )
+            print(f"{name:40s} {'cold start':>18s}  {best:8.3f} s")
+    return results
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """Compare two benchmark runs.
+
+    Parameters
+    ----------
+    baseline, current : dict
+        Results of :func:`run_suite`.
+    tolerance : float, optional
+        Allowed relative slowdown before a benchmark counts as a
+        regression.
+
+    Returns
+    -------
+    list of dict
+        One row per benchmark present in both runs with ``ratio`` (current
+        over baseline time) and ``regression`` flags.
+    """
+
+    def key(row):
+        return row["name"], row["duration"], row["sample_rate"]
+
+    reference = {
+        key(row): row
+        for row in baseline["results"] + baseline.get("startup", [])
+    }
+    rows = []
+    for row in current["results"] + current.get("startup", []):
+        base = reference.get(key(row))
+        if base is None:
+            continue
+        ratio = row["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        rows.append(
+            {
+                "name": row["name"],
+                "duration": row["duration"],
+                "sample_rate": row["sample_rate"],
+                "baseline": base["seconds"],
+                "current": row["seconds"],
+                "ratio": ratio,
+                "regression": ratio > 1 + tolerance,
+            }
+        )
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the audio pipelines on synthetic recordings."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Run the benchmark suite.")
+    run_parser.add_argument(
+        "--durations", type=float, nargs="+", default=DEFAULT_DURATIONS,
+        help="Recording lengths in seconds.",
+    )
+    run_parser.add_argument(
+        "--rates", type=int, nargs="+", default=DEFAULT_RATES,
+        help="Sample rates in Hz.",
+    )
+    run_parser.add_argument(
+        "--repeat", type=int, default=DEFAULT_REPEAT,
+        help="Runs per benchmark; the fastest is reported.",
+    )
+    run_parser.add_argument(
+        "--only", nargs="+", choices=[*BENCHMARKS, *STARTUP_COMMANDS],
+        default=None,
+        help="Run only these benchmarks and cold-start commands.",
+    )
+    run_parser.add_argument(
+        "--output", default="benchmark_results.json",
+        help="JSON file receiving the results.",
+    )
+    run_parser.add_argument(
+        "--no-startup",
+        dest="startup",
+        action="store_false",
+        help="Skip the cold-start timing of the command-line entry points.",
+    )
+
+    compare_parser = sub.add_parser(
+        "compare", help="Flag regressions against a baseline."
+    )
+    compare_parser.add_argument("baseline", help="Baseline JSON file.")
+    compare_parser.add_argument("current", help="JSON file to check.")
+    compare_parser.add_argument(
+        "--tolerance", type=float, default=DEFAULT_TOLERANCE,
+        help="Allowed relative slowdown (default: 0.15 = 15%%).",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        suite_names = startup_names = None
+        if args.only:
+            suite_names = [name for name in args.only if name in BENCHMARKS]
+            startup_names = [
+                name for name in args.only if name in STARTUP_COMMANDS
+            ]
+        report = run_suite(
+            args.durations, args.rates, args.repeat, suite_names
+        )
+        if args.startup and startup_names != []:
+            report["startup"] = run_startup(args.repeat, startup_names)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.tolerance)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        if row["duration"] is None:
+            case = f"{'cold start':>18s}"
+        else:
+            case = f"{row['sample_rate']:6d} Hz {row['duration']:6g} s"
+        print(
+            f"{row['name']:40s} {case}  {row['baseline']:8.3f} -> "
+            f"{row['current']:8.3f} s  x{row['ratio']:.2f}  {flag}"
+        )
+    regressions = [row for row in rows if row["regression"]]
+    print(f"{len(regressions)} regression(s) in {len(rows)} benchmarks")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
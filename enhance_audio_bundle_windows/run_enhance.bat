@@ -1,10 +1,10 @@
 @echo off
-REM Ensure to install moviepy in the right Python environment
+REM Ensure to install the packages in the right Python environment
 echo Installing required Python packages...
-C:\ProgramData\Anaconda3\Scripts\conda.exe install numpy scipy moviepy -y
+C:\ProgramData\Anaconda3\Scripts\conda.exe install numpy scipy tqdm ffmpeg -y
 
-REM Run the enhancement script using the correct Anaconda Python executable
-C:\ProgramData\Anaconda3\python.exe enhance_audio.py
+REM Run the enhancement script on every video in this directory
+C:\ProgramData\Anaconda3\python.exe enhance_audio.py *.MP4
 
-echo Enhancement complete. Output: enhanced_audio_final.wav
+echo Enhancement complete. Output: *_enhanced.wav
 pause
@@ -0,0 +1,154 @@
+"""Decode audio files into NumPy arrays with as little copying as possible.
+
+16 and 32-bit PCM WAV and RF64 files are memory-mapped, so samples are paged
+in from disk on demand instead of being buffered up front. Other formats
+libsndfile understands (FLAC, OGG, AIFF, 24-bit WAV, ...) are decoded with
+soundfile. Only containers it cannot read, such as M4A or AAC, are handed to
+ffmpeg through pydub.
+"""
+
+import warnings
+
+import numpy as np
+import soundfile as sf
+
+if __package__:
+    from .lazy_import import lazy_import
+    from .resample import resample
+else:  # run as a script
+    from lazy_import import lazy_import
+    from resample import resample
+
+pydub = lazy_import("pydub")
+
+# Sample types that are memory-mapped as they are stored on disk
+MMAP_DTYPES = (np.dtype("<i2"), np.dtype("<i4"))
+# soundfile subtypes decoded to 32-bit samples; all others become 16-bit
+WIDE_SUBTYPES = frozenset(
+    {"PCM_24", "PCM_32", "FLOAT", "DOUBLE", "ALAC_20", "ALAC_24", "ALAC_32"}
+)
+
+
+def mono_float(samples):
+    """Down-mix ``(frames, channels)`` integer PCM to float32 in [-1, 1)."""
+
+    full_scale = float(1 << (8 * samples.dtype.itemsize - 1))
+    mono = samples.astype(np.float32)
+    mono = mono.mean(axis=1) if mono.shape[1] > 1 else mono[:, 0]
+    mono /= full_scale
+    return mono
+
+
+class DecodedAudio:
+    """Integer PCM samples of shape ``(frames, channels)`` and their rate.
+
+    ``samples`` may be a read-only memory map of the source file. The
+    ``channels``, ``sample_width`` and ``duration_seconds`` properties
+    mirror those of ``pydub.AudioSegment``.
+
+    Mono versions at other sample rates are cached per rate by :meth:`mono`,
+    so the stages analysing one recording (VAD, pitch, transcription)
+    resample it only once.
+    """
+
+    def __init__(self, samples, frame_rate):
+        self.samples = samples
+        self.frame_rate = frame_rate
+        self._resampled = {}
+
+    @property
+    def channels(self):
+        return self.samples.shape[1]
+
+    @property
+    def sample_width(self):
+        return self.samples.dtype.itemsize
+
+    @property
+    def duration_seconds(self):
+        return len(self.samples) / self.frame_rate
+
+    def mono(self, sample_rate=None):
+        """Return the recording as mono float32 samples in [-1, 1).
+
+        Parameters
+        ----------
+        sample_rate : int, optional
+            Rate of the returned samples. Defaults to :attr:`frame_rate`.
+            Resampled versions are cached; treat them as read-only.
+        """
+
+        if sample_rate is None or sample_rate == self.frame_rate:
+            return mono_float(self.samples)
+        if sample_rate not in self._resampled:
+            self._resampled[sample_rate] = resample(
+                mono_float(self.samples), self.frame_rate, sample_rate
+            ).astype(np.float32)
+        return self._resampled[sample_rate]
+
+
+def decode_audio(path):
+    """Decode the audio file at ``path``.
+
+    Returns
+    -------
+    DecodedAudio
+        Samples as 16-bit integers, or as 32-bit integers for sources with
+        more than 16 bits of resolution. 24-bit samples are scaled to the
+        32-bit range.
+    """
+
+    audio = _mmap_wav(path)
+    if audio is None:
+        audio = _read_soundfile(path)
+    if audio is None:
+        segment = pydub.AudioSegment.from_file(path)
+        if segment.sample_width == 1:
+            segment = segment.set_sample_width(2)
+        audio = as_decoded(segment)
+    return audio
+
+
+def as_decoded(audio):
+    """Return ``audio`` as :class:`DecodedAudio`.
+
+    A ``pydub.AudioSegment`` is wrapped without copying its samples;
+    :class:`DecodedAudio` is returned unchanged.
+    """
+
+    if isinstance(audio, DecodedAudio):
+        return audio
+    samples = np.frombuffer(audio.raw_data, dtype=f"<i{audio.sample_width}")
+    return DecodedAudio(samples.reshape(-1, audio.channels), audio.frame_rate)
+
+
+def _mmap_wav(path):
+    # Importing scipy.io pulls in scipy.sparse; only pay for it when needed
+    from scipy.io import wavfile
+
+    with open(path, "rb") as f:
+        if f.read(4) not in (b"RIFF", b"RF64"):
+            return None
+    try:
+        with warnings.catch_warnings():
+            # Unknown chunks (LIST, bext, ...) are skipped with a warning
+            warnings.simplefilter("ignore", wavfile.WavFileWarning)
+            frame_rate, samples = wavfile.read(path, mmap=True)
+    except ValueError:
+        # Formats that cannot be mapped directly, such as 24-bit PCM
+        return None
+    if samples.dtype not in MMAP_DTYPES:
+        return None
+    if samples.ndim == 1:
+        samples = samples[:, np.newaxis]
+    return DecodedAudio(samples, frame_rate)
+
+
+def _read_soundfile(path):
+    try:
+        f = sf.SoundFile(path)
+    except sf.SoundFileError:
+        return None
+    with f:
+        dtype = "int32" if f.subtype in WIDE_SUBTYPES else "int16"
+        return DecodedAudio(f.read(dtype=dtype, always_2d=True), f.samplerate)
@@ -1,17 +1,59 @@
 import argparse
-import csv
+import collections
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 from datetime import datetime
+import functools
+import glob
+import hashlib
 import logging
+import math
 import os
+import sys
 from tqdm import tqdm
 
-import librosa
-import librosa.display
-import matplotlib.pyplot as plt
 import numpy as np
-import pydub
-import scipy.signal as signal
-import webrtcvad
+import soundfile as sf
+
+if __package__:
+    from . import profiling, results_store
+    from .audio_decode import as_decoded, decode_audio, mono_float
+    from .lazy_import import lazy_import
+    from .limiter import (
+        LIMITER_MAX_GAIN,
+        LIMITER_TARGET,
+        PeakLimiter,
+        normalizing_gain,
+        scan_peak,
+    )
+    from .resample import Resampler
+    from .results_store import RESULTS_DB
+    from .skip_cache import EnhanceManifest, file_digest
+    from .spectrogram_renderer import SpectrogramRenderer
+else:  # run as a script
+    import profiling
+    import results_store
+    from audio_decode import as_decoded, decode_audio, mono_float
+    from lazy_import import lazy_import
+    from limiter import (
+        LIMITER_MAX_GAIN,
+        LIMITER_TARGET,
+        PeakLimiter,
+        normalizing_gain,
+        scan_peak,
+    )
+    from resample import Resampler
+    from results_store import RESULTS_DB
+    from skip_cache import EnhanceManifest, file_digest
+    from spectrogram_renderer import SpectrogramRenderer
+
+# Heavy dependencies that only some code paths need are loaded on first use
+librosa = lazy_import("librosa")
+signal = lazy_import("scipy.signal")
+webrtcvad = lazy_import("webrtcvad")
 
 # Set up logging
 logging.basicConfig(
@@ -21,59 +63,322 @@ logging.basicConfig(
 )
 
 
-def normalize_audio(samples):
-    """Normalize audio samples to the range [-1, 1].
-    
+# Modules whose code shapes the enhanced audio; an edit to any of them
+# invalidates the outputs recorded in the skip cache
+PROCESSING_MODULES = (
+    "enhance_audio.py",
+    "audio_decode.py",
+    "resample.py",
+    "limiter.py",
+)
+# Identifies the processing code in the skip cache
+CODE_VERSION = hashlib.sha256(
+    "".join(
+        file_digest(os.path.join(os.path.dirname(__file__), name))
+        for name in PROCESSING_MODULES
+    ).encode()
+).hexdigest()[:16]
+MANIFEST_PATH = "enhance_manifest.json"
+# Chrome trace written by --profile when no path is given
+PROFILE_TRACE = "enhance_profile.json"
+
+# Show per-file progress bars; batch workers turn this off
+SHOW_PROGRESS = True
+# Spectrogram rendering processes (None = one per CPU, 0 = inline)
+RENDER_WORKERS = None
+
+
+# Output gain stages selectable with --normalize: a single-pass look-ahead
+# limiter, or exact peak normalization after a pre-scan of the filtered peak
+NORMALIZE_MODES = ("limit", "prescan")
+
+
+def output_limiter(normalize, sample_rate, channels, dtype, peak=None):
+    """Return the output gain stage for a ``normalize`` mode.
+
     Parameters
     ----------
-    samples : numpy.ndarray
-        Audio samples to normalize.
-    
+    normalize : {None, "limit", "prescan"}
+        ``"limit"`` boosts quiet passages by up to ``LIMITER_MAX_GAIN`` and
+        keeps peaks at ``LIMITER_TARGET`` of full scale. ``"prescan"``
+        scales ``peak`` exactly to that target.
+    sample_rate, channels : int
+        Format of the filtered samples.
+    dtype : numpy.dtype
+        Integer type the output is written as.
+    peak : float, optional
+        Largest filtered magnitude, required for ``"prescan"``.
+
+    Returns
+    -------
+    PeakLimiter or None
+        ``None`` when ``normalize`` is ``None``.
+    """
+
+    if normalize is None:
+        return None
+    target = LIMITER_TARGET * (np.iinfo(dtype).max + 1)
+    max_gain = LIMITER_MAX_GAIN
+    if normalize == "prescan":
+        max_gain = normalizing_gain(peak, target)
+    return PeakLimiter(sample_rate, channels, target, max_gain=max_gain)
+
+
+FILTER_ORDER = 5
+FILTER_PLAN_CACHE_SIZE = 64
+
+# Field filter applied for each distance field: (btype, cutoff in Hz, label)
+FIELD_FILTERS = {
+    "far": ("low", 500, "low-pass filter for far-field voices"),
+    "mid": ("band", (500, 5000), "band-pass filter for mid-field voices"),
+    "close": ("high", 5000, "high-pass filter for close-field voices"),
+}
+
+
+@functools.lru_cache(maxsize=FILTER_PLAN_CACHE_SIZE)
+def butter_sos(fs, cutoff, btype, order=FILTER_ORDER):
+    """Design a Butterworth filter as second-order sections.
+
+    Designs are cached, so repeated calls with the same sample rate and
+    cutoff return the same array; callers must not modify it.
+
+    Parameters
+    ----------
+    fs : int
+        Sample rate in Hz.
+    cutoff : float or tuple of float
+        Cutoff frequency in Hz, or ``(low, high)`` for band filters.
+    btype : str
+        ``"low"``, ``"high"`` or ``"band"``.
+    order : int, optional
+        Filter order.
+
     Returns
     -------
     numpy.ndarray
-        Normalized audio samples.
+        SOS coefficients of shape ``(n_sections, 6)``.
     """
-    max_val = np.max(np.abs(samples))
-    if max_val > 0:
-        return samples / max_val
-    return samples
+
+    nyquist = 0.5 * fs
+    if btype == "band":
+        normal_cutoff = [cutoff[0] / nyquist, cutoff[1] / nyquist]
+    else:
+        normal_cutoff = cutoff / nyquist
+    sos = signal.butter(
+        order, normal_cutoff, btype=btype, analog=False, output="sos"
+    )
+    return sos
+
+
+@functools.lru_cache(maxsize=FILTER_PLAN_CACHE_SIZE)
+def filter_plan(fs, distance_field, low_freq_enhance):
+    """Return the fused filter cascade used by :func:`enhance_audio`.
+
+    The field filter and the low-frequency enhancement low-pass are
+    concatenated into a single SOS array so the signal is filtered in one
+    pass. Plans are cached per ``(fs, distance_field, low_freq_enhance)``.
+
+    Parameters
+    ----------
+    fs : int
+        Sample rate in Hz.
+    distance_field : str
+        ``"far"``, ``"mid"`` or ``"close"``.
+    low_freq_enhance : int
+        Cutoff of the low-frequency enhancement low-pass in Hz.
+
+    Returns
+    -------
+    numpy.ndarray
+        SOS coefficients of the whole cascade. The array is shared between
+        callers and must not be modified.
+    """
+
+    if distance_field not in FIELD_FILTERS:
+        raise ValueError(
+            "Invalid distance field: must be 'far', 'mid', or 'close'."
+        )
+    btype, cutoff, _ = FIELD_FILTERS[distance_field]
+    sos = np.vstack(
+        (
+            butter_sos(fs, cutoff, btype),
+            butter_sos(fs, low_freq_enhance, "low"),
+        )
+    )
+    return sos
 
 
 # Define the frequency filters for different fields
 def apply_low_pass_filter(audio_data, fs, cutoff):
-    nyquist = 0.5 * fs
-    normal_cutoff = cutoff / nyquist
-    sos = signal.butter(5, normal_cutoff, btype="low", analog=False, output='sos')
-    return signal.sosfilt(sos, audio_data)
+    return signal.sosfilt(butter_sos(fs, cutoff, "low"), audio_data)
 
 
 def apply_band_pass_filter(audio_data, fs, low_cutoff, high_cutoff):
-    nyquist = 0.5 * fs
-    low_normal_cutoff = low_cutoff / nyquist
-    high_normal_cutoff = high_cutoff / nyquist
-    sos = signal.butter(
-        5, [low_normal_cutoff, high_normal_cutoff], btype="band", analog=False, output='sos'
-    )
+    sos = butter_sos(fs, (low_cutoff, high_cutoff), "band")
     return signal.sosfilt(sos, audio_data)
 
 
 def apply_high_pass_filter(audio_data, fs, cutoff):
-    nyquist = 0.5 * fs
-    normal_cutoff = cutoff / nyquist
-    sos = signal.butter(5, normal_cutoff, btype="high", analog=False, output='sos')
-    return signal.sosfilt(sos, audio_data)
+    return signal.sosfilt(butter_sos(fs, cutoff, "high"), audio_data)
+
+
+# Threads used to filter the channels of multichannel audio in parallel
+FILTER_WORKERS = os.cpu_count() or 1
+_channel_pool = None
+
+
+def filter_channels(sos, planar, zi=None):
+    """Filter each channel of planar audio with independent filter state.
+
+    Channels are filtered concurrently on a shared thread pool; SciPy
+    releases the GIL inside ``sosfilt`` so this scales with the number of
+    cores for multi-track recordings.
+
+    Parameters
+    ----------
+    sos : numpy.ndarray
+        Filter cascade from :func:`filter_plan`.
+    planar : numpy.ndarray
+        Samples of shape ``(channels, samples)``.
+    zi : numpy.ndarray, optional
+        Initial state of shape ``(channels, n_sections, 2)``. Zero state is
+        used when omitted.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Filtered ``(channels, samples)`` float64 array and the final state.
+    """
+
+    global _channel_pool
 
+    channels = planar.shape[0]
+    if zi is None:
+        zi = np.zeros((channels, sos.shape[0], 2))
+    out = np.empty(planar.shape)
+    zf = np.empty_like(zi)
+
+    def run(ch):
+        out[ch], zf[ch] = signal.sosfilt(sos, planar[ch], zi=zi[ch])
+
+    if channels == 1 or FILTER_WORKERS == 1:
+        for ch in range(channels):
+            run(ch)
+    else:
+        if _channel_pool is None:
+            _channel_pool = ThreadPoolExecutor(FILTER_WORKERS)
+        list(_channel_pool.map(run, range(channels)))
+    return out, zf
 
-def detect_voice_segments(
-    audio_segment, frame_duration_ms=30, aggressiveness=3
+
+VAD_SAMPLE_RATE = 16000
+# Number of VAD frames between progress bar updates (~30 s of 30 ms frames)
+VAD_PROGRESS_FRAMES = 1000
+
+
+def speech_mask(
+    pcm, sample_rate=VAD_SAMPLE_RATE, frame_duration_ms=30, aggressiveness=3
 ):
+    """Classify fixed-size frames of 16-bit PCM as speech or non-speech.
+
+    Frames are handed to WebRTC VAD as zero-copy ``memoryview`` slices of
+    ``pcm``; a trailing partial frame is ignored.
+
+    Parameters
+    ----------
+    pcm : numpy.ndarray
+        Mono ``int16`` samples.
+    sample_rate : int, optional
+        Sample rate of ``pcm``. Must be supported by WebRTC VAD.
+    frame_duration_ms : int, optional
+        Duration of each frame in milliseconds (10, 20 or 30).
+    aggressiveness : int, optional
+        VAD aggressiveness (0-3). Higher values are more aggressive.
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean array with one entry per complete frame.
+    """
+
+    vad = webrtcvad.Vad(aggressiveness)
+    frame_len = int(sample_rate * frame_duration_ms / 1000)
+    n_frames = len(pcm) // frame_len
+
+    mask = np.zeros(n_frames, dtype=bool)
+    with tqdm(
+        total=n_frames, desc="VAD", unit="frame", disable=not SHOW_PROGRESS
+    ) as progress:
+        for first in range(0, n_frames, VAD_PROGRESS_FRAMES):
+            last = min(first + VAD_PROGRESS_FRAMES, n_frames)
+            mask[first:last] = _classify_frames(
+                vad, pcm[first * frame_len:last * frame_len], frame_len,
+                sample_rate,
+            )
+            progress.update(last - first)
+    return mask
+
+
+def _classify_frames(vad, pcm, frame_len, sample_rate):
+    """Run ``vad`` over the complete frames of ``pcm`` without copying."""
+
+    pcm = np.ascontiguousarray(pcm, dtype=np.int16)
+    n_frames = len(pcm) // frame_len
+    bytes_per_frame = frame_len * pcm.itemsize
+    raw = memoryview(pcm).cast("B")
+    is_speech = vad.is_speech
+    return np.fromiter(
+        (
+            is_speech(
+                raw[i * bytes_per_frame:(i + 1) * bytes_per_frame],
+                sample_rate,
+            )
+            for i in range(n_frames)
+        ),
+        dtype=bool,
+        count=n_frames,
+    )
+
+
+def mask_to_segments(mask, frame_duration_ms, total_duration=None):
+    """Convert a frame-level speech mask into ``(start, end)`` segments.
+
+    Parameters
+    ----------
+    mask : numpy.ndarray
+        Boolean speech mask, one entry per frame.
+    frame_duration_ms : int
+        Duration of a frame in milliseconds.
+    total_duration : float, optional
+        End time used for a segment that is still open at the last frame.
+        Defaults to the end of the last frame.
+
+    Returns
+    -------
+    list of tuple
+        List of ``(start, end)`` times in seconds.
+    """
+
+    mask = np.asarray(mask, dtype=bool)
+    edges = np.diff(np.concatenate(([False], mask, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1) * frame_duration_ms / 1000
+    ends = np.flatnonzero(edges == -1) * frame_duration_ms / 1000
+    if total_duration is not None and mask.size and mask[-1]:
+        ends[-1] = total_duration
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def detect_voice_segments(audio, frame_duration_ms=30, aggressiveness=3):
     """Detect voice segments using WebRTC VAD.
 
+    The VAD runs on the 16 kHz mono version of the recording from
+    :meth:`DecodedAudio.mono`, which is cached for other stages that need
+    the same rate.
+
     Parameters
     ----------
-    audio_segment : pydub.AudioSegment
-        Loaded audio segment.
+    audio : DecodedAudio or pydub.AudioSegment
+        Loaded audio.
     frame_duration_ms : int, optional
         Duration of each frame in milliseconds. Default is 30ms.
     aggressiveness : int, optional
@@ -85,235 +390,893 @@ def detect_voice_segments(
         List of ``(start, end)`` times in seconds where voice is detected.
     """
 
-    vad = webrtcvad.Vad(aggressiveness)
-    mono = audio_segment.set_channels(1).set_frame_rate(16000)
-    bytes_per_frame = int(16000 * frame_duration_ms / 1000) * mono.sample_width
-    raw_audio = mono.raw_data
-    segments = []
-    start = None
-    for i in tqdm(
-        range(0, len(raw_audio), bytes_per_frame), desc="VAD", unit="frame"
-    ):
-        frame = raw_audio[i:i + bytes_per_frame]
-        if len(frame) < bytes_per_frame:
-            break
-        is_speech = vad.is_speech(frame, 16000)
-        t = i / (16000 * mono.sample_width)
-        if is_speech and start is None:
-            start = t
-        elif not is_speech and start is not None:
-            segments.append((start, t))
-            start = None
-    if start is not None:
-        segments.append((start, len(raw_audio) / (16000 * mono.sample_width)))
-    return segments
-
-
-def analyze_voice_features(audio_segment, voice_segments, input_file):
-    """Analyze voice characteristics and log results.
+    pcm = vad_pcm(as_decoded(audio).mono(VAD_SAMPLE_RATE))
+    mask = speech_mask(
+        pcm,
+        frame_duration_ms=frame_duration_ms,
+        aggressiveness=aggressiveness,
+    )
+    return mask_to_segments(
+        mask, frame_duration_ms, len(pcm) / VAD_SAMPLE_RATE
+    )
+
+
+def vad_pcm(mono):
+    """Convert float samples in [-1, 1) to the 16-bit PCM WebRTC VAD reads."""
+
+    return to_pcm(np.asarray(mono, dtype=np.float32) * 32768, np.int16)
+
+
+class IncrementalVAD:
+    """Run WebRTC VAD on PCM delivered block by block.
+
+    Blocks are down-mixed and resampled to 16 kHz by a polyphase
+    :class:`Resampler` whose state is carried across blocks, so feeding a
+    file in blocks yields the same segments as :func:`detect_voice_segments`
+    on the whole file.
 
     Parameters
     ----------
-    audio_segment : pydub.AudioSegment
+    frame_rate : int
+        Sample rate of the incoming audio.
+    frame_duration_ms : int, optional
+        Duration of each VAD frame in milliseconds.
+    aggressiveness : int, optional
+        VAD aggressiveness (0-3).
+    """
+
+    def __init__(self, frame_rate, frame_duration_ms=30, aggressiveness=3):
+        self.frame_rate = frame_rate
+        self.frame_duration_ms = frame_duration_ms
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self._frame_len = int(VAD_SAMPLE_RATE * frame_duration_ms / 1000)
+        self._resampler = Resampler(frame_rate, VAD_SAMPLE_RATE)
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._masks = []
+        self._total_samples = 0
+        self._flushed = False
+
+    def feed(self, samples):
+        """Classify the complete VAD frames contained in ``samples``.
+
+        Parameters
+        ----------
+        samples : numpy.ndarray
+            Integer samples of shape ``(frames, channels)``.
+        """
+
+        self._classify(self._resampler.process(mono_float(samples)))
+
+    def _classify(self, resampled):
+        pcm = np.concatenate((self._pending, vad_pcm(resampled)))
+        self._total_samples += len(pcm) - len(self._pending)
+        n_complete = len(pcm) // self._frame_len * self._frame_len
+        self._masks.append(
+            _classify_frames(
+                self._vad, pcm[:n_complete], self._frame_len, VAD_SAMPLE_RATE
+            )
+        )
+        self._pending = pcm[n_complete:]
+
+    def _flush(self):
+        # The resampler holds back the last few output samples until it
+        # knows the input has ended
+        if not self._flushed:
+            self._classify(self._resampler.process(np.zeros(0), final=True))
+            self._flushed = True
+
+    def mask(self):
+        """Return the speech mask of the whole input.
+
+        Call it once all blocks were fed; no more blocks can be fed after.
+        """
+
+        self._flush()
+        if not self._masks:
+            return np.zeros(0, dtype=bool)
+        return np.concatenate(self._masks)
+
+    def segments(self):
+        """Return ``(start, end)`` voice segments of the whole input.
+
+        Like :meth:`mask`, this ends the input.
+        """
+
+        return mask_to_segments(
+            self.mask(),
+            self.frame_duration_ms,
+            self._total_samples / VAD_SAMPLE_RATE,
+        )
+
+
+FEATURE_FRAME_LENGTH = 2048
+FEATURE_HOP_LENGTH = 512
+# Frames analysed per vectorized pass (~22 s at 48 kHz)
+FEATURE_CHUNK_FRAMES = 2048
+
+FeatureTracks = collections.namedtuple(
+    "FeatureTracks", ["sr", "hop_length", "f0", "centroid", "magnitude"]
+)
+FeatureTracks.__doc__ = """Frame-level voice features of a whole recording.
+
+``f0`` and ``centroid`` hold one value per frame and ``magnitude`` is the
+``(1 + n_fft // 2, frames)`` STFT magnitude, or ``None`` when it was not
+kept (see :func:`segment_magnitude`). Frame ``i`` is centred on sample
+``i * hop_length``.
+"""
+
+
+def compute_feature_tracks(
+    samples,
+    sr,
+    frame_length=FEATURE_FRAME_LENGTH,
+    hop_length=FEATURE_HOP_LENGTH,
+    chunk_frames=FEATURE_CHUNK_FRAMES,
+    keep_magnitude=True,
+):
+    """Compute f0, spectral centroid and STFT magnitude for a whole file.
+
+    The signal is processed in chunks of ``chunk_frames`` frames that overlap
+    by exactly one analysis window, so the tracks are identical to running
+    ``librosa.yin`` and ``librosa.stft`` (``center=True``) over the whole
+    signal at once while keeping the temporary buffers small.
+
+    Parameters
+    ----------
+    samples : numpy.ndarray
+        Mono samples.
+    sr : int
+        Sample rate in Hz.
+    frame_length : int, optional
+        Analysis window and FFT size.
+    hop_length : int, optional
+        Hop between frames in samples.
+    chunk_frames : int, optional
+        Number of frames computed per pass.
+    keep_magnitude : bool, optional
+        Keep the STFT magnitude of the whole file (about 1.4 GB per hour
+        at 48 kHz). Without it only the chunk being processed is held in
+        memory and ``magnitude`` is ``None``.
+
+    Returns
+    -------
+    FeatureTracks
+        Frame-level tracks of the recording.
+    """
+
+    samples = np.asarray(samples, dtype=np.float32)
+    n_frames = 1 + len(samples) // hop_length
+    padded = np.pad(samples, frame_length // 2)
+
+    f0 = np.empty(n_frames, dtype=np.float32)
+    centroid = np.empty(n_frames, dtype=np.float32)
+    magnitude = None
+    if keep_magnitude:
+        magnitude = np.empty(
+            (1 + frame_length // 2, n_frames), dtype=np.float32
+        )
+    for first in range(0, n_frames, chunk_frames):
+        last = min(first + chunk_frames, n_frames)
+        chunk = padded[first * hop_length:(last - 1) * hop_length + frame_length]
+        with profiling.span("yin", nbytes=chunk.nbytes):
+            f0[first:last] = librosa.yin(
+                chunk,
+                fmin=50,
+                fmax=500,
+                sr=sr,
+                frame_length=frame_length,
+                hop_length=hop_length,
+                center=False,
+            )
+        with profiling.span("stft", nbytes=chunk.nbytes):
+            mag = np.abs(
+                librosa.stft(
+                    chunk,
+                    n_fft=frame_length,
+                    hop_length=hop_length,
+                    center=False,
+                )
+            )
+            if magnitude is not None:
+                magnitude[:, first:last] = mag
+            centroid[first:last] = librosa.feature.spectral_centroid(
+                S=mag, sr=sr, n_fft=frame_length, hop_length=hop_length
+            )[0]
+    return FeatureTracks(sr, hop_length, f0, centroid, magnitude)
+
+
+def segment_frames(tracks, start, end):
+    """Return the slice of frames whose centres fall in ``[start, end]``."""
+
+    first = int(np.ceil(start * tracks.sr / tracks.hop_length))
+    last = int(np.floor(end * tracks.sr / tracks.hop_length)) + 1
+    return slice(first, min(last, len(tracks.f0)))
+
+
+def segment_magnitude(
+    samples, tracks, frames, frame_length=FEATURE_FRAME_LENGTH
+):
+    """Return the STFT magnitude of a range of frames.
+
+    Uses the kept magnitude of ``tracks`` when there is one; otherwise the
+    frames are computed from ``samples`` with the framing of
+    :func:`compute_feature_tracks`, so only the segment is held in memory.
+
+    Parameters
+    ----------
+    samples : numpy.ndarray
+        Mono samples the tracks were computed from.
+    tracks : FeatureTracks
+        Tracks of ``samples``.
+    frames : slice
+        Non-empty range of frames, from :func:`segment_frames`.
+    frame_length : int, optional
+        Analysis window and FFT size of the tracks.
+    """
+
+    if tracks.magnitude is not None:
+        return tracks.magnitude[:, frames]
+    # Frame i covers samples [i * hop - n_fft // 2, i * hop + n_fft // 2)
+    # of the signal zero-padded by half a window on both sides
+    start = frames.start * tracks.hop_length - frame_length // 2
+    stop = (frames.stop - 1) * tracks.hop_length + frame_length // 2
+    chunk = np.asarray(
+        samples[max(start, 0):max(min(stop, len(samples)), 0)],
+        dtype=np.float32,
+    )
+    chunk = np.pad(chunk, (max(-start, 0), max(stop - len(samples), 0)))
+    return np.abs(
+        librosa.stft(
+            chunk,
+            n_fft=frame_length,
+            hop_length=tracks.hop_length,
+            center=False,
+        )
+    )
+
+
+def save_feature_tracks(tracks, path):
+    """Write ``tracks`` to a compressed ``.npz`` file.
+
+    The STFT magnitude is stored as float16 to keep the file compact.
+    """
+
+    np.savez_compressed(
+        path,
+        sr=tracks.sr,
+        hop_length=tracks.hop_length,
+        f0=tracks.f0,
+        centroid=tracks.centroid,
+        magnitude=tracks.magnitude.astype(np.float16),
+    )
+
+
+def load_feature_tracks(path):
+    """Load tracks written by :func:`save_feature_tracks`."""
+
+    with np.load(path) as data:
+        return FeatureTracks(
+            int(data["sr"]),
+            int(data["hop_length"]),
+            data["f0"],
+            data["centroid"],
+            data["magnitude"].astype(np.float32),
+        )
+
+
+def analyze_voice_features(
+    audio,
+    voice_segments,
+    input_file,
+    export_features=False,
+    spectrograms=True,
+):
+    """Analyze voice characteristics of each voice segment.
+
+    The file is decoded once and :func:`compute_feature_tracks` computes the
+    frame-level features of the whole recording; each voice segment is then
+    summarised from its range of frames.
+
+    Parameters
+    ----------
+    audio : DecodedAudio or pydub.AudioSegment
         The full audio.
     voice_segments : list of tuple
         ``(start, end)`` pairs in seconds from :func:`detect_voice_segments`.
     input_file : str
         Path to the audio file being analyzed.
+    export_features : bool, optional
+        Also save the frame-level tracks to ``features/<file>.npz``.
+    spectrograms : bool, optional
+        Render a spectrogram image per segment. Images are encoded in
+        background processes while the analysis continues.
+
+    Returns
+    -------
+    list of dict or None
+        Features of each voice segment, in the layout of the results
+        store's ``segment_features`` table, or ``None`` for segments too
+        short to analyse.
     """
 
-    os.makedirs("spectrograms", exist_ok=True)
-    header = [
-        "file",
-        "start",
-        "end",
-        "gender",
-        "age_range",
-        "voice_color",
-        "format",
-        "possible_height",
-        "timestamp",
-        "spectrogram",
-    ]
-    file_exists = os.path.isfile("voice_analysis.csv")
-    
+    if spectrograms:
+        os.makedirs("spectrograms", exist_ok=True)
+
     # Cache repeated computations
-    fmt = os.path.splitext(input_file)[1].lstrip(".").lower()
     base_name = os.path.basename(input_file)
-    
-    # Batch write results for better I/O performance
-    results = []
-    
-    for idx, (start, end) in enumerate(
-        tqdm(voice_segments, desc="Segments", unit="segment")
-    ):
-        seg = audio_segment[start * 1000:end * 1000]
-        samples = np.array(seg.get_array_of_samples()).astype(np.float32)
-        if seg.channels > 1:
-            samples = samples.reshape(-1, seg.channels).mean(axis=1)
-        
-        # Normalize audio samples
-        samples = normalize_audio(samples)
-        
-        sr = seg.frame_rate
-        if len(samples) == 0:
-            continue
-
-        f0 = librosa.yin(samples, fmin=50, fmax=500, sr=sr)
-        f0 = f0[np.isfinite(f0)]
-        f0_median = float(np.median(f0)) if f0.size else 0.0
-        gender = "male" if f0_median < 165 else "female"
-        age_range = "child/young" if f0_median > 220 else "adult"
-
-        centroid = librosa.feature.spectral_centroid(y=samples, sr=sr)
-        centroid_mean = float(np.mean(centroid)) if centroid.size else 0.0
-        voice_color = "dark" if centroid_mean < 2000 else "bright"
-
-        possible_height = "tall" if f0_median < 120 else "average"
-        timestamp = datetime.now().isoformat(timespec="seconds")
-
-        S = librosa.amplitude_to_db(
-            np.abs(librosa.stft(samples)), ref=np.max
+
+    # Decode once and compute the frame-level tracks of the whole file
+    audio = as_decoded(audio)
+    samples = audio.mono()
+    sr = audio.frame_rate
+    with profiling.span("feature_tracks", nbytes=samples.nbytes):
+        # Segment spectrograms compute their own frames on demand; the
+        # whole-file magnitude is only kept to be exported
+        tracks = compute_feature_tracks(
+            samples, sr, keep_magnitude=export_features
         )
-        spec_path = os.path.join(
-            "spectrograms", f"{base_name}_{idx}.png"
+    if export_features:
+        os.makedirs("features", exist_ok=True)
+        save_feature_tracks(
+            tracks, os.path.join("features", f"{base_name}.npz")
         )
-        plt.figure(figsize=(6, 3))
-        librosa.display.specshow(S, sr=sr, x_axis="time", y_axis="hz")
-        plt.colorbar(format="%+2.0f dB")
-        plt.title("Spectrogram")
-        plt.tight_layout()
-        plt.savefig(spec_path)
-        plt.close()
-
-        results.append([
-            input_file,
-            start,
-            end,
-            gender,
-            age_range,
-            voice_color,
-            fmt,
-            possible_height,
-            timestamp,
-            spec_path,
-        ])
-    
-    # Batch write to CSV for better I/O performance
-    with open("voice_analysis.csv", mode="a", newline="") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(header)
-        writer.writerows(results)
+
+    results = []
+    # Batch workers set RENDER_WORKERS to 0 and render in-process; leaving
+    # the block shuts a rendering pool down even if a segment fails
+    with SpectrogramRenderer(
+        workers=RENDER_WORKERS, enabled=spectrograms
+    ) as renderer:
+        for idx, (start, end) in enumerate(
+            tqdm(
+                voice_segments,
+                desc="Segments",
+                unit="segment",
+                disable=not SHOW_PROGRESS,
+            )
+        ):
+            with profiling.span("segment", index=idx, start=start, end=end):
+                results.append(
+                    _segment_features(
+                        samples, tracks, start, end, renderer, base_name, idx
+                    )
+                )
+
+        with profiling.span("spectrogram_wait"):
+            renderer.wait()
+    return results
+
+
+def _segment_features(
+    samples, tracks, start, end, renderer, base_name, idx
+):
+    """Summarise the frame-level ``tracks`` over one voice segment."""
+
+    frames = segment_frames(tracks, start, end)
+    f0 = tracks.f0[frames]
+    if f0.size == 0:
+        return None
+
+    f0 = f0[np.isfinite(f0)]
+    f0_median = float(np.median(f0)) if f0.size else 0.0
+    gender = "male" if f0_median < 165 else "female"
+    age_range = "child/young" if f0_median > 220 else "adult"
+
+    centroid = tracks.centroid[frames]
+    centroid_mean = float(np.mean(centroid)) if centroid.size else 0.0
+    voice_color = "dark" if centroid_mean < 2000 else "bright"
+
+    possible_height = "tall" if f0_median < 120 else "average"
+    timestamp = datetime.now().isoformat(timespec="seconds")
+
+    spec_path = ""
+    if renderer.enabled:
+        with profiling.span("spectrogram"):
+            S = librosa.amplitude_to_db(
+                segment_magnitude(samples, tracks, frames), ref=np.max
+            )
+            spec_path = renderer.submit(
+                S, os.path.join("spectrograms", f"{base_name}_{idx}.png")
+            )
+
+    return {
+        "f0_median": f0_median,
+        "centroid_mean": centroid_mean,
+        "gender": gender,
+        "age_range": age_range,
+        "voice_color": voice_color,
+        "possible_height": possible_height,
+        "timestamp": timestamp,
+        "spectrogram": spec_path,
+    }
+
+
+def to_pcm(samples, dtype):
+    """Round and clip filtered samples back to the integer ``dtype``."""
+
+    info = np.iinfo(dtype)
+    return np.clip(np.rint(samples), info.min, info.max).astype(dtype)
+
+
+STREAM_BLOCK_SECONDS = 10
+# WAV subtype written for each sample width in bytes
+PCM_SUBTYPES = {2: "PCM_16", 4: "PCM_32"}
+# soundfile subtypes that can be streamed, mapped to the NumPy sample type
+# decode_audio() uses for the same file (24-bit PCM is widened to 32-bit)
+STREAM_SUBTYPES = {
+    "PCM_16": np.int16,
+    "PCM_24": np.int32,
+    "PCM_32": np.int32,
+}
+
+
+def enhance_audio_stream(
+    input_file,
+    output_file,
+    sos,
+    analyze=False,
+    block_duration=STREAM_BLOCK_SECONDS,
+    normalize=None,
+):
+    """Filter ``input_file`` block by block with constant memory.
+
+    The SOS filter state is carried across block boundaries and voice
+    activity detection runs incrementally, so the output is sample-identical
+    to the in-memory path of :func:`enhance_audio` while only one block is
+    held in memory at a time.
+
+    Parameters
+    ----------
+    input_file : str
+        Path to a 16, 24 or 32-bit PCM file readable by soundfile.
+    output_file : str
+        Path of the WAV file to write.
+    sos : numpy.ndarray
+        Filter cascade from :func:`filter_plan`.
+    analyze : bool, optional
+        Run voice activity detection while streaming.
+    block_duration : float, optional
+        Duration of the blocks in seconds.
+    normalize : {None, "limit", "prescan"}, optional
+        Output gain stage, see :func:`output_limiter`. ``"prescan"`` filters
+        the file once more beforehand, keeping only its peak.
+
+    Returns
+    -------
+    list of tuple or None
+        Voice segments when ``analyze`` is set, otherwise ``None``.
+    """
+
+    with sf.SoundFile(input_file) as f:
+        if f.subtype not in STREAM_SUBTYPES:
+            raise ValueError(
+                f"Streaming supports {', '.join(STREAM_SUBTYPES)} input, "
+                f"got {f.subtype}."
+            )
+        dtype = np.dtype(STREAM_SUBTYPES[f.subtype])
+        vad = None
+        if analyze:
+            vad = IncrementalVAD(f.samplerate)
+        zi = None
+        block_frames = max(1, int(f.samplerate * block_duration))
+        total_blocks = math.ceil(f.frames / block_frames)
+
+        peak = None
+        if normalize == "prescan":
+            nbytes = f.frames * f.channels * dtype.itemsize
+            with profiling.span("prescan", nbytes=nbytes):
+                peak = scan_peak(_filtered_blocks(f, sos, block_frames, dtype))
+            f.seek(0)
+        limiter = output_limiter(
+            normalize, f.samplerate, f.channels, dtype, peak
+        )
+
+        with sf.SoundFile(
+            output_file,
+            mode="w",
+            samplerate=f.samplerate,
+            channels=f.channels,
+            subtype=PCM_SUBTYPES[dtype.itemsize],
+            format="WAV",
+        ) as out:
+            for block in tqdm(
+                f.blocks(blocksize=block_frames, dtype=dtype.name, always_2d=True),
+                total=total_blocks,
+                desc="Enhancing",
+                unit="block",
+                disable=not SHOW_PROGRESS,
+            ):
+                if vad is not None:
+                    with profiling.span("vad", nbytes=block.nbytes):
+                        vad.feed(block)
+                with profiling.span("filter", nbytes=block.nbytes):
+                    filtered, zi = filter_channels(sos, block.T, zi)
+                    filtered = filtered.T
+                if limiter is not None:
+                    with profiling.span("limit", nbytes=block.nbytes):
+                        filtered = limiter.process(filtered)
+                with profiling.span("write", nbytes=block.nbytes):
+                    out.write(to_pcm(filtered, dtype))
+            if limiter is not None:
+                # Samples still held back by the look-ahead
+                tail = limiter.process(np.zeros((0, f.channels)), final=True)
+                out.write(to_pcm(tail, dtype))
+
+    return vad.segments() if vad is not None else None
+
+
+def _filtered_blocks(f, sos, block_frames, dtype):
+    zi = None
+    for block in f.blocks(
+        blocksize=block_frames, dtype=dtype.name, always_2d=True
+    ):
+        filtered, zi = filter_channels(sos, block.T, zi)
+        yield filtered
+
+
+def resolve_output_file(input_file, output_path):
+    """Return the file :func:`enhance_audio` writes for ``output_path``."""
+
+    if os.path.isdir(output_path):
+        base = os.path.splitext(os.path.basename(input_file))[0]
+        return os.path.join(output_path, f"{base}_enhanced.wav")
+    if not os.path.splitext(output_path)[1]:
+        return output_path + "_enhanced.wav"
+    return output_path
+
+
+def cache_params(
+    low_freq_enhance, distance_field, analyze=False, normalize=None
+):
+    """Return the skip-cache parameters of an :func:`enhance_audio` call."""
+
+    return (
+        distance_field,
+        low_freq_enhance,
+        bool(analyze),
+        normalize,
+        CODE_VERSION,
+    )
 
 
 def enhance_audio(
-    input_file, output_path, low_freq_enhance, distance_field, analyze=False
+    input_file,
+    output_path,
+    low_freq_enhance,
+    distance_field,
+    analyze=False,
+    stream=False,
+    export_features=False,
+    spectrograms=True,
+    results_db=RESULTS_DB,
+    normalize=None,
 ):
-    """Enhance ``input_file`` and write the result to ``output_path``."""
+    """Enhance ``input_file`` and write the result to ``output_path``.
+
+    With ``stream`` set, the file is processed block by block by
+    :func:`enhance_audio_stream` so memory use does not grow with the
+    length of the recording. Per-segment voice feature analysis needs the
+    whole file and is skipped in that mode; voice segments are still logged.
+
+    ``normalize`` selects the output gain stage (see :func:`output_limiter`);
+    both paths produce the same samples with it.
+
+    The run, and with ``analyze`` its voice segments and features, are
+    stored in the SQLite database ``results_db`` in one transaction.
+
+    Returns
+    -------
+    str
+        Path of the enhanced file.
+    """
 
     logging.info(
         f"Processing {input_file} for {distance_field} field enhancement"
     )
 
-    # Determine final output file name
-    output_file = output_path
-    if os.path.isdir(output_path):
-        base = os.path.splitext(os.path.basename(input_file))[0]
-        output_file = os.path.join(output_path, f"{base}_enhanced.wav")
-    elif not os.path.splitext(output_path)[1]:
-        output_file = output_path + "_enhanced.wav"
-
+    output_file = resolve_output_file(input_file, output_path)
     os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
 
-    # Load the audio file
-    audio = pydub.AudioSegment.from_file(input_file)
-    voice_segments = detect_voice_segments(audio)
-    if analyze:
-        logging.info("Voice segments detected: %s", voice_segments)
-        # Batch write voice segments
-        file_exists = os.path.exists("voice_segments.csv") and os.stat("voice_segments.csv").st_size > 0
-        with open("voice_segments.csv", mode="a", newline="") as seg_file:
-            seg_writer = csv.writer(seg_file)
-            if not file_exists:
-                seg_writer.writerow(["file", "start", "end"])
-            # Batch write all segments at once
-            seg_writer.writerows([[input_file, start, end] for start, end in voice_segments])
-        analyze_voice_features(audio, voice_segments, input_file)
-
-    audio_data = np.array(audio.get_array_of_samples())
-
-    # Apply the filter based on the field type
-    if distance_field == "far":
-        # Low-pass filter for far-field voices
-        logging.info("Applying low-pass filter for far-field voices.")
-        enhanced_audio = apply_low_pass_filter(
-            audio_data, audio.frame_rate, 500
-        )  # Low-pass cutoff at 500 Hz
-    elif distance_field == "mid":
-        # Band-pass filter for mid-field voices
-        logging.info("Applying band-pass filter for mid-field voices.")
-        enhanced_audio = apply_band_pass_filter(
-            audio_data, audio.frame_rate, 500, 5000
-        )  # Band-pass filter between 500Hz and 5000Hz
-    elif distance_field == "close":
-        # High-pass filter for close voices
-        logging.info("Applying high-pass filter for close-field voices.")
-        enhanced_audio = apply_high_pass_filter(
-            audio_data, audio.frame_rate, 5000
-        )  # High-pass cutoff at 5000 Hz
+    voice_segments = None
+    features = None
+    if stream:
+        info = sf.info(input_file)
+        duration = info.duration
+        sos = filter_plan(info.samplerate, distance_field, low_freq_enhance)
+        logging.info("Streaming %s.", FIELD_FILTERS[distance_field][2])
+        with profiling.span("stream", nbytes=os.path.getsize(input_file)):
+            voice_segments = enhance_audio_stream(
+                input_file,
+                output_file,
+                sos,
+                analyze=analyze,
+                normalize=normalize,
+            )
+        if analyze:
+            logging.info("Voice segments detected: %s", voice_segments)
+            logging.info(
+                "Voice feature analysis is not available in stream mode."
+            )
     else:
-        raise ValueError(
-            "Invalid distance field: must be 'far', 'mid', or 'close'."
-        )
+        # Memory-map or decode the audio file
+        with profiling.span("decode", nbytes=os.path.getsize(input_file)):
+            audio = decode_audio(input_file)
+        duration = audio.duration_seconds
+        if analyze:
+            with profiling.span("vad", nbytes=audio.samples.nbytes):
+                voice_segments = detect_voice_segments(audio)
+            logging.info("Voice segments detected: %s", voice_segments)
+            with profiling.span("features", segments=len(voice_segments)):
+                features = analyze_voice_features(
+                    audio,
+                    voice_segments,
+                    input_file,
+                    export_features=export_features,
+                    spectrograms=spectrograms,
+                )
 
-    # Enhance low-frequency transmission
-    logging.info("Enhancing low-frequency transmission.")
-    enhanced_audio = apply_low_pass_filter(
-        enhanced_audio, audio.frame_rate, low_freq_enhance
-    )
+        # Planar (channels, samples) view of the interleaved samples
+        audio_data = audio.samples
+        planar = audio_data.T
 
-    # Save the enhanced audio to the output file
-    enhanced_audio_segment = pydub.AudioSegment(
-        enhanced_audio.tobytes(),
-        frame_rate=audio.frame_rate,
-        sample_width=audio.sample_width,
-        channels=audio.channels,
-    )
-    enhanced_audio_segment.export(output_file, format="wav")
+        # Apply the field filter and low-frequency enhancement in one pass
+        sos = filter_plan(audio.frame_rate, distance_field, low_freq_enhance)
+        logging.info("Applying %s.", FIELD_FILTERS[distance_field][2])
+        logging.info("Enhancing low-frequency transmission.")
+        with profiling.span("filter", nbytes=audio_data.nbytes):
+            enhanced_audio, _ = filter_channels(sos, planar)
+        enhanced_audio = enhanced_audio.T
+        if normalize is not None:
+            with profiling.span("limit", nbytes=audio_data.nbytes):
+                peak = None
+                if normalize == "prescan":
+                    peak = scan_peak([enhanced_audio])
+                limiter = output_limiter(
+                    normalize,
+                    audio.frame_rate,
+                    audio.channels,
+                    audio_data.dtype,
+                    peak,
+                )
+                enhanced_audio = limiter.process(enhanced_audio, final=True)
+
+        # Save the enhanced audio to the output file
+        with profiling.span("export", nbytes=audio_data.nbytes):
+            sf.write(
+                output_file,
+                to_pcm(enhanced_audio, audio_data.dtype),
+                audio.frame_rate,
+                subtype=PCM_SUBTYPES[audio_data.dtype.itemsize],
+                format="WAV",
+            )
     logging.info(f"Enhanced audio saved to {output_file}")
+    profiling.add_audio(duration)
 
-    # Log the changes in CSV
-    log_header = [
-        "file",
-        "distance_field",
-        "low_freq_enhance",
-        "output",
-        "timestamp",
-    ]
-    file_exists = os.path.isfile("audio_enhancement_log.csv")
-    with open("audio_enhancement_log.csv", mode="a", newline="") as file:
-        writer = csv.writer(file)
-        if not file_exists:
-            writer.writerow(log_header)
-        writer.writerow(
-            [
+    # Log the run, segments and features in one transaction
+    with profiling.span("results_db"):
+        conn = results_store.connect(results_db)
+        try:
+            results_store.record_run(
+                conn,
                 input_file,
-                distance_field,
-                low_freq_enhance,
-                output_file,
-                datetime.now().isoformat(timespec="seconds"),
-            ]
+                {
+                    "distance_field": distance_field,
+                    "low_freq_enhance": low_freq_enhance,
+                    "output": output_file,
+                    "timestamp": datetime.now().isoformat(timespec="seconds"),
+                },
+                voice_segments=voice_segments,
+                features=features,
+                duration=duration,
+            )
+        finally:
+            conn.close()
+    logging.info("Results logged to %s", results_db)
+    return output_file
+
+
+AUDIO_EXTENSIONS = (
+    ".wav", ".flac", ".ogg", ".mp3", ".m4a", ".mp4", ".aac", ".aiff",
+)
+
+
+def find_audio_files(pattern):
+    """Return the audio files in a directory or matching a glob pattern.
+
+    Files are ordered largest first so the longest jobs start early and do
+    not leave a batch waiting on one straggler at the end.
+    """
+
+    if os.path.isdir(pattern):
+        paths = [
+            os.path.join(pattern, name)
+            for name in os.listdir(pattern)
+            if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS
+        ]
+    else:
+        paths = glob.glob(pattern)
+    paths = [p for p in paths if os.path.isfile(p)]
+    return sorted(paths, key=lambda p: (-os.path.getsize(p), p))
+
+
+def _init_batch_worker(analyze):
+    """Prepare a batch worker process once, before it takes any file."""
+
+    global SHOW_PROGRESS, RENDER_WORKERS, FILTER_WORKERS
+
+    SHOW_PROGRESS = False
+    # The pool already uses every core; filter and render inline
+    FILTER_WORKERS = 1
+    RENDER_WORKERS = 0
+    if analyze:
+        # Trigger librosa's JIT compilation before the first real file
+        compute_feature_tracks(np.zeros(FEATURE_FRAME_LENGTH), 16000)
+
+
+BatchResult = collections.namedtuple(
+    "BatchResult", ["input", "output", "error", "cached"]
+)
+
+
+def batch_output_files(files, output_dir):
+    """Return the output file of each batch input, keyed by input path.
+
+    Outputs are named ``<stem>_enhanced.wav``. Inputs sharing a stem, such
+    as ``a.wav`` and ``a.flac``, keep their extension in the name instead
+    (``a_flac_enhanced.wav``), so no two workers write the same file.
+
+    Raises
+    ------
+    ValueError
+        If inputs still share an output name, e.g. files of the same name
+        in different directories matched by one glob.
+    """
+
+    stems = collections.defaultdict(list)
+    for path in files:
+        stems[os.path.splitext(os.path.basename(path))[0]].append(path)
+    outputs = {}
+    for stem, paths in stems.items():
+        for path in paths:
+            name = stem
+            if len(paths) > 1:
+                name = os.path.basename(path).replace(".", "_")
+            outputs[path] = os.path.join(output_dir, f"{name}_enhanced.wav")
+
+    inputs = collections.defaultdict(list)
+    for path, output_file in outputs.items():
+        inputs[output_file].append(path)
+    clashes = [paths for paths in inputs.values() if len(paths) > 1]
+    if clashes:
+        raise ValueError(
+            "Inputs would overwrite each other's output: "
+            + "; ".join(", ".join(paths) for paths in clashes)
         )
-        logging.info("Changes logged to audio_enhancement_log.csv")
+    return outputs
+
+
+def _enhance_batch_file(input_file, output_file, args, kwargs):
+    """Run :func:`enhance_audio` for one batch file without raising."""
+
+    try:
+        output_file = enhance_audio(input_file, output_file, *args, **kwargs)
+        return BatchResult(input_file, output_file, None, False)
+    except Exception as e:
+        logging.exception("Failed to enhance %s", input_file)
+        error = f"{type(e).__name__}: {e}"
+        return BatchResult(input_file, None, error, False)
+
+
+def enhance_batch(
+    pattern,
+    output_dir,
+    low_freq_enhance,
+    distance_field,
+    jobs=None,
+    manifest=None,
+    **kwargs,
+):
+    """Enhance every audio file in a directory or glob on a process pool.
+
+    Each file goes through exactly the same :func:`enhance_audio` call as in
+    single-file mode. Workers are started once and reused for all files,
+    so the heavy imports are paid per worker rather than per file, and a
+    failure in one file is reported without stopping the batch.
+
+    Parameters
+    ----------
+    pattern : str
+        Input directory or glob pattern.
+    output_dir : str
+        Directory receiving ``<name>_enhanced.wav`` files, named by
+        :func:`batch_output_files`.
+    low_freq_enhance : int
+        Low-frequency enhancement (Hz).
+    distance_field : str
+        ``"far"``, ``"mid"`` or ``"close"``.
+    jobs : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    manifest : EnhanceManifest, optional
+        Skip cache. Files whose output is up to date are not processed again
+        and successful files are recorded in it.
+    **kwargs
+        Further keyword arguments for :func:`enhance_audio`.
+
+    Returns
+    -------
+    list of BatchResult
+        One result per file, largest input first. ``output`` is ``None``
+        and ``error`` describes the problem for failed files; ``cached``
+        marks files served from ``manifest``.
+    """
+
+    files = find_audio_files(pattern)
+    outputs = batch_output_files(files, output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    args = (low_freq_enhance, distance_field)
+    params = cache_params(
+        low_freq_enhance,
+        distance_field,
+        kwargs.get("analyze", False),
+        kwargs.get("normalize"),
+    )
+    results = {}
+    if manifest is not None:
+        for path in files:
+            output_file = outputs[path]
+            if manifest.lookup(path, output_file, params):
+                results[path] = BatchResult(path, output_file, None, True)
+    pending = [path for path in files if path not in results]
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_batch_worker,
+        initargs=(kwargs.get("analyze", False),),
+    ) as pool:
+        futures = {
+            pool.submit(
+                _enhance_batch_file, path, outputs[path], args, kwargs
+            ): path
+            for path in pending
+        }
+        with tqdm(
+            total=sum(os.path.getsize(p) for p in pending),
+            desc="Batch",
+            unit="B",
+            unit_scale=True,
+        ) as progress:
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    results[path] = future.result()
+                except Exception as e:  # worker process died
+                    results[path] = BatchResult(
+                        path, None, f"{type(e).__name__}: {e}", False
+                    )
+                if results[path].error:
+                    progress.write(f"Failed: {path}: {results[path].error}")
+                elif manifest is not None:
+                    manifest.record(path, results[path].output, params)
+                progress.update(os.path.getsize(path))
+    if manifest is not None:
+        manifest.save()
+    return [results[path] for path in files]
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Enhance audio for far, mid, or close-field voices."
     )
-    parser.add_argument("input", type=str, help="Input audio file path.")
-    parser.add_argument("output", type=str, help="Output audio file path.")
+    parser.add_argument(
+        "input",
+        type=str,
+        help="Input audio file, or a directory or glob for batch mode.",
+    )
+    parser.add_argument(
+        "output",
+        type=str,
+        help="Output audio file path (output directory in batch mode).",
+    )
     parser.add_argument(
         "low_freq_enhance", type=int, help="Low-frequency enhancement (Hz)."
     )
@@ -331,13 +1294,142 @@ if __name__ == "__main__":
             "and log results."
         ),
     )
+    parser.add_argument(
+        "--export-features",
+        action="store_true",
+        help=(
+            "With --analyze, save frame-level f0, centroid and STFT "
+            "magnitude to features/<file>.npz."
+        ),
+    )
+    parser.add_argument(
+        "--no-spectrograms",
+        dest="spectrograms",
+        action="store_false",
+        help="With --analyze, skip rendering per-segment spectrogram images.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Process the file block by block with constant memory "
+            "(16/24/32-bit PCM input)."
+        ),
+    )
+    parser.add_argument(
+        "--normalize",
+        choices=NORMALIZE_MODES,
+        default=None,
+        help=(
+            "Bring the output to -1 dBFS peak: 'limit' in a single pass with "
+            "a look-ahead limiter (quiet passages get up to +20 dB), "
+            "'prescan' with one constant gain found by a pre-pass."
+        ),
+    )
+    parser.add_argument(
+        "--results-db",
+        default=RESULTS_DB,
+        help=f"SQLite database receiving the results (default: {RESULTS_DB}).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes in batch mode (default: number of CPUs).",
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help=(
+            "Skip inputs whose output is up to date according to the "
+            "manifest of previous runs."
+        ),
+    )
+    parser.add_argument(
+        "--manifest",
+        default=MANIFEST_PATH,
+        help=f"Skip-cache manifest file (default: {MANIFEST_PATH}).",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PROFILE_TRACE,
+        default=None,
+        metavar="TRACE",
+        help=(
+            "Time each pipeline stage, print a summary and write a Chrome "
+            f"trace to TRACE (default: {PROFILE_TRACE}). Single files only."
+        ),
+    )
 
     args = parser.parse_args()
 
-    enhance_audio(
-        args.input,
-        args.output,
+    manifest = EnhanceManifest(args.manifest) if args.skip_unchanged else None
+    options = dict(
+        analyze=args.analyze,
+        stream=args.stream,
+        export_features=args.export_features,
+        spectrograms=args.spectrograms,
+        results_db=args.results_db,
+        normalize=args.normalize,
+    )
+    if os.path.isdir(args.input) or glob.has_magic(args.input):
+        if args.profile:
+            parser.error("--profile is not supported in batch mode")
+        try:
+            batch = enhance_batch(
+                args.input,
+                args.output,
+                args.low_freq_enhance,
+                args.distance_field,
+                jobs=args.jobs,
+                manifest=manifest,
+                **options,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        failed = [r for r in batch if r.error]
+        print(
+            f"Enhanced {len(batch) - len(failed)} of {len(batch)} files "
+            f"into {args.output}"
+        )
+        if manifest is not None:
+            print(f"  cache hits: {manifest.hits}")
+        for result in failed:
+            print(f"  failed: {result.input}: {result.error}")
+        sys.exit(1 if failed else 0)
+
+    params = cache_params(
         args.low_freq_enhance,
         args.distance_field,
-        analyze=args.analyze,
+        args.analyze,
+        args.normalize,
     )
+    output_file = resolve_output_file(args.input, args.output)
+    if manifest is not None and manifest.lookup(
+        args.input, output_file, params
+    ):
+        print(f"Up to date (cache hit): {output_file}")
+        sys.exit(0)
+    if args.profile:
+        with profiling.profile() as profiler:
+            enhance_audio(
+                args.input,
+                args.output,
+                args.low_freq_enhance,
+                args.distance_field,
+                **options,
+            )
+        print(profiler.summary())
+        print(f"Trace saved to {profiler.write_chrome_trace(args.profile)}")
+    else:
+        enhance_audio(
+            args.input,
+            args.output,
+            args.low_freq_enhance,
+            args.distance_field,
+            **options,
+        )
+    if manifest is not None:
+        manifest.record(args.input, output_file, params)
+        manifest.save()
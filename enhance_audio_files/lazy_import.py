@@ -0,0 +1,41 @@
+"""Defer loading heavy modules until they are first used.
+
+``signal = lazy_import("scipy.signal")`` binds a placeholder module that is
+executed on its first attribute access. Commands that never reach the code
+using it, such as ``--help`` or a filter-only run without ``--analyze``, do
+not pay for importing it.
+"""
+
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Return the module ``name``, loading it on first attribute access.
+
+    A module that is already imported is returned as is. A missing module
+    still raises ``ModuleNotFoundError`` immediately.
+
+    Parameters
+    ----------
+    name : str
+        Absolute module name, e.g. ``"scipy.signal"``.
+
+    Returns
+    -------
+    module
+    """
+
+    try:
+        return sys.modules[name]
+    except KeyError:
+        pass
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,135 @@
+"""Single-pass look-ahead peak limiter.
+
+:class:`PeakLimiter` brings a signal delivered block by block up to a target
+peak level in one pass with constant memory. The gain applied to each sample
+is ``min(max_gain, target / peak)``, where ``peak`` is the largest magnitude
+from the hold window before the sample to the look-ahead window after it,
+averaged over the look-ahead so that it ramps down ahead of a peak instead
+of stepping. No output sample exceeds ``target``; the output lags the input
+by the look-ahead.
+
+When exact global normalization is required, a pre-pass with
+:func:`scan_peak` finds the peak and ``max_gain = target / peak`` turns the
+limiter into a constant gain.
+"""
+
+import numpy as np
+
+if __package__:
+    from .lazy_import import lazy_import
+else:  # run as a script
+    from lazy_import import lazy_import
+
+ndimage = lazy_import("scipy.ndimage")
+
+# Output peak as a fraction of full scale (-1 dBFS)
+LIMITER_TARGET = 10 ** (-1 / 20)
+# Largest boost given to quiet passages (+20 dB)
+LIMITER_MAX_GAIN = 10.0
+LIMITER_LOOKAHEAD_MS = 5
+LIMITER_HOLD_MS = 200
+# Gains are rounded down to multiples of this step, which keeps their
+# running sums exact so the output does not depend on the block sizes
+GAIN_STEP = 2.0 ** -20
+
+
+class PeakLimiter:
+    """Look-ahead gain stage for ``(frames, channels)`` blocks.
+
+    All channels share one gain, so the stereo image is preserved.
+
+    Parameters
+    ----------
+    sample_rate : int
+        Sample rate in Hz.
+    channels : int
+        Number of channels.
+    target : float
+        Output peak in the units of the samples.
+    max_gain : float, optional
+        Gain applied where the signal stays below ``target / max_gain``.
+    lookahead_ms : float, optional
+        Time over which the gain ramps down before a peak.
+    hold_ms : float, optional
+        Time the gain is held after a peak before it ramps back up.
+    """
+
+    def __init__(
+        self,
+        sample_rate,
+        channels,
+        target,
+        max_gain=LIMITER_MAX_GAIN,
+        lookahead_ms=LIMITER_LOOKAHEAD_MS,
+        hold_ms=LIMITER_HOLD_MS,
+    ):
+        self.target = float(target)
+        self.max_gain = float(max_gain)
+        self.lookahead = max(1, round(sample_rate * lookahead_ms / 1000))
+        self._window = self.lookahead + round(sample_rate * hold_ms / 1000)
+        # Peaks, gains and input samples still needed by the next block
+        self._peaks = np.zeros(self._window - 1)
+        self._gains = np.zeros(self.lookahead - 1)
+        self._delay = np.zeros((self.lookahead - 1, channels))
+        # Leading outputs that belong to the zero-filled delay line
+        self._skip = self.lookahead - 1
+
+    def process(self, x, final=False):
+        """Apply the gain to the next block ``x``.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            Samples of shape ``(frames, channels)``.
+        final : bool, optional
+            Mark ``x`` as the last block and flush the delayed samples.
+
+        Returns
+        -------
+        numpy.ndarray
+            The float64 output samples that became available.
+        """
+
+        x = np.asarray(x, dtype=np.float64)
+        lookahead = self.lookahead
+        if final:
+            x = np.concatenate((x, np.zeros_like(self._delay)))
+        n = len(x)
+
+        # Largest magnitude over the trailing window of each new sample
+        peaks = np.concatenate((self._peaks, np.abs(x).max(axis=1)))
+        w = self._window
+        envelope = ndimage.maximum_filter1d(peaks, w)[w // 2:n + w // 2]
+        with np.errstate(divide="ignore"):
+            gains = np.minimum(self.max_gain, self.target / envelope)
+        gains = np.floor(gains / GAIN_STEP) * GAIN_STEP
+
+        # Moving average over the look-ahead, applied to delayed samples
+        gains = np.concatenate((self._gains, gains))
+        sums = np.concatenate(([0.0], np.cumsum(gains)))
+        smooth = (sums[lookahead:] - sums[:-lookahead]) / lookahead
+        delayed = np.concatenate((self._delay, x))
+        y = delayed[:n] * smooth[:, np.newaxis]
+
+        self._peaks = peaks[len(peaks) - (w - 1):]
+        self._gains = gains[len(gains) - (lookahead - 1):]
+        self._delay = delayed[n:]
+        skip = min(self._skip, len(y))
+        self._skip -= skip
+        return y[skip:]
+
+
+def scan_peak(blocks):
+    """Return the largest magnitude in an iterable of sample blocks."""
+
+    peak = 0.0
+    for block in blocks:
+        if len(block):
+            peak = max(peak, float(np.abs(block).max()))
+    return peak
+
+
+def normalizing_gain(peak, target):
+    """Return the gain that scales ``peak`` to ``target`` (1 for silence)."""
+
+    return target / peak if peak > 0 else 1.0
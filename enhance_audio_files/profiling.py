@@ -0,0 +1,161 @@
+"""Stage-level profiling with Chrome trace-event export.
+
+Code marks its stages with :func:`span`. Nothing is recorded unless a
+:class:`Profiler` is active (see :func:`profile`), and an inactive
+:func:`span` only returns a shared no-op context manager, so instrumented
+code runs at full speed when profiling is off.
+
+Traces open in ``chrome://tracing`` or https://ui.perfetto.dev.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+
+class Profiler:
+    """Collect timed spans and the amount of audio they covered."""
+
+    def __init__(self):
+        self.events = []
+        self.audio_seconds = 0.0
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    @contextlib.contextmanager
+    def span(self, name, nbytes=0, **args):
+        """Time the enclosed block as a stage called ``name``.
+
+        Parameters
+        ----------
+        name : str
+            Stage name. Spans nest, so sub-stages can be recorded inside.
+        nbytes : int, optional
+            Bytes processed by the stage, used for throughput figures.
+        **args
+            Extra values shown with the span in the trace viewer.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.events.append(
+                {
+                    "name": name,
+                    "start": start - self._origin,
+                    "duration": end - start,
+                    "nbytes": nbytes,
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    def chrome_trace(self):
+        """Return the spans as a Chrome trace-event document."""
+
+        return {
+            "traceEvents": [
+                {
+                    "name": event["name"],
+                    "ph": "X",
+                    "ts": event["start"] * 1e6,
+                    "dur": event["duration"] * 1e6,
+                    "pid": self._pid,
+                    "tid": event["tid"],
+                    "args": dict(event["args"], bytes=event["nbytes"]),
+                }
+                for event in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, path):
+        """Write :meth:`chrome_trace` to ``path`` as JSON."""
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    def summary(self):
+        """Return a table of time, bytes and real-time factor per stage.
+
+        The real-time factor is the stage time divided by the duration of
+        the audio processed while profiling.
+        """
+
+        stages = {}
+        for event in self.events:
+            count, seconds, nbytes = stages.get(event["name"], (0, 0.0, 0))
+            stages[event["name"]] = (
+                count + 1,
+                seconds + event["duration"],
+                nbytes + event["nbytes"],
+            )
+        wall = max(
+            (e["start"] + e["duration"] for e in self.events), default=0.0
+        ) - min((e["start"] for e in self.events), default=0.0)
+
+        lines = [
+            f"{'stage':24s} {'calls':>6s} {'seconds':>9s} {'%wall':>6s} "
+            f"{'MB':>9s} {'MB/s':>8s} {'RTF':>8s}"
+        ]
+        for name, (count, seconds, nbytes) in sorted(
+            stages.items(), key=lambda item: -item[1][1]
+        ):
+            mb = nbytes / 1e6
+            rate = rtf = f"{'-':>8s}"
+            if nbytes and seconds:
+                rate = f"{mb / seconds:8.1f}"
+            if self.audio_seconds:
+                rtf = f"{seconds / self.audio_seconds:8.4f}"
+            share = 100 * seconds / wall if wall else 0.0
+            lines.append(
+                f"{name:24s} {count:6d} {seconds:9.3f} {share:6.1f} "
+                f"{mb:9.2f} {rate} {rtf}"
+            )
+        lines.append(
+            f"wall {wall:.3f} s for {self.audio_seconds:.1f} s of audio"
+        )
+        return "\n".join(lines)
+
+
+_NULL_SPAN = contextlib.nullcontext()
+_active = None
+
+
+def span(name, nbytes=0, **args):
+    """Time a stage on the active profiler; a no-op when none is active."""
+
+    if _active is None:
+        return _NULL_SPAN
+    return _active.span(name, nbytes, **args)
+
+
+def add_audio(seconds):
+    """Account ``seconds`` of processed audio to the active profiler."""
+
+    if _active is not None:
+        _active.audio_seconds += seconds
+
+
+def enabled():
+    """Return ``True`` while a profiler is active."""
+
+    return _active is not None
+
+
+@contextlib.contextmanager
+def profile():
+    """Activate a new :class:`Profiler` for the enclosed block."""
+
+    global _active
+
+    previous, _active = _active, Profiler()
+    try:
+        yield _active
+    finally:
+        _active = previous
@@ -0,0 +1,138 @@
+"""Rational polyphase resampling shared by the analysis stages.
+
+:class:`Resampler` converts between two integer sample rates with the same
+Kaiser-windowed FIR design and output alignment as
+:func:`scipy.signal.resample_poly`. It carries its input history across
+blocks, so a stream resampled block by block yields exactly the samples of
+resampling it in one piece. Filter designs are cached per pair of rates.
+"""
+
+import collections
+import functools
+import math
+
+import numpy as np
+
+if __package__:
+    from .lazy_import import lazy_import
+else:  # run as a script
+    from lazy_import import lazy_import
+
+signal = lazy_import("scipy.signal")
+
+# Filter half-length in units of the larger rate factor, and the window used
+# to design it (the defaults of scipy.signal.resample_poly)
+RESAMPLE_HALF_LENGTH = 10
+RESAMPLE_WINDOW = ("kaiser", 5.0)
+RESAMPLE_PLAN_CACHE_SIZE = 32
+
+ResamplePlan = collections.namedtuple(
+    "ResamplePlan", ["up", "down", "taps", "delay"]
+)
+ResamplePlan.__doc__ = """Polyphase filter for one pair of sample rates.
+
+The input is upsampled by ``up``, filtered with ``taps`` and decimated by
+``down``; output sample ``i`` is sample ``i + delay`` of that sequence.
+"""
+
+
+@functools.lru_cache(maxsize=RESAMPLE_PLAN_CACHE_SIZE)
+def resample_plan(orig_sr, target_sr):
+    """Design the polyphase filter converting ``orig_sr`` to ``target_sr``.
+
+    Results are cached; the returned ``taps`` must not be modified.
+
+    Returns
+    -------
+    ResamplePlan
+    """
+
+    g = math.gcd(int(orig_sr), int(target_sr))
+    up, down = int(target_sr) // g, int(orig_sr) // g
+    max_rate = max(up, down)
+    half_len = RESAMPLE_HALF_LENGTH * max_rate
+    taps = signal.firwin(
+        2 * half_len + 1, 1.0 / max_rate, window=RESAMPLE_WINDOW
+    ) * up
+    # Zero-pad the filter so the output samples fall on its centre
+    pre_pad = down - half_len % down
+    taps = np.concatenate((np.zeros(pre_pad), taps))
+    return ResamplePlan(up, down, taps, (half_len + pre_pad) // down)
+
+
+class Resampler:
+    """Resample a mono signal delivered block by block.
+
+    Parameters
+    ----------
+    orig_sr, target_sr : int
+        Input and output sample rates in Hz.
+    """
+
+    def __init__(self, orig_sr, target_sr):
+        self.orig_sr = orig_sr
+        self.target_sr = target_sr
+        self._passthrough = orig_sr == target_sr
+        if not self._passthrough:
+            self._plan = resample_plan(orig_sr, target_sr)
+        # Input samples still needed, starting at absolute index ``_start``
+        # (always a multiple of ``down`` so outputs stay phase-aligned)
+        self._buffer = np.zeros(0)
+        self._start = 0
+        self._consumed = 0
+        self._produced = 0
+
+    def process(self, x, final=False):
+        """Resample the next block ``x``.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            1-D block of samples.
+        final : bool, optional
+            Mark ``x`` as the last block and flush the filter tail.
+
+        Returns
+        -------
+        numpy.ndarray
+            The float64 output samples that became available.
+        """
+
+        if self._passthrough:
+            return np.array(x, dtype=np.float64)
+        up, down, taps, delay = self._plan
+
+        self._buffer = np.concatenate((self._buffer, x))
+        self._consumed += len(x)
+        # Output i needs the input up to index (i + delay) * down // up
+        total = -(-self._consumed * up // down)
+        ready = total if final else max(0, total - delay)
+        if ready <= self._produced:
+            return np.zeros(0)
+
+        first = self._produced + delay - self._start * up // down
+        end = first + ready - self._produced
+        data = self._buffer
+        if final:
+            # Zero input past the end lets the filter tail run out
+            needed = -(-((end - 1) * down - len(taps) + 1) // up) + 1
+            data = np.concatenate((data, np.zeros(max(0, needed - len(data)))))
+        y = signal.upfirdn(taps, data, up, down)[first:end]
+        self._produced = ready
+
+        # Drop input that no later output reaches back to
+        oldest = (ready + delay) * down // up - (len(taps) - 1) // up - 1
+        start = max(self._start, oldest // down * down)
+        self._buffer = self._buffer[start - self._start:]
+        self._start = start
+        return y
+
+
+def resample(x, orig_sr, target_sr):
+    """Resample the 1-D signal ``x`` from ``orig_sr`` to ``target_sr``.
+
+    Equivalent to ``scipy.signal.resample_poly`` with the rate ratio reduced
+    to lowest terms, using the cached filter design.
+    """
+
+    return Resampler(orig_sr, target_sr).process(x, final=True)
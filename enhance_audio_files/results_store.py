@@ -0,0 +1,229 @@
+"""SQLite store for enhancement runs, voice segments and voice features.
+
+Replaces the ``voice_segments.csv``, ``voice_analysis.csv`` and
+``audio_enhancement_log.csv`` logs with one indexed database in WAL mode so
+concurrent batch workers can write safely. Views with the old CSV columns
+are kept, and :func:`export_csv` writes them back out as CSV files.
+
+Run ``python results_store.py <db> [--out DIR]`` to export the views.
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+
+RESULTS_DB = "enhance_results.db"
+# Seconds a writer waits for another process holding the write lock
+BUSY_TIMEOUT = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    format TEXT,
+    duration REAL,
+    -- Unix time the recording started, estimated as mtime - duration
+    recorded_at REAL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    distance_field TEXT NOT NULL,
+    low_freq_enhance INTEGER NOT NULL,
+    output TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    start REAL NOT NULL,
+    "end" REAL NOT NULL,
+    -- Unix time of the segment start (recorded_at + start)
+    start_at REAL
+);
+CREATE TABLE IF NOT EXISTS segment_features (
+    segment_id INTEGER PRIMARY KEY REFERENCES segments(id),
+    f0_median REAL,
+    centroid_mean REAL,
+    gender TEXT,
+    age_range TEXT,
+    voice_color TEXT,
+    possible_height TEXT,
+    spectrogram TEXT,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_file ON runs(file_id);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs(timestamp);
+CREATE INDEX IF NOT EXISTS idx_segments_file ON segments(file_id, start);
+CREATE INDEX IF NOT EXISTS idx_segments_run ON segments(run_id);
+CREATE INDEX IF NOT EXISTS idx_segments_start_at ON segments(start_at);
+CREATE INDEX IF NOT EXISTS idx_features_gender ON segment_features(gender);
+CREATE INDEX IF NOT EXISTS idx_features_f0 ON segment_features(f0_median);
+CREATE INDEX IF NOT EXISTS idx_features_centroid
+    ON segment_features(centroid_mean);
+
+CREATE VIEW IF NOT EXISTS voice_segments AS
+    SELECT f.path AS file, s.start, s."end"
+    FROM segments s JOIN files f ON f.id = s.file_id
+    ORDER BY s.id;
+CREATE VIEW IF NOT EXISTS voice_analysis AS
+    SELECT f.path AS file, s.start, s."end", sf.gender, sf.age_range,
+           sf.voice_color, f.format, sf.possible_height, sf.timestamp,
+           sf.spectrogram
+    FROM segment_features sf
+    JOIN segments s ON s.id = sf.segment_id
+    JOIN files f ON f.id = s.file_id
+    ORDER BY s.id;
+CREATE VIEW IF NOT EXISTS audio_enhancement_log AS
+    SELECT f.path AS file, r.distance_field, r.low_freq_enhance, r.output,
+           r.timestamp
+    FROM runs r JOIN files f ON f.id = r.file_id
+    ORDER BY r.id;
+"""
+
+CSV_VIEWS = ("voice_segments", "voice_analysis", "audio_enhancement_log")
+
+
+def connect(path=RESULTS_DB):
+    """Open the results database, creating the schema if needed."""
+
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record_run(
+    conn,
+    input_file,
+    run,
+    voice_segments=None,
+    features=None,
+    duration=None,
+):
+    """Store one enhancement run of ``input_file`` in a single transaction.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Connection from :func:`connect`.
+    input_file : str
+        Path of the processed file.
+    run : dict
+        ``distance_field``, ``low_freq_enhance``, ``output`` and
+        ``timestamp`` of the run.
+    voice_segments : list of tuple, optional
+        ``(start, end)`` voice segments in seconds.
+    features : list of dict, optional
+        One entry per voice segment (``None`` for segments that were not
+        analysed) with the keys of the ``segment_features`` table.
+    duration : float, optional
+        Duration of the recording in seconds.
+
+    Returns
+    -------
+    int
+        Id of the new run.
+    """
+
+    fmt = os.path.splitext(input_file)[1].lstrip(".").lower()
+    recorded_at = None
+    if duration is not None and os.path.exists(input_file):
+        recorded_at = os.path.getmtime(input_file) - duration
+
+    with conn:
+        conn.execute(
+            "INSERT INTO files (path, format, duration, recorded_at) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT(path) DO UPDATE SET "
+            "format = excluded.format, duration = excluded.duration, "
+            "recorded_at = excluded.recorded_at",
+            (input_file, fmt, duration, recorded_at),
+        )
+        (file_id,) = conn.execute(
+            "SELECT id FROM files WHERE path = ?", (input_file,)
+        ).fetchone()
+        run_id = conn.execute(
+            "INSERT INTO runs (file_id, distance_field, low_freq_enhance, "
+            "output, timestamp) VALUES (?, ?, ?, ?, ?)",
+            (
+                file_id,
+                run["distance_field"],
+                run["low_freq_enhance"],
+                run["output"],
+                run["timestamp"],
+            ),
+        ).lastrowid
+
+        if not voice_segments:
+            return run_id
+        conn.executemany(
+            'INSERT INTO segments (run_id, file_id, start, "end", start_at) '
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    run_id,
+                    file_id,
+                    start,
+                    end,
+                    None if recorded_at is None else recorded_at + start,
+                )
+                for start, end in voice_segments
+            ],
+        )
+        if not features:
+            return run_id
+        segment_ids = [
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM segments WHERE run_id = ? ORDER BY id",
+                (run_id,),
+            )
+        ]
+        conn.executemany(
+            "INSERT INTO segment_features (segment_id, f0_median, "
+            "centroid_mean, gender, age_range, voice_color, possible_height, "
+            "spectrogram, timestamp) VALUES (:segment_id, :f0_median, "
+            ":centroid_mean, :gender, :age_range, :voice_color, "
+            ":possible_height, :spectrogram, :timestamp)",
+            [
+                dict(feature, segment_id=segment_id)
+                for segment_id, feature in zip(segment_ids, features)
+                if feature is not None
+            ],
+        )
+    return run_id
+
+
+def export_csv(conn, view, path):
+    """Write the rows of one of :data:`CSV_VIEWS` to the CSV file ``path``."""
+
+    if view not in CSV_VIEWS:
+        raise ValueError(f"Unknown view {view!r}; expected one of {CSV_VIEWS}")
+    cursor = conn.execute(f"SELECT * FROM {view}")
+    with open(path, mode="w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([col[0] for col in cursor.description])
+        writer.writerows(cursor)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export the enhancement results database as CSV files."
+    )
+    parser.add_argument(
+        "database", nargs="?", default=RESULTS_DB, help="Results database."
+    )
+    parser.add_argument(
+        "--out", default=".", help="Directory receiving the CSV files."
+    )
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    conn = connect(args.database)
+    for view in CSV_VIEWS:
+        print(export_csv(conn, view, os.path.join(args.out, f"{view}.csv")))
+    conn.close()
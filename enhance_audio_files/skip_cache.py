@@ -0,0 +1,146 @@
+"""Content-addressed manifest of already enhanced files.
+
+The manifest maps ``(input content hash, parameters)`` to the output that was
+produced from it, so unchanged inputs can be skipped on later runs. Hashing is
+avoided whenever an input's size and modification time still match the
+values recorded with its last hash. The output's size and modification time
+are recorded too, so an output since overwritten by another run is produced
+again.
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 2
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of the file at ``path``."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class EnhanceManifest:
+    """Skip cache for :func:`enhance_audio` outputs stored as JSON.
+
+    Parameters
+    ----------
+    path : str
+        Location of the manifest file. It is created on :meth:`save`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self._files = {}
+        self._outputs = {}
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self._files = data["files"]
+                self._outputs = data["outputs"]
+        # Output path -> key of the entry that produced it
+        self._keys = {
+            entry["path"]: key for key, entry in self._outputs.items()
+        }
+
+    def content_hash(self, input_file):
+        """Return the content hash of ``input_file``.
+
+        The recorded hash is reused while the file's size and modification
+        time are unchanged; otherwise the file is hashed again.
+        """
+
+        key = os.path.abspath(input_file)
+        st = os.stat(key)
+        entry = self._files.get(key)
+        if (
+            entry
+            and entry["size"] == st.st_size
+            and entry["mtime_ns"] == st.st_mtime_ns
+        ):
+            return entry["sha256"]
+        sha256 = file_digest(key)
+        self._files[key] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": sha256,
+        }
+        return sha256
+
+    @staticmethod
+    def _output_key(sha256, params):
+        return sha256 + ":" + json.dumps(list(params))
+
+    def lookup(self, input_file, output_file, params):
+        """Return ``True`` when ``output_file`` is up to date.
+
+        Parameters
+        ----------
+        input_file : str
+            Input audio file.
+        output_file : str
+            Output the caller is about to write.
+        params : tuple
+            JSON-serialisable parameters that affect the output.
+        """
+
+        key = self._output_key(self.content_hash(input_file), params)
+        recorded = self._outputs.get(key)
+        path = os.path.abspath(output_file)
+        hit = False
+        if recorded is not None and recorded["path"] == path:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                st = None
+            hit = st is not None and (
+                recorded["size"] == st.st_size
+                and recorded["mtime_ns"] == st.st_mtime_ns
+            )
+        self.hits += hit
+        return hit
+
+    def record(self, input_file, output_file, params):
+        """Remember that ``output_file`` was produced from ``input_file``.
+
+        Entries of earlier runs that wrote the same output are dropped, as
+        the file no longer holds their result.
+        """
+
+        key = self._output_key(self.content_hash(input_file), params)
+        path = os.path.abspath(output_file)
+        st = os.stat(path)
+        self._outputs.pop(self._keys.pop(path, None), None)
+        # The key now names this output instead of the one it had before
+        previous = self._outputs.get(key)
+        if previous is not None:
+            del self._keys[previous["path"]]
+        self._keys[path] = key
+        self._outputs[key] = {
+            "path": path,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+
+    def save(self):
+        """Write the manifest atomically."""
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "files": self._files,
+                    "outputs": self._outputs,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,156 @@
+"""Fast spectrogram images written straight from dB arrays.
+
+dB values are mapped through a precomputed colormap lookup table to 8-bit
+RGB and encoded as PNG without going through pyplot figures. Rendering can
+be pushed to a background process pool so analysis never waits on image
+encoding.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import os
+
+import numpy as np
+
+# Dynamic range shown when no explicit ``vmin`` is given
+DEFAULT_RANGE_DB = 80.0
+# zlib level used for PNG encoding; low levels are much faster
+PNG_COMPRESS_LEVEL = 1
+
+
+@functools.lru_cache(maxsize=None)
+def colormap_lut(cmap="magma"):
+    """Return a ``(256, 3)`` uint8 lookup table for a matplotlib colormap."""
+
+    from matplotlib import colormaps
+
+    rgba = colormaps[cmap](np.linspace(0.0, 1.0, 256))
+    return np.round(rgba[:, :3] * 255).astype(np.uint8)
+
+
+def spectrogram_rgb(db, cmap="magma", vmin=None, vmax=None):
+    """Map a ``(freqs, frames)`` dB array to an RGB image.
+
+    Low frequencies end up at the bottom of the image, one pixel per
+    frequency bin and frame.
+
+    Parameters
+    ----------
+    db : numpy.ndarray
+        Spectrogram in dB.
+    cmap : str, optional
+        Name of a matplotlib colormap.
+    vmin, vmax : float, optional
+        Colour range in dB. Defaults to the maximum of ``db`` and
+        :data:`DEFAULT_RANGE_DB` below it.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(freqs, frames, 3)`` uint8 image.
+    """
+
+    db = np.asarray(db, dtype=np.float32)
+    if vmax is None:
+        vmax = float(np.max(db)) if db.size else 0.0
+    if vmin is None:
+        vmin = vmax - DEFAULT_RANGE_DB
+        if db.size:
+            vmin = max(float(np.min(db)), vmin)
+    scale = 255.0 / (vmax - vmin) if vmax > vmin else 0.0
+    idx = np.clip((db[::-1] - vmin) * scale, 0, 255).astype(np.uint8)
+    return colormap_lut(cmap)[idx]
+
+
+def render_png(db, path, cmap="magma", vmin=None, vmax=None):
+    """Write the spectrogram ``db`` to the PNG file ``path``.
+
+    Returns
+    -------
+    str
+        ``path``.
+    """
+
+    from PIL import Image
+
+    rgb = spectrogram_rgb(db, cmap=cmap, vmin=vmin, vmax=vmax)
+    Image.fromarray(rgb).save(
+        path, format="PNG", compress_level=PNG_COMPRESS_LEVEL
+    )
+    return path
+
+
+class SpectrogramRenderer:
+    """Render spectrogram PNGs on a background process pool.
+
+    Use as a context manager; leaving the block waits for pending images.
+    A disabled renderer skips rendering entirely.
+
+    Parameters
+    ----------
+    cmap : str, optional
+        Name of a matplotlib colormap.
+    workers : int, optional
+        Number of rendering processes. Defaults to the number of CPUs;
+        ``0`` renders synchronously in the calling process.
+    enabled : bool, optional
+        When ``False``, :meth:`submit` does nothing and returns ``""``.
+    """
+
+    def __init__(self, cmap="magma", workers=None, enabled=True):
+        self.cmap = cmap
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.enabled = enabled
+        self._pool = None
+        self._pending = []
+
+    def submit(self, db, path, vmin=None, vmax=None):
+        """Queue ``db`` for rendering to ``path``.
+
+        Returns
+        -------
+        str
+            ``path``, or ``""`` when rendering is disabled.
+        """
+
+        if not self.enabled:
+            return ""
+        if self.workers == 0:
+            return render_png(db, path, self.cmap, vmin, vmax)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        self._pending.append(
+            self._pool.submit(
+                render_png, np.asarray(db, dtype=np.float32), path,
+                self.cmap, vmin, vmax,
+            )
+        )
+        return path
+
+    def wait(self):
+        """Block until all queued images are written.
+
+        Errors raised while rendering are re-raised here.
+        """
+
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self):
+        """Wait for pending images and shut the pool down."""
+
+        try:
+            self.wait()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
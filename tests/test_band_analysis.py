@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from benchmarks.run_benchmarks import LFN_DIR
+from scipy.signal import spectrogram, upfirdn
+
+if LFN_DIR not in sys.path:
+    sys.path.insert(0, LFN_DIR)
+
+from band_analysis import BandAnalyzer, Decimator, lowpass_taps  # noqa: E402
+
+
+def _tones(sr, seconds, *tones):
+    rng = np.random.default_rng(4)
+    t = np.arange(int(sr * seconds)) / sr
+    x = rng.normal(0, 1e-4, t.size)
+    for freq, amplitude in tones:
+        x += amplitude * np.sin(2 * np.pi * freq * t)
+    return x
+
+
+def test_decimator_matches_upfirdn_across_blocks():
+    x = np.random.default_rng(5).normal(size=20011)
+    taps = lowpass_taps(44100, 500, 4000)
+    for coefficients in (taps, taps * np.exp(0.3j * np.arange(len(taps)))):
+        for factor in (8, 3, 1):
+            expected = upfirdn(coefficients, x, 1, factor)
+            expected = expected[:-(-len(x) // factor)]
+            decimator = Decimator(coefficients, factor)
+            blocks = np.array_split(x, [0, 1, 5, 3000, 3001])
+            y = np.concatenate([decimator.process(b) for b in blocks])
+            np.testing.assert_allclose(y, expected, atol=1e-12)
+
+
+def test_peaks_are_finer_than_full_band_spectrogram():
+    sr = 48000
+    x = _tones(sr, 20, (60.3, 0.01), (21000.7, 0.005))
+    bands = BandAnalyzer(sr)
+    bands.feed(x)
+    assert abs(bands.lf_peak - 60.3) < 1.5
+    assert abs(bands.hf_peak - 21000.7) < 12
+
+    # The full-band analysis this replaces, with ~12 Hz bins
+    freqs, _, Sxx = spectrogram(x, fs=sr, nperseg=4096, noverlap=2048)
+    lf = (freqs >= 20) & (freqs <= 100)
+    hf = (freqs >= 20000) & (freqs <= 24000)
+    assert bands.lf_db > 10 * np.log10(Sxx[lf].max())
+    assert abs(bands.hf_db - 10 * np.log10(Sxx[hf].max())) < 1
+
+
+def test_blocks_give_the_same_image_and_peaks():
+    sr = 44100
+    x = _tones(sr, 6, (45.2, 0.02), (22050.0, 0.001), (21500.3, 0.003))
+    whole = BandAnalyzer(sr)
+    image = whole.feed(x)
+    assert image.shape == (len(whole.image_freqs), whole.image_columns(len(x)))
+
+    blocks = BandAnalyzer(sr)
+    parts = [blocks.feed(b) for b in np.array_split(x, [7, 4096, 50000])]
+    np.testing.assert_allclose(np.concatenate(parts, axis=1), image)
+    assert (blocks.lf_peak, blocks.hf_peak) == (whole.lf_peak, whole.hf_peak)
+
+    # Without an ultrasonic band the peak stays unset
+    low_rate = BandAnalyzer(16000)
+    low_rate.feed(x[:16000 * 3])
+    assert low_rate.high.empty and low_rate.hf_db == -np.inf
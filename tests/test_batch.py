@@ -0,0 +1,164 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+import soundfile as sf
+from enhance_audio_files import enhance_audio as enhance_audio_module
+from enhance_audio_files.enhance_audio import (
+    batch_output_files,
+    enhance_audio,
+    enhance_batch,
+    find_audio_files,
+)
+from enhance_audio_files.skip_cache import EnhanceManifest
+
+
+def _write_noise(path, seconds):
+    rng = np.random.default_rng(int(seconds * 10))
+    sf.write(path, rng.normal(0, 0.1, int(16000 * seconds)), 16000)
+
+
+def test_batch_matches_single_file_and_survives_failures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("in")
+    _write_noise("in/short.wav", 0.5)
+    _write_noise("in/long.wav", 2.0)
+    with open("in/broken.wav", "wb") as f:
+        f.write(b"not audio")
+    with open("in/notes.txt", "w") as f:
+        f.write("ignored")
+
+    assert [os.path.basename(p) for p in find_audio_files("in")] == [
+        "long.wav", "short.wav", "broken.wav",
+    ]
+
+    results = enhance_batch("in", "out", 3000, "mid", jobs=2)
+    by_name = {os.path.basename(r[0]): r for r in results}
+    assert by_name["broken.wav"][1] is None and by_name["broken.wav"][2]
+
+    for name in ("short", "long"):
+        _, output, error, _ = by_name[f"{name}.wav"]
+        assert error is None
+        single = enhance_audio(f"in/{name}.wav", f"single_{name}.wav", 3000, "mid")
+        assert np.array_equal(sf.read(output)[0], sf.read(single)[0])
+
+
+def test_batch_outputs_of_same_named_inputs_do_not_collide(
+    tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("in")
+    _write_noise("in/a.wav", 0.5)
+    sf.write("in/a.flac", np.zeros(8000), 16000)
+    _write_noise("in/b.wav", 0.5)
+
+    results = enhance_batch("in", "out", 3000, "mid", jobs=2)
+    outputs = {os.path.basename(r.input): r.output for r in results}
+    assert outputs == {
+        "a.wav": os.path.join("out", "a_wav_enhanced.wav"),
+        "a.flac": os.path.join("out", "a_flac_enhanced.wav"),
+        "b.wav": os.path.join("out", "b_enhanced.wav"),
+    }
+    assert np.any(sf.read(outputs["a.wav"])[0])
+    assert not np.any(sf.read(outputs["a.flac"])[0])
+
+    clash = [os.path.join("d1", "x.wav"), os.path.join("d2", "x.wav")]
+    with pytest.raises(ValueError, match="x.wav"):
+        batch_output_files(clash, "out")
+
+
+def test_manifest_skips_unchanged_inputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("in")
+    _write_noise("in/a.wav", 0.5)
+    _write_noise("in/b.wav", 1.0)
+
+    first = enhance_batch(
+        "in", "out", 3000, "far", jobs=1,
+        manifest=EnhanceManifest("manifest.json"),
+    )
+    assert not any(r.cached for r in first)
+
+    manifest = EnhanceManifest("manifest.json")
+    second = enhance_batch("in", "out", 3000, "far", jobs=1, manifest=manifest)
+    assert all(r.cached for r in second) and manifest.hits == 2
+
+    # Changed parameters and changed content both miss the cache
+    other = enhance_batch(
+        "in", "out", 2000, "far", jobs=1,
+        manifest=EnhanceManifest("manifest.json"),
+    )
+    assert not any(r.cached for r in other)
+    _write_noise("in/a.wav", 0.7)
+    third = enhance_batch(
+        "in", "out", 3000, "far", jobs=1,
+        manifest=EnhanceManifest("manifest.json"),
+    )
+    # b.wav is unchanged, but the 2000 Hz run overwrote its output
+    cached = {os.path.basename(r.input): r.cached for r in third}
+    assert cached == {"a.wav": False, "b.wav": False}
+    expected = enhance_audio("in/b.wav", "single_b.wav", 3000, "far")
+    assert np.array_equal(
+        sf.read("out/b_enhanced.wav")[0], sf.read(expected)[0]
+    )
+
+    # Unchanged input, parameters and output: served from the cache
+    manifest = EnhanceManifest("manifest.json")
+    fourth = enhance_batch(
+        "in", "out", 3000, "far", jobs=1, manifest=manifest
+    )
+    assert all(r.cached for r in fourth) and manifest.hits == 2
+
+
+def test_manifest_misses_outputs_changed_since_recorded(tmp_path):
+    path = str(tmp_path / "in.wav")
+    output = str(tmp_path / "out.wav")
+    _write_noise(path, 0.5)
+    _write_noise(output, 0.5)
+    manifest = EnhanceManifest(str(tmp_path / "manifest.json"))
+    manifest.record(path, output, ("far", 3000))
+    assert manifest.lookup(path, output, ("far", 3000))
+
+    # Another run writes the same output file with other parameters
+    _write_noise(output, 0.6)
+    manifest.record(path, output, ("far", 2000))
+    assert not manifest.lookup(path, output, ("far", 3000))
+    assert manifest.lookup(path, output, ("far", 2000))
+
+    # The same input and parameters written elsewhere replace the entry;
+    # recording over the old output afterwards keeps the new one
+    moved = str(tmp_path / "moved.wav")
+    _write_noise(moved, 0.5)
+    manifest.record(path, moved, ("far", 2000))
+    assert not manifest.lookup(path, output, ("far", 2000))
+    other = str(tmp_path / "other.wav")
+    _write_noise(other, 1.0)
+    manifest.record(other, output, ("far", 2000))
+    assert manifest.lookup(path, moved, ("far", 2000))
+    assert manifest.lookup(other, output, ("far", 2000))
+
+    manifest.save()
+    reloaded = EnhanceManifest(str(tmp_path / "manifest.json"))
+    assert reloaded.lookup(path, moved, ("far", 2000))
+    os.remove(output)
+    assert not reloaded.lookup(other, output, ("far", 2000))
+
+
+def test_code_version_covers_every_processing_module():
+    # Modules that never touch the enhanced samples
+    helpers = {
+        "lazy_import", "profiling", "results_store", "skip_cache",
+        "spectrogram_renderer",
+    }
+    imported = {
+        name.split(".", 1)[1]
+        for name in sys.modules
+        if name.startswith("enhance_audio_files.")
+    }
+    assert imported - helpers == {
+        os.path.splitext(name)[0]
+        for name in enhance_audio_module.PROCESSING_MODULES
+    }
@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from benchmarks.run_benchmarks import (
+    compare,
+    main,
+    run_startup,
+    run_suite,
+    synth_recording,
+)
+
+
+def test_synth_recording_is_deterministic():
+    a = synth_recording(1.0, 48000)
+    assert a.dtype == np.float32 and a.shape == (48000,)
+    assert np.array_equal(a, synth_recording(1.0, 48000))
+    assert np.max(np.abs(a)) <= 1.0
+
+    spectrum = np.abs(np.fft.rfft(a))
+    freqs = np.fft.rfftfreq(a.size, 1 / 48000)
+    assert spectrum[np.argmin(np.abs(freqs - 21000))] > 100 * np.median(spectrum)
+
+
+def test_run_and_compare_flag_regressions():
+    report = run_suite(
+        durations=(0.5,), rates=(16000,), repeat=1,
+        names=["detect_voice_segments"],
+    )
+    (row,) = report["results"]
+    assert abs(row["rtf"] - row["seconds"] / 0.5) < 1e-5
+
+    slower = {"results": [dict(row, seconds=row["seconds"] * 2 + 1)]}
+    assert not compare(report, report)[0]["regression"]
+    assert compare(report, slower, tolerance=0.15)[0]["regression"]
+
+
+def test_startup_rows_are_compared():
+    rows = run_startup(repeat=1, names=["enhance_audio --help"])
+    assert rows[0]["seconds"] > 0 and rows[0]["duration"] is None
+
+    baseline = {"results": [], "startup": rows}
+    slower = {"results": [], "startup": [dict(rows[0], seconds=60.0)]}
+    assert compare(baseline, slower)[0]["regression"]
+
+
+def test_only_filters_the_startup_commands_too(tmp_path):
+    output = str(tmp_path / "report.json")
+    args = ["run", "--durations", "0.5", "--rates", "16000", "--repeat", "1"]
+    main([*args, "--output", output, "--only", "detect_voice_segments"])
+    with open(output, encoding="utf-8") as f:
+        report = json.load(f)
+    assert [row["name"] for row in report["results"]] == [
+        "detect_voice_segments"
+    ]
+    assert "startup" not in report
+
+    main([*args, "--output", output, "--only", "enhance_audio --help"])
+    with open(output, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["results"] == []
+    assert [row["name"] for row in report["startup"]] == [
+        "enhance_audio --help"
+    ]
@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pydub
+from scipy.signal import sawtooth
+import soundfile as sf
+from enhance_audio_files.audio_decode import as_decoded, decode_audio
+from enhance_audio_files.enhance_audio import (
+    VAD_SAMPLE_RATE,
+    detect_voice_segments,
+)
+
+
+def _signal(sr, channels, seconds=3):
+    rng = np.random.default_rng(2)
+    t = np.arange(int(sr * seconds)) / sr
+    voice = (np.sin(2 * np.pi * 1.5 * t) > 0) * sawtooth(2 * np.pi * 150 * t)
+    return np.stack(
+        [voice * 0.5 / (ch + 1) + rng.normal(0, 0.01, t.size)
+         for ch in range(channels)],
+        axis=1,
+    )
+
+
+def test_pcm_wav_and_rf64_are_memory_mapped(tmp_path):
+    data = _signal(22050, 2)
+    for fmt, subtype, dtype in [
+        ("WAV", "PCM_16", "int16"),
+        ("RF64", "PCM_16", "int16"),
+        ("WAV", "PCM_32", "int32"),
+    ]:
+        path = str(tmp_path / f"in_{fmt}_{subtype}.wav")
+        sf.write(path, data, 22050, subtype=subtype, format=fmt)
+        audio = decode_audio(path)
+        assert isinstance(audio.samples, np.memmap)
+        assert audio.frame_rate == 22050 and audio.channels == 2
+        np.testing.assert_array_equal(
+            audio.samples, sf.read(path, dtype=dtype)[0]
+        )
+
+
+def test_other_formats_use_soundfile(tmp_path):
+    data = _signal(16000, 1)
+    for name, subtype, dtype in [
+        ("in.flac", "PCM_16", np.int16),
+        ("in24.flac", "PCM_24", np.int32),
+        ("in24.wav", "PCM_24", np.int32),
+    ]:
+        path = str(tmp_path / name)
+        sf.write(path, data, 16000, subtype=subtype)
+        audio = decode_audio(path)
+        assert not isinstance(audio.samples, np.memmap)
+        assert audio.samples.dtype == dtype
+        assert audio.samples.shape == (len(data), 1)
+        assert audio.duration_seconds == 3
+
+
+def test_vad_shares_cached_16k_mono(tmp_path):
+    path = str(tmp_path / "in.wav")
+    sf.write(path, _signal(44100, 2), 44100, subtype="PCM_16")
+    audio = decode_audio(path)
+
+    mono = audio.mono(VAD_SAMPLE_RATE)
+    assert mono.dtype == np.float32
+    assert len(mono) == 3 * VAD_SAMPLE_RATE
+    assert audio.mono(VAD_SAMPLE_RATE) is mono
+
+    segments = detect_voice_segments(audio)
+    assert segments
+    assert detect_voice_segments(pydub.AudioSegment.from_file(path)) == segments
+    np.testing.assert_array_equal(
+        as_decoded(pydub.AudioSegment.from_file(path)).samples, audio.samples
+    )
@@ -3,8 +3,15 @@ import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import numpy as np
+import webrtcvad
+from pydub import AudioSegment
 from pydub.generators import Sine
-from enhance_audio_files.enhance_audio import detect_voice_segments
+from enhance_audio_files.enhance_audio import (
+    detect_voice_segments,
+    mask_to_segments,
+    speech_mask,
+)
 
 
 def test_detect_voice_segments_returns_list():
@@ -13,3 +20,35 @@ def test_detect_voice_segments_returns_list():
     assert isinstance(segments, list)
     for start, end in segments:
         assert 0 <= start < end <= seg.duration_seconds
+
+
+def test_mask_to_segments_edges():
+    mask = np.array([0, 1, 1, 0, 0, 1, 0, 1, 1], dtype=bool)
+    segments = mask_to_segments(mask, 500, total_duration=4.7)
+    assert segments == [(0.5, 1.5), (2.5, 3.0), (3.5, 4.7)]
+    assert mask_to_segments(np.zeros(4, dtype=bool), 30) == []
+
+
+def test_detect_voice_segments_matches_frame_loop():
+    rng = np.random.default_rng(0)
+    t = np.arange(16000 * 3) / 16000
+    bursts = (np.sin(2 * np.pi * 1.5 * t) > 0) * np.sin(2 * np.pi * 220 * t)
+    pcm = (bursts * 12000 + rng.normal(0, 300, t.size)).astype(np.int16)
+    seg = AudioSegment(
+        pcm.tobytes(), frame_rate=16000, sample_width=2, channels=1
+    )
+
+    vad = webrtcvad.Vad(3)
+    expected, start = [], None
+    for i in range(0, len(pcm) - 479, 480):
+        speech = vad.is_speech(pcm[i:i + 480].tobytes(), 16000)
+        if speech and start is None:
+            start = i / 16000
+        elif not speech and start is not None:
+            expected.append((start, i / 16000))
+            start = None
+    if start is not None:
+        expected.append((start, len(pcm) / 16000))
+
+    assert speech_mask(pcm).size == len(pcm) // 480
+    assert detect_voice_segments(seg) == expected
@@ -0,0 +1,90 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import librosa
+import numpy as np
+import pytest
+from enhance_audio_files import enhance_audio
+from enhance_audio_files.audio_decode import DecodedAudio
+from enhance_audio_files.enhance_audio import (
+    analyze_voice_features,
+    compute_feature_tracks,
+    load_feature_tracks,
+    save_feature_tracks,
+    segment_frames,
+    segment_magnitude,
+)
+
+
+def _voice(sr=16000, seconds=2.0):
+    t = np.arange(int(sr * seconds)) / sr
+    return (0.5 * np.sin(2 * np.pi * 150 * t)).astype(np.float32)
+
+
+def test_chunked_tracks_match_whole_signal():
+    y = _voice()
+    tracks = compute_feature_tracks(y, 16000, chunk_frames=7)
+
+    f0 = librosa.yin(y, fmin=50, fmax=500, sr=16000)
+    mag = np.abs(librosa.stft(y))
+    assert tracks.f0.shape == f0.shape
+    assert np.allclose(tracks.f0, f0)
+    assert np.allclose(tracks.magnitude, mag, atol=1e-5)
+    assert np.allclose(
+        tracks.centroid,
+        librosa.feature.spectral_centroid(S=mag, sr=16000)[0],
+        rtol=1e-4,
+    )
+    assert abs(np.median(tracks.f0[segment_frames(tracks, 0.5, 1.5)]) - 150) < 2
+
+
+def test_feature_tracks_npz_roundtrip(tmp_path):
+    tracks = compute_feature_tracks(_voice(seconds=0.5), 16000)
+    path = str(tmp_path / "tracks.npz")
+    save_feature_tracks(tracks, path)
+    loaded = load_feature_tracks(path)
+    assert loaded.sr == 16000
+    assert np.array_equal(loaded.f0, tracks.f0)
+    assert np.allclose(loaded.magnitude, tracks.magnitude, rtol=1e-2, atol=1e-4)
+
+
+def test_segment_magnitude_without_whole_file_magnitude():
+    y = _voice(seconds=1.0)
+    kept = compute_feature_tracks(y, 16000, chunk_frames=5)
+    lean = compute_feature_tracks(y, 16000, keep_magnitude=False)
+    assert lean.magnitude is None
+    assert np.array_equal(lean.f0, kept.f0)
+    assert np.allclose(lean.centroid, kept.centroid)
+
+    # Segments at both edges of the file need the zero padding
+    for start, end in ((0.0, 0.2), (0.3, 0.6), (0.8, 1.0)):
+        frames = segment_frames(kept, start, end)
+        assert np.allclose(
+            segment_magnitude(y, lean, frames),
+            kept.magnitude[:, frames],
+            atol=1e-5,
+        )
+
+
+def test_renderer_is_closed_when_a_segment_fails(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    closed = []
+    close = enhance_audio.SpectrogramRenderer.close
+    monkeypatch.setattr(
+        enhance_audio.SpectrogramRenderer,
+        "close",
+        lambda self: closed.append(self) or close(self),
+    )
+
+    def fail(*args):
+        raise RuntimeError("segment failed")
+
+    monkeypatch.setattr(enhance_audio, "_segment_features", fail)
+    pcm = (_voice(seconds=0.5) * 32767).astype(np.int16)[:, None]
+    with pytest.raises(RuntimeError):
+        analyze_voice_features(
+            DecodedAudio(pcm, 16000), [(0.0, 0.4)], "voice.wav"
+        )
+    assert len(closed) == 1
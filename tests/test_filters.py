@@ -4,10 +4,13 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import numpy as np
+import pytest
+import scipy.signal as signal
 from enhance_audio_files.enhance_audio import (
     apply_low_pass_filter,
     apply_high_pass_filter,
     apply_band_pass_filter,
+    filter_plan,
 )
 
 
@@ -33,3 +36,38 @@ def test_band_pass_constant():
     assert out.shape == data.shape
     # band-pass should also remove the DC component
     assert np.allclose(out[-100:], 0, atol=1e-3)
+
+
+def test_filter_plan_matches_sequential_filters():
+    data = np.random.default_rng(0).normal(size=16000)
+    expected = apply_low_pass_filter(
+        apply_band_pass_filter(data, 16000, 500, 5000), 16000, 3000
+    )
+    sos = filter_plan(16000, "mid", 3000)
+    assert np.allclose(signal.sosfilt(sos, data), expected)
+
+
+def test_filter_plan_is_cached():
+    sos = filter_plan(44100, "far", 400)
+    assert filter_plan(44100, "far", 400) is sos
+    assert sos.shape == (6, 6)
+    with pytest.raises(ValueError):
+        filter_plan(44100, "nowhere", 400)
+
+
+@pytest.mark.parametrize(
+    "fs, low_freq_enhance, distance_field",
+    [(8000, 3000, "close"), (44100, 30000, "mid"), (44100, 22050, "far")],
+)
+def test_cutoff_at_or_above_nyquist_is_rejected(
+    tmp_path, fs, low_freq_enhance, distance_field
+):
+    import soundfile as sf
+    from enhance_audio_files.enhance_audio import enhance_audio
+
+    path = str(tmp_path / "in.wav")
+    output = str(tmp_path / "out.wav")
+    sf.write(path, np.zeros(fs), fs)
+    with pytest.raises(ValueError, match="0 < Wn < 1"):
+        enhance_audio(path, output, low_freq_enhance, distance_field)
+    assert not os.path.exists(output)
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from enhance_audio_files.lazy_import import lazy_import
+
+
+def test_lazy_import_defers_loading():
+    code = (
+        "import sys\n"
+        "from enhance_audio_files.lazy_import import lazy_import\n"
+        "fractions = lazy_import('fractions')\n"
+        "assert type(fractions).__name__ == '_LazyModule'\n"
+        "assert fractions.Fraction(1, 2) * 2 == 1\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+    assert lazy_import("os") is os
+    with pytest.raises(ModuleNotFoundError):
+        lazy_import("no_such_module_here")
+
+
+def test_enhance_audio_import_skips_heavy_modules():
+    code = (
+        "import sys\n"
+        "import enhance_audio_files.enhance_audio\n"
+        "heavy = ['scipy.stats', 'scipy.io', 'matplotlib', 'librosa.core']\n"
+        "print(' '.join(m for m in heavy if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert out.stdout.strip() == ""
@@ -0,0 +1,223 @@
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+import soundfile as sf
+from benchmarks.run_benchmarks import LFN_DIR, synth_recording
+
+if LFN_DIR not in sys.path:
+    sys.path.insert(0, LFN_DIR)
+
+from band_analysis import BandAnalyzer  # noqa: E402
+
+
+def _analyzer(tmp_path, monkeypatch):
+    # The module creates its spectrogram folder on import, in the working
+    # directory of whichever test imports it first
+    monkeypatch.chdir(tmp_path)
+    lfn = importlib.import_module("lfn_batch_file_analyzer")
+    os.makedirs(lfn.SPECTROGRAM_FOLDER, exist_ok=True)
+    return lfn
+
+
+class _Capture:
+    def submit(self, db, path):
+        self.db = db
+        return path
+
+
+def test_spectrogram_is_preallocated_per_block(tmp_path, monkeypatch):
+    lfn = _analyzer(tmp_path, monkeypatch)
+    sf.write("in.wav", synth_recording(7.3, 44100), 44100, subtype="FLOAT")
+
+    whole, blocks = _Capture(), _Capture()
+    result = lfn.analyze_audio("in.wav", "in.wav", renderer=whole)
+    assert lfn.analyze_audio(
+        "in.wav", "in.wav", block_duration=2, renderer=blocks
+    ) == result
+    bands = BandAnalyzer(44100, image_max_freq=lfn.SPECTROGRAM_MAX_FREQ)
+    frames = sf.info("in.wav").frames
+    assert whole.db.shape == (
+        len(bands.image_freqs), bands.image_columns(frames)
+    )
+    np.testing.assert_allclose(blocks.db, whole.db, atol=1e-3)
+    assert np.isfinite(blocks.db).all()
+
+
+def test_display_copy_max_pools_memmapped_buffer(tmp_path, monkeypatch):
+    lfn = _analyzer(tmp_path, monkeypatch)
+    monkeypatch.setattr(lfn, "SPECTROGRAM_MEMMAP_BYTES", 0)
+    spec = np.random.default_rng(3).normal(size=(1001, 12)).astype(np.float32)
+    buffer = lfn.allocate_spectrogram(12, 1001)
+    assert isinstance(buffer, np.memmap)
+    buffer[:] = spec
+
+    display = lfn.display_spectrogram(buffer, max_columns=50)
+    expected = [spec[i:i + 21].max(axis=0) for i in range(0, 1001, 21)]
+    np.testing.assert_array_equal(display, np.stack(expected, axis=1))
+
+
+def test_jobs_return_rows_in_input_order(tmp_path, monkeypatch, capsys):
+    lfn = _analyzer(tmp_path, monkeypatch)
+    for var in lfn.THREAD_LIMIT_VARS:
+        # Restored after the test; the pool sets them for its workers
+        monkeypatch.delenv(var, raising=False)
+    paths = []
+    for i, seconds in enumerate((3.1, 1.2, 2.4)):
+        paths.append(str(tmp_path / f"in{i}.wav"))
+        sf.write(paths[-1], synth_recording(seconds, 44100), 44100)
+    (tmp_path / "broken.wav").write_bytes(b"not audio")
+    paths.insert(1, str(tmp_path / "broken.wav"))
+
+    serial = lfn.analyze_files(paths, spectrograms=False)
+    parallel = lfn.analyze_files(paths, spectrograms=False, jobs=2)
+    assert [row["Filename"] for row in parallel] == [
+        "in0.wav", "in1.wav", "in2.wav"
+    ]
+    assert parallel == serial
+    assert capsys.readouterr().out.count("Error analyzing broken.wav") == 2
+
+
+def test_failed_image_fails_only_its_file(tmp_path, monkeypatch, capsys):
+    lfn = _analyzer(tmp_path, monkeypatch)
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f"in{i}.wav"))
+        sf.write(paths[-1], synth_recording(1.0 + i, 44100), 44100)
+    # The image of in1.wav cannot be written
+    os.mkdir(os.path.join(lfn.SPECTROGRAM_FOLDER, "in1.png"))
+
+    rows = lfn.analyze_files(paths, timelines=False)
+    assert [row["Filename"] for row in rows] == ["in0.wav", "in2.wav"]
+    assert all(os.path.isfile(row["Spectrogram"]) for row in rows)
+    assert "Error analyzing in1.wav" in capsys.readouterr().out
+
+
+def test_same_named_files_write_separate_outputs(tmp_path, monkeypatch):
+    lfn = _analyzer(tmp_path, monkeypatch)
+    sf.write("a.wav", synth_recording(1.5, 44100), 44100)
+    sf.write("a.flac", synth_recording(2.5, 44100), 44100)
+    sf.write("b.wav", synth_recording(1.0, 44100), 44100)
+    paths = ["a.wav", "a.flac", "b.wav"]
+
+    rows = lfn.analyze_files(paths, jobs=2, interval=0.5)
+    outputs = {
+        row["Filename"]: (row["Spectrogram"], row["Timeline"]) for row in rows
+    }
+    assert outputs == {
+        "a.wav": (
+            os.path.join("spectrograms", "a_wav.png"),
+            os.path.join("timelines", "a_wav.npz"),
+        ),
+        "a.flac": (
+            os.path.join("spectrograms", "a_flac.png"),
+            os.path.join("timelines", "a_flac.npz"),
+        ),
+        "b.wav": (
+            os.path.join("spectrograms", "b.png"),
+            os.path.join("timelines", "b.npz"),
+        ),
+    }
+    # One timeline row per half second of each file
+    for name, rows in (("a_wav", 3), ("a_flac", 5)):
+        timeline = np.load(os.path.join("timelines", f"{name}.npz"))
+        assert len(timeline["start_s"]) == rows
+
+    with pytest.raises(ValueError, match="x.wav"):
+        lfn.analyze_files([os.path.join("d1", "x.wav"), "x.wav"])
+
+
+def test_bands_too_short_to_measure_are_nan(tmp_path, monkeypatch):
+    lfn = _analyzer(tmp_path, monkeypatch)
+    # 0.5 s is shorter than one LFN segment (about 0.74 s at 44.1 kHz)
+    sf.write("short.wav", synth_recording(0.5, 44100), 44100)
+    row = lfn.analyze_audio("short.wav", "short.wav", timeline=False)
+    assert np.isnan(row["LFN Peak (Hz)"]) and np.isnan(row["LFN dB"])
+    assert np.isnan(row["LFN Leq (dB)"])
+    assert np.isfinite(row["Ultrasonic dB"])
+
+    sf.write("low_rate.wav", synth_recording(2.0, 16000), 16000)
+    row = lfn.analyze_audio("low_rate.wav", "low_rate.wav", timeline=False)
+    assert np.isfinite(row["LFN dB"])
+    assert np.isnan(row["Ultrasonic Peak (Hz)"])
+    assert np.isnan(row["Ultrasonic dB"])
+
+
+def test_native_rate_is_analyzed_without_temp_files(tmp_path, monkeypatch):
+    lfn = _analyzer(tmp_path, monkeypatch)
+    sf.write("in.flac", synth_recording(2.5, 48000), 48000)
+    before = sorted(os.listdir(tmp_path))
+
+    row = lfn.analyze_audio(
+        "in.flac",
+        "in.flac",
+        block_duration=1,
+        spectrogram_image=False,
+        timeline=False,
+    )
+    assert 20000 <= row["Ultrasonic Peak (Hz)"] <= 24000
+    assert sorted(os.listdir(tmp_path)) == before
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+def test_containers_are_streamed_through_ffmpeg(tmp_path, monkeypatch):
+    lfn = _analyzer(tmp_path, monkeypatch)
+    sf.write("in.wav", synth_recording(2.5, 48000), 48000, subtype="PCM_16")
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", "in.wav", "-c:a", "alac", "in.m4a"],
+        check=True,
+    )
+
+    wav, m4a = _Capture(), _Capture()
+    expected = lfn.analyze_audio("in.wav", "in", renderer=wav)
+    assert lfn.analyze_audio("in.m4a", "in", renderer=m4a) == expected
+    np.testing.assert_array_equal(m4a.db, wav.db)
+
+
+def test_cache_only_analyzes_new_and_changed_files(tmp_path, monkeypatch):
+    lfn = _analyzer(tmp_path, monkeypatch)
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f"in{i}.wav"))
+        sf.write(paths[-1], synth_recording(1 + i, 44100), 44100)
+    analyzed = []
+    analyze_audio = lfn.analyze_audio
+
+    def counting(path, *args, **kwargs):
+        analyzed.append(os.path.basename(path))
+        return analyze_audio(path, *args, **kwargs)
+
+    monkeypatch.setattr(lfn, "analyze_audio", counting)
+
+    def run(hash_files=False, **kwargs):
+        cache = lfn.AnalysisCache("cache.json", hash_files=hash_files)
+        rows = lfn.analyze_files(
+            paths, spectrograms=False, cache=cache, **kwargs
+        )
+        cache.save()
+        return rows
+
+    first = run()
+    assert analyzed == ["in0.wav", "in1.wav", "in2.wav"]
+    analyzed.clear()
+    assert run() == first and analyzed == []
+
+    sf.write(paths[1], synth_recording(1.5, 44100), 44100)
+    os.utime(paths[2], ns=(0, 0))
+    assert len(run()) == 3 and analyzed == ["in1.wav", "in2.wav"]
+
+    # With content hashes a touched file is still served from the cache
+    run(hash_files=True)
+    analyzed.clear()
+    os.utime(paths[0], ns=(0, 0))
+    assert run(hash_files=True) == run() and analyzed == []
+
+    monkeypatch.setattr(lfn, "LF_RANGE", (10, 80))
+    run()
+    assert analyzed == ["in0.wav", "in1.wav", "in2.wav"]
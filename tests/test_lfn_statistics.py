@@ -0,0 +1,67 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from benchmarks.run_benchmarks import LFN_DIR
+
+if LFN_DIR not in sys.path:
+    sys.path.insert(0, LFN_DIR)
+
+from band_analysis import BandAnalyzer  # noqa: E402
+from lfn_statistics import (  # noqa: E402
+    LEVEL_STEP_DB,
+    LevelHistogram,
+    LfnStatistics,
+)
+
+
+def test_histogram_percentiles_and_leq():
+    levels = np.random.default_rng(6).normal(-60, 8, 20000)
+    hist = LevelHistogram()
+    for part in np.array_split(levels, 7):
+        hist.add(part)
+
+    for percent in (10, 50, 90):
+        expected = np.percentile(levels, 100 - percent)
+        assert abs(hist.exceeded(percent) - expected) <= LEVEL_STEP_DB
+    energy = np.mean(10 ** (levels / 10))
+    assert np.isclose(hist.leq(), 10 * np.log10(energy))
+    assert np.isnan(LevelHistogram().leq())
+
+
+def _timeline(x, sr, splits, interval):
+    bands = BandAnalyzer(sr)
+    stats = LfnStatistics(bands, interval)
+    for block in np.split(x, splits):
+        bands.feed(block)
+        stats.update(bands)
+    stats.finish()
+    return stats
+
+
+def test_timeline_tracks_levels_per_interval():
+    sr = 48000
+    t = np.arange(sr * 25) / sr
+    x = np.random.default_rng(7).normal(0, 1e-4, t.size)
+    # A 50 Hz hum from 10 s on, an ultrasonic tone from 20 s on
+    x += 0.01 * np.sin(2 * np.pi * 50 * t) * (t >= 10)
+    x += 0.01 * np.sin(2 * np.pi * 21000 * t) * (t >= 20)
+
+    stats = _timeline(x, sr, [sr, sr + 3, 7 * sr], interval=5)
+    timeline = stats.timeline()
+    assert list(timeline["start_s"]) == [0, 5, 10, 15, 20]
+    lf, hf = timeline["lf_leq_db"], timeline["hf_leq_db"]
+    assert lf[2:].min() > lf[0] + 30 and hf[4] > hf[0] + 30
+    # Frames straddling the onset raise Leq but not the background L90
+    assert abs(timeline["lf_l90_db"][1] - timeline["lf_l90_db"][0]) < 1
+    assert np.all(np.abs(timeline["lf_peak_hz"][3:] - 50) < 1.5)
+    assert np.all(timeline["lf_l10_db"] >= timeline["lf_l90_db"])
+
+    whole = _timeline(x, sr, [], interval=5).timeline()
+    for name, column in timeline.items():
+        np.testing.assert_allclose(column, whole[name], atol=1e-6)
+    # The 16 kHz timeline has no ultrasonic band
+    low_rate = _timeline(x[::3], 16000, [], interval=5).timeline()
+    assert np.isnan(low_rate["hf_leq_db"]).all()
@@ -0,0 +1,67 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import soundfile as sf
+from enhance_audio_files.enhance_audio import (
+    enhance_audio,
+    enhance_audio_stream,
+    filter_plan,
+)
+from enhance_audio_files.limiter import (
+    LIMITER_TARGET,
+    PeakLimiter,
+    normalizing_gain,
+    scan_peak,
+)
+
+
+def _bursty(sr=22050, seconds=3):
+    rng = np.random.default_rng(4)
+    x = rng.normal(0, 0.02, (sr * seconds, 2))
+    x[sr:sr + 200] *= 40
+    return x
+
+
+def test_limiter_is_block_invariant_and_bounded():
+    x = _bursty()
+    whole = PeakLimiter(22050, 2, 0.9).process(x, final=True)
+    assert whole.shape == x.shape
+    assert np.abs(whole).max() <= 0.9
+
+    limiter = PeakLimiter(22050, 2, 0.9)
+    parts = [limiter.process(b) for b in np.array_split(x, [3, 90, 22100])]
+    parts.append(limiter.process(np.zeros((0, 2)), final=True))
+    np.testing.assert_array_equal(np.concatenate(parts), whole)
+
+    # Quiet passages away from the burst get the full boost
+    np.testing.assert_allclose(whole[:1000], x[:1000] * 10, rtol=1e-5)
+
+
+def test_prescan_gain_is_global_normalization():
+    x = _bursty()
+    gain = normalizing_gain(scan_peak(np.array_split(x, 7)), 0.9)
+    y = PeakLimiter(22050, 2, 0.9, max_gain=gain).process(x, final=True)
+    np.testing.assert_allclose(y, x * gain, rtol=1e-5)
+    assert normalizing_gain(scan_peak([np.zeros((5, 2))]), 0.9) == 1.0
+
+
+def test_normalized_stream_matches_in_memory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sf.write("in.wav", _bursty() * 0.5, 22050, subtype="PCM_16")
+    for mode in ("limit", "prescan"):
+        enhance_audio("in.wav", "memory.wav", 3000, "mid", normalize=mode)
+        enhance_audio_stream(
+            "in.wav", "stream.wav", filter_plan(22050, "mid", 3000),
+            block_duration=0.37, normalize=mode,
+        )
+        memory = sf.read("memory.wav", dtype="int16")[0]
+        streamed = sf.read("stream.wav", dtype="int16")[0]
+        np.testing.assert_array_equal(memory, streamed)
+        peak = np.abs(memory.astype(np.int32)).max()
+        target = np.rint(LIMITER_TARGET * 32768)
+        assert peak <= target
+        if mode == "prescan":
+            assert peak >= target - 1
@@ -0,0 +1,67 @@
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from benchmarks.run_benchmarks import LFN_DIR
+
+if LFN_DIR not in sys.path:
+    sys.path.insert(0, LFN_DIR)
+
+from band_analysis import BandAnalyzer  # noqa: E402
+from live_analysis import LiveAnalyzer  # noqa: E402
+
+
+def _signal(sr, seconds, onset):
+    t = np.arange(int(sr * seconds)) / sr
+    x = np.random.default_rng(6).normal(0, 1e-4, t.size)
+    x += 0.01 * np.sin(2 * np.pi * 60 * t) * (t >= onset)
+    x += 0.005 * np.sin(2 * np.pi * 21000 * t) * (t >= onset)
+    return x
+
+
+def test_ring_holds_newest_frames_of_whole_analysis():
+    sr = 44100
+    x = _signal(sr, 20, 12)
+    whole = BandAnalyzer(sr).feed(x)
+
+    live = LiveAnalyzer(sr, history=5)
+    bounds = np.cumsum(np.random.default_rng(7).integers(1, 30000, 200))
+    for block in np.array_split(x, bounds[bounds < len(x)]):
+        live.feed(block)
+    assert live.frames == whole.shape[1] > live.columns
+    np.testing.assert_array_equal(
+        live.snapshot(), whole[:, -live.columns:]
+    )
+
+    # A single block longer than the ring keeps only its newest frames
+    single = LiveAnalyzer(sr, history=1)
+    single.feed(x)
+    out = np.empty((len(single.freqs), single.columns), np.float32)
+    assert single.snapshot(out=out) is out
+    np.testing.assert_array_equal(out, whole[:, -single.columns:])
+
+
+def test_peaks_follow_new_frames_and_reset_when_taken():
+    sr = 44100
+    x = _signal(sr, 8, 4)
+    live = LiveAnalyzer(sr)
+    assert np.isnan(live.snapshot()).all()
+    assert live.take_peaks()[1] == -math.inf
+
+    live.feed(x[: 4 * sr])
+    quiet = live.take_peaks()
+    live.feed(x[4 * sr:])
+    lfn_peak, lfn_db, hf_peak, hf_db = live.take_peaks()
+    assert abs(lfn_peak - 60) < 1.5 and lfn_db > quiet[1] + 40
+    assert abs(hf_peak - 21000) < 12 and hf_db > quiet[3] + 30
+    assert live.current[1] <= lfn_db
+
+    # No frame completes within a few samples: nothing new to report,
+    # while the current levels stay those of the last frames
+    current = live.current
+    live.feed(x[:3])
+    assert live.take_peaks() == (0.0, -math.inf, 0.0, -math.inf)
+    assert live.current == current
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from benchmarks.run_benchmarks import LFN_DIR
+
+if LFN_DIR not in sys.path:
+    sys.path.insert(0, LFN_DIR)
+
+import live_log_store  # noqa: E402
+
+
+def test_writer_batches_rows_and_maintains_rollups(tmp_path):
+    path = str(tmp_path / "live.db")
+    start = datetime(2026, 3, 1, 12, 0, 0)
+    rows = []
+    with live_log_store.LiveLogWriter(path, batch_size=7) as writer:
+        for i in range(150):
+            rows.append((50 + i % 3, -60.0 + i % 11, 21000.0, -90.0))
+            writer.log(*rows[-1], timestamp=start + timedelta(seconds=i))
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM live_logs WHERE timestamp > ?",
+        (start.isoformat(),),
+    ).fetchall()
+    assert "idx_live_logs_timestamp" in str(plan)
+    assert conn.execute("SELECT COUNT(*) FROM live_logs").fetchone()[0] == 150
+
+    minutes = conn.execute(
+        "SELECT bucket, samples, lfn_db_max, lfn_energy FROM live_logs_minute "
+        "ORDER BY bucket"
+    ).fetchall()
+    assert [m[:2] for m in minutes] == [
+        ("2026-03-01T12:00", 60),
+        ("2026-03-01T12:01", 60),
+        ("2026-03-01T12:02", 30),
+    ]
+    lfn_db = np.array([row[1] for row in rows[:60]])
+    assert minutes[0][2] == lfn_db.max()
+    assert np.isclose(minutes[0][3], np.sum(10 ** (lfn_db / 10)))
+    hours = conn.execute("SELECT bucket, samples FROM live_logs_hour")
+    assert hours.fetchall() == [("2026-03-01T12", 150)]
+
+
+def test_old_rows_are_pruned(tmp_path):
+    path = str(tmp_path / "live.db")
+    now = datetime(2026, 3, 1, 12, 0, 0)
+    with live_log_store.LiveLogWriter(path) as writer:
+        writer.log(50, -60, 0, -100, timestamp=now - timedelta(days=100))
+        writer.log(50, -60, 0, -100, timestamp=now - timedelta(days=30))
+    with live_log_store.LiveLogWriter(path) as writer:
+        writer.log(50, -60, 0, -100, timestamp=now)
+
+    conn = sqlite3.connect(path)
+    count = "SELECT COUNT(*) FROM {}"
+    assert conn.execute(count.format("live_logs")).fetchone()[0] == 1
+    assert conn.execute(count.format("live_logs_minute")).fetchone()[0] == 2
+    assert conn.execute(count.format("live_logs_hour")).fetchone()[0] == 3
+
+
+def test_rows_logged_before_rollups_survive_pruning(tmp_path):
+    path = str(tmp_path / "live.db")
+    now = datetime(2026, 3, 1, 12, 0, 0)
+    old = now - timedelta(days=30)
+    # A database written before the rollup tables existed
+    conn = sqlite3.connect(path)
+    conn.executescript(live_log_store.SCHEMA)
+    with conn:
+        conn.executemany(
+            "INSERT INTO live_logs (timestamp, lfn_peak, lfn_db, hf_peak, "
+            "hf_db) VALUES (?, ?, ?, ?, ?)",
+            [
+                (old.isoformat(), 50.0, -60.0, 21000.0, -90.0),
+                ((old + timedelta(seconds=5)).isoformat(), 60.0, -50.0,
+                 21000.0, -90.0),
+            ],
+        )
+    conn.close()
+
+    with live_log_store.LiveLogWriter(path) as writer:
+        writer.log(50, -60, 0, -100, timestamp=now)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM live_logs").fetchone()[0] == 1
+    minutes = conn.execute(
+        "SELECT bucket, samples, lfn_peak, lfn_db_max FROM live_logs_minute "
+        "ORDER BY bucket"
+    ).fetchall()
+    assert minutes == [
+        (old.isoformat()[:16], 2, 60.0, -50.0),
+        (now.isoformat()[:16], 1, 50.0, -60.0),
+    ]
+    hours = conn.execute("SELECT bucket, samples FROM live_logs_hour")
+    assert sorted(hours.fetchall()) == [
+        (old.isoformat()[:13], 2), (now.isoformat()[:13], 1)
+    ]
+
+    # Opening the database again does not roll the rows up twice
+    live_log_store.connect(path).close()
+    assert conn.execute(
+        "SELECT SUM(samples) FROM live_logs_hour"
+    ).fetchone()[0] == 3
@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from benchmarks.run_benchmarks import LFN_DIR
+
+if LFN_DIR not in sys.path:
+    sys.path.insert(0, LFN_DIR)
+
+import live_metrics  # noqa: E402
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.headers["Content-Type"], response.read().decode()
+
+
+def test_endpoint_serves_latest_published_levels():
+    publisher = live_metrics.MetricsPublisher(recent=2)
+    server = live_metrics.serve(publisher, port=0)
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        content_type, body = _get(base + "/metrics.json")
+        assert content_type == live_metrics.JSON_TYPE
+        document = json.loads(body)
+        assert document["current"]["lfn_db"] is None
+        assert document["recent"] == []
+
+        start = datetime(2026, 3, 1, 12, 0, 0)
+        for second in range(3):
+            publisher.record(
+                (50.0 + second, -40.0, 21000.0, -90.0),
+                timestamp=start.replace(second=second),
+            )
+        publisher.publish((60.5, -35.25, 21000.0, float("-inf")), 42, start)
+
+        document = json.loads(_get(base + "/")[1])
+        assert document["frames"] == 42
+        assert document["current"] == {
+            "lfn_peak_hz": 60.5,
+            "lfn_db": -35.25,
+            "hf_peak_hz": 21000.0,
+            "hf_db": None,
+        }
+        assert [r["lfn_peak_hz"] for r in document["recent"]] == [51.0, 52.0]
+
+        content_type, text = _get(base + "/metrics")
+        assert content_type.startswith("text/plain; version=0.0.4")
+        lines = text.splitlines()
+        assert 'lfn_peak_level_db{band="lfn"} -35.25' in lines
+        assert 'lfn_peak_level_db{band="hf"} -Inf' in lines
+        assert 'lfn_window_peak_frequency_hz{band="lfn"} 52.0' in lines
+        assert "lfn_frames_total 42" in lines
+        assert "lfn_measurements_total 3" in lines
+
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            _get(base + "/missing")
+        assert excinfo.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_headless_modules_do_not_import_matplotlib():
+    code = (
+        "import sys; import live_analysis, live_log_store, live_metrics; "
+        "sys.exit('matplotlib' in sys.modules)"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=LFN_DIR, check=True)
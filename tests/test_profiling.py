@@ -0,0 +1,43 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from scipy.signal import sawtooth
+import soundfile as sf
+from enhance_audio_files import profiling
+from enhance_audio_files.enhance_audio import enhance_audio
+
+
+def test_span_is_noop_without_profiler():
+    assert not profiling.enabled()
+    assert profiling.span("decode") is profiling.span("filter")
+    with profiling.span("decode", nbytes=10):
+        pass
+
+
+def test_enhance_audio_trace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sr = 16000
+    t = np.arange(sr * 2) / sr
+    voice = (np.sin(2 * np.pi * 1 * t) > 0) * sawtooth(2 * np.pi * 140 * t)
+    sf.write("in.wav", voice * 0.4, sr, subtype="PCM_16")
+
+    with profiling.profile() as profiler:
+        enhance_audio(
+            "in.wav", "out.wav", 3000, "mid", analyze=True,
+            spectrograms=False,
+        )
+    assert not profiling.enabled()
+    assert profiler.audio_seconds == 2
+
+    trace = json.load(open(profiler.write_chrome_trace("trace.json")))
+    names = {event["name"] for event in trace["traceEvents"]}
+    assert {
+        "decode", "vad", "features", "feature_tracks", "yin", "stft",
+        "segment", "filter", "export", "results_db",
+    } <= names
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
+    assert "RTF" in profiler.summary()
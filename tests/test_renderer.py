@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from PIL import Image
+from enhance_audio_files.spectrogram_renderer import (
+    SpectrogramRenderer,
+    colormap_lut,
+    spectrogram_rgb,
+)
+
+
+def test_spectrogram_rgb_maps_through_lut():
+    db = np.array([[-80.0, -40.0], [0.0, -80.0]])
+    rgb = spectrogram_rgb(db, cmap="magma")
+    lut = colormap_lut("magma")
+    assert rgb.shape == (2, 2, 3) and rgb.dtype == np.uint8
+    # Row order is flipped so the highest bin is at the top
+    assert np.array_equal(rgb[0, 0], lut[255])
+    assert np.array_equal(rgb[1, 0], lut[0])
+
+
+def test_renderer_writes_pngs_in_background(tmp_path):
+    db = np.random.default_rng(0).uniform(-80, 0, size=(64, 20))
+    paths = [str(tmp_path / f"{i}.png") for i in range(3)]
+    with SpectrogramRenderer(workers=2) as renderer:
+        assert [renderer.submit(db, p) for p in paths] == paths
+    for path in paths:
+        assert Image.open(path).size == (20, 64)
+
+    disabled = SpectrogramRenderer(enabled=False)
+    assert disabled.submit(db, str(tmp_path / "skip.png")) == ""
+    assert not os.path.exists(tmp_path / "skip.png")
@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from scipy.signal import resample_poly
+from enhance_audio_files.resample import Resampler, resample, resample_plan
+
+
+def test_resample_matches_resample_poly():
+    x = np.random.default_rng(0).normal(size=44100)
+    for orig_sr, target_sr, up, down in [
+        (44100, 16000, 160, 441),
+        (192000, 48000, 1, 4),
+        (8000, 16000, 2, 1),
+    ]:
+        expected = resample_poly(x, up, down)
+        np.testing.assert_allclose(
+            resample(x, orig_sr, target_sr), expected, atol=1e-12
+        )
+    np.testing.assert_array_equal(resample(x, 16000, 16000), x)
+    assert resample_plan(44100, 16000) is resample_plan(44100, 16000)
+
+
+def test_streaming_matches_one_shot():
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=48000 * 2 + 11).astype(np.float32)
+    resampler = Resampler(48000, 16000)
+    blocks, pos = [], 0
+    while pos < len(x):
+        size = int(rng.integers(1, 9000))
+        blocks.append(resampler.process(x[pos:pos + size]))
+        pos += size
+    blocks.append(resampler.process(np.zeros(0), final=True))
+    np.testing.assert_array_equal(
+        np.concatenate(blocks), resample(x, 48000, 16000)
+    )
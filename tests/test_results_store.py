@@ -0,0 +1,45 @@
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import sawtooth
+from enhance_audio_files import results_store
+from enhance_audio_files.enhance_audio import enhance_audio
+
+
+def test_runs_segments_and_features_are_stored(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sr = 16000
+    t = np.arange(sr * 2) / sr
+    voice = (np.sin(2 * np.pi * 2 * t) > 0) * sawtooth(2 * np.pi * 140 * t)
+    sf.write("in.wav", voice * 0.4, sr, subtype="PCM_16")
+
+    enhance_audio(
+        "in.wav", "out.wav", 3000, "far", analyze=True,
+        spectrograms=False, results_db="results.db",
+    )
+    enhance_audio("in.wav", "out.wav", 2000, "mid", results_db="results.db")
+
+    conn = results_store.connect("results.db")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    log = conn.execute("SELECT * FROM audio_enhancement_log").fetchall()
+    assert [row[1:3] for row in log] == [("far", 3000), ("mid", 2000)]
+    assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 1
+
+    segments = conn.execute("SELECT * FROM voice_segments").fetchall()
+    analysis = conn.execute(
+        "SELECT file, start, gender FROM voice_analysis"
+    ).fetchall()
+    assert segments and len(analysis) == len(segments)
+    assert {row[2] for row in analysis} == {"male"}
+
+    path = results_store.export_csv(conn, "voice_analysis", "analysis.csv")
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][:4] == ["file", "start", "end", "gender"]
+    assert len(rows) == len(segments) + 1
+    conn.close()
@@ -0,0 +1,85 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pydub
+from scipy.signal import sawtooth, sosfilt
+import soundfile as sf
+from enhance_audio_files.enhance_audio import (
+    IncrementalVAD,
+    detect_voice_segments,
+    enhance_audio,
+    enhance_audio_stream,
+    filter_plan,
+    to_pcm,
+)
+
+
+def _write_test_wav(path, sr=22050, channels=2, seconds=3):
+    rng = np.random.default_rng(1)
+    t = np.arange(sr * seconds) / sr
+    voice = (np.sin(2 * np.pi * 2 * t) > 0) * sawtooth(2 * np.pi * 140 * t)
+    data = np.stack(
+        [
+            voice * 0.4 / (ch + 1) + rng.normal(0, 0.01, t.size)
+            for ch in range(channels)
+        ],
+        axis=1,
+    )
+    sf.write(path, data, sr, subtype="PCM_16")
+
+
+def test_stream_output_matches_in_memory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_test_wav("in.wav")
+    enhance_audio("in.wav", "memory.wav", 3000, "mid")
+    enhance_audio("in.wav", "stream.wav", 3000, "mid", stream=True)
+
+    # Small blocks exercise the carried filter state
+    enhance_audio_stream(
+        "in.wav", "blocks.wav", filter_plan(22050, "mid", 3000),
+        block_duration=0.37,
+    )
+
+    memory, sr_memory = sf.read("memory.wav", dtype="int16")
+    assert sr_memory == 22050
+    for path in ("stream.wav", "blocks.wav"):
+        streamed, sr_stream = sf.read(path, dtype="int16")
+        assert sr_stream == sr_memory
+        assert np.array_equal(memory, streamed)
+
+
+def test_incremental_vad_matches_whole_file(tmp_path):
+    path = str(tmp_path / "in.wav")
+    _write_test_wav(path)
+    data, sr = sf.read(path, dtype="int16")
+
+    vad = IncrementalVAD(sr)
+    for i in range(0, len(data), 7000):
+        vad.feed(data[i:i + 7000])
+
+    expected = detect_voice_segments(pydub.AudioSegment.from_file(path))
+    assert expected
+    assert vad.segments() == expected
+
+
+def test_multichannel_output_is_filtered_per_track(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_test_wav("in.wav", channels=4)
+    enhance_audio("in.wav", "memory.wav", 3000, "mid")
+    enhance_audio("in.wav", "stream.wav", 3000, "mid", stream=True)
+
+    data, _ = sf.read("in.wav", dtype="int16")
+    sos = filter_plan(22050, "mid", 3000)
+    expected = np.stack(
+        [
+            to_pcm(sosfilt(sos, data[:, ch]), np.int16)
+            for ch in range(data.shape[1])
+        ],
+        axis=1,
+    )
+    for path in ("memory.wav", "stream.wav"):
+        out, _ = sf.read(path, dtype="int16")
+        assert np.array_equal(out, expected)
@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from enhance_audio_bundle_windows.enhance_audio import (
+    LIMITER_TARGET,
+    BlockEnhancer,
+    PeakLimiter,
+    expand_inputs,
+)
+
+
+def test_block_enhancer_matches_single_pass():
+    rng = np.random.default_rng(5)
+    pcm = (rng.normal(0, 0.1, (44100 * 3, 2)) * 32767).astype(np.int16)
+
+    whole = BlockEnhancer(44100, 2).process(pcm)
+    enhancer = BlockEnhancer(44100, 2)
+    blocks = [enhancer.process(b) for b in np.array_split(pcm, [1000, 1001, 60000])]
+    np.testing.assert_array_equal(np.concatenate(blocks), whole)
+
+
+def test_limiter_bounds_peaks_across_blocks():
+    rng = np.random.default_rng(6)
+    x = rng.normal(0, 0.01, (44100 * 2, 2))
+    x[50000:50300] *= 60
+
+    whole = PeakLimiter(44100, 2).process(x, final=True)
+    limiter = PeakLimiter(44100, 2)
+    blocks = [limiter.process(b) for b in np.array_split(x, [7, 50100])]
+    blocks.append(limiter.process(np.zeros((0, 2)), final=True))
+    np.testing.assert_array_equal(np.concatenate(blocks), whole)
+    assert np.abs(whole).max() <= LIMITER_TARGET
+
+
+def test_expand_inputs(tmp_path):
+    for name in ["b.MP4", "a.MP4", "c.txt"]:
+        (tmp_path / name).touch()
+    missing = str(tmp_path / "missing.MP4")
+    assert expand_inputs([str(tmp_path / "*.MP4"), missing]) == [
+        str(tmp_path / "a.MP4"), str(tmp_path / "b.MP4"), missing
+    ]